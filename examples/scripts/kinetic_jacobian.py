@@ -0,0 +1,71 @@
+# Copyright (C) 2019- Centre of Biological Engineering,
+#     University of Minho, Portugal
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Author: Vitor Pereira
+
+Benchmark of kinetic simulations to steady state with the analytic Jacobian,
+derived from the rate laws, against the finite-difference Jacobians of the
+ODE solvers, for the implicit methods of the scipy solver.
+"""
+import os
+from time import time
+
+import numpy as np
+
+from mewpy.io.sbml import load_ODEModel
+from mewpy.simulation.kinetic import KineticSimulation
+from mewpy.solvers import KineticConfigurations, ODEMethod, set_default_ode_solver
+
+MODELS = os.path.join(os.path.dirname(__file__), '..', 'models', 'kinetic')
+KMODELS = ['chassagnole2002.xml', 'Jahan2016_chemostat_fixed.xml']
+
+N_REPEATS = 5
+
+
+def run(model, analytic):
+    KineticConfigurations.ANALYTIC_JACOBIAN = analytic
+    sim = KineticSimulation(model, timeout=None)
+    calls = [0]
+    get_ode = model.get_ode
+
+    def counted(*args, **kwargs):
+        f = get_ode(*args, **kwargs)
+
+        def g(t, y):
+            calls[0] += 1
+            return f(t, y)
+        return g
+
+    model.get_ode = counted
+    start = time()
+    for _ in range(N_REPEATS):
+        res = sim.simulate()
+    del model.get_ode
+    return (time() - start) / N_REPEATS, calls[0] // N_REPEATS, res
+
+
+if __name__ == '__main__':
+    set_default_ode_solver('scipy')
+    for name in KMODELS:
+        model = load_ODEModel(os.path.join(MODELS, name))
+        for method in (ODEMethod.LSODA, ODEMethod.BDF, ODEMethod.Radau):
+            KineticConfigurations.SOLVER_METHOD = method
+            fd_time, fd_calls, fd = run(model, False)
+            an_time, an_calls, an = run(model, True)
+            diff = max(abs(fd.fluxes[r] - an.fluxes[r]) for r in fd.fluxes) if fd.fluxes and an.fluxes else np.nan
+            print(f"{name} {method.name}: finite differences {fd_time*1000:.0f} ms ({fd_calls} RHS calls), "
+                  f"analytic {an_time*1000:.0f} ms ({an_calls} RHS calls), "
+                  f"speedup {fd_time/an_time:.1f}x, max rate difference {diff:.2g}")
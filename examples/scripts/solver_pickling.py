@@ -0,0 +1,66 @@
+# Copyright (C) 2019- Centre of Biological Engineering,
+#     University of Minho, Portugal
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Author: Vitor Pereira
+
+Benchmark of shipping built problems to workers: pickling round-trips of
+solvers (FBA LP and SRFBA MILP) against rebuilding them from the model.
+"""
+import os
+import pickle
+from time import time
+
+from mewpy.solvers.sglobal import __MEWPY_solvers__
+
+MODELS = os.path.join(os.path.dirname(__file__), '..', 'models')
+EC_CORE = os.path.join(MODELS, 'germ', 'e_coli_core.xml')
+EC_CORE_TRN = os.path.join(MODELS, 'germ', 'e_coli_core_trn.csv')
+
+N_REPEATS = 10
+
+
+def timeit(func):
+    start = time()
+    for _ in range(N_REPEATS):
+        res = func()
+    return (time() - start) / N_REPEATS, res
+
+
+def fba_builder(solver_class):
+    from reframed.io.sbml import load_cbmodel
+    from mewpy.simulation import get_simulator
+    simul = get_simulator(load_cbmodel(EC_CORE))
+    return lambda: solver_class(simul)
+
+
+def srfba_builder(solver_class):
+    from mewpy.io import Reader, Engines, read_model
+    from mewpy.germ.analysis import SRFBA
+    model = read_model(Reader(Engines.MetabolicSBML, EC_CORE),
+                       Reader(Engines.BooleanRegulatoryCSV, EC_CORE_TRN,
+                              sep=',', id_col=0, rule_col=2, aliases_cols=[1], header=0))
+    return lambda: SRFBA(model, solver=solver_class()).build().solver
+
+
+if __name__ == '__main__':
+    for name, solver_class in __MEWPY_solvers__.items():
+        for problem, builder in (('FBA', fba_builder), ('SRFBA', srfba_builder)):
+            build_time, solver = timeit(builder(solver_class))
+            data = pickle.dumps(solver)
+            pickle_time, _ = timeit(lambda: pickle.loads(pickle.dumps(solver)))
+            print(f"{name} {problem}: build {build_time*1000:.1f} ms, "
+                  f"round-trip {pickle_time*1000:.1f} ms ({len(data) // 1024} kB), "
+                  f"speedup {build_time/pickle_time:.1f}x")
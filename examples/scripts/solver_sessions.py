@@ -0,0 +1,76 @@
+# Copyright (C) 2019- Centre of Biological Engineering,
+#     University of Minho, Portugal
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Author: Vitor Pereira
+
+Benchmark of phenotype evaluations with and without persistent solver sessions.
+Each evaluation simulates a random set of reaction deletions, as in a RKO problem.
+"""
+import os
+import random
+from time import time
+
+from mewpy.simulation import get_simulator
+
+MODELS = os.path.join(os.path.dirname(__file__), '..', 'models')
+EC_CORE = os.path.join(MODELS, 'ec', 'e_coli_core.xml.gz')
+YEAST = os.path.join(MODELS, 'yeast', 'iMM904.xml.gz')
+
+N_EVALUATIONS = 200
+N_DELETIONS = 3
+
+
+def load(filename, framework):
+    if framework == 'reframed':
+        from reframed.io.sbml import load_cbmodel
+        return load_cbmodel(filename)
+    else:
+        from cobra.io import read_sbml_model
+        return read_sbml_model(filename)
+
+
+def benchmark(filename, framework='reframed', method='FBA', seed=42):
+    """Returns the average time of a phenotype evaluation with and
+    without persistent solver sessions.
+    """
+    results = dict()
+    for reset_solver in (True, False):
+        simul = get_simulator(load(filename, framework), reset_solver=reset_solver)
+        rnd = random.Random(seed)
+        reactions = simul.reactions
+        # warm up (reference, sessions)
+        simul.simulate(method=method)
+        start = time()
+        for _ in range(N_EVALUATIONS):
+            constraints = {r_id: 0 for r_id in rnd.sample(reactions, N_DELETIONS)}
+            try:
+                simul.simulate(method=method, constraints=constraints)
+            except Exception:
+                # COBRApy raises an exception on infeasible pFBA problems
+                pass
+        results[reset_solver] = (time() - start) / N_EVALUATIONS
+    return results
+
+
+if __name__ == '__main__':
+    for filename in (EC_CORE, YEAST):
+        for framework in ('reframed', 'cobra'):
+            for method in ('FBA', 'pFBA'):
+                r = benchmark(filename, framework, method)
+                print(f"{os.path.basename(filename)} {framework} {method}: "
+                      f"reset {r[True]*1000:.2f} ms, "
+                      f"session {r[False]*1000:.2f} ms, "
+                      f"speedup {r[True]/r[False]:.1f}x")
@@ -0,0 +1,78 @@
+# Copyright (C) 2019- Centre of Biological Engineering,
+#     University of Minho, Portugal
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Author: Vitor Pereira
+
+Benchmark of the throughput of worker pools with and without a worker policy,
+which splits the cpus among the workers instead of letting each solver and
+BLAS library use all of them. Each task runs knockout simulations with a
+MEWpy solver and a BLAS matrix product.
+
+    python thread_policy.py [n_workers]
+"""
+import os
+import sys
+from multiprocessing import Pool
+from time import time
+
+import numpy as np
+
+from mewpy.solvers import solver_instance
+from mewpy.util.process import cpu_count
+from mewpy.util.resources import WorkerPolicy, available_cpus
+
+MODELS = os.path.join(os.path.dirname(__file__), '..', 'models')
+EC_CORE = os.path.join(MODELS, 'germ', 'e_coli_core.xml')
+
+N_TASKS = 64
+_solver = None
+
+
+def _task(i):
+    global _solver
+    if _solver is None:
+        from reframed.io.sbml import load_cbmodel
+        from mewpy.simulation import get_simulator
+        simul = get_simulator(load_cbmodel(EC_CORE))
+        _solver = (solver_instance(simul), simul.reactions, simul.objective)
+    solver, reactions, objective = _solver
+    growth = 0
+    for r_id in reactions[i % 10::10]:
+        res = solver.solve(objective, minimize=False, constraints={r_id: (0, 0)}, get_values=False)
+        growth += res.fobj or 0
+    a = np.random.default_rng(i).random((400, 400))
+    return growth + float(np.linalg.norm(a @ a))
+
+
+def run(n_workers, policy=None):
+    start = time()
+    initializer = policy.apply if policy else None
+    with Pool(n_workers, initializer=initializer) as pool:
+        pool.map(_task, range(N_TASKS))
+    return N_TASKS / (time() - start)
+
+
+if __name__ == '__main__':
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else cpu_count()
+    policy = WorkerPolicy(n_workers)
+    print(f"{len(available_cpus())} cpus, {n_workers} workers, "
+          f"{policy.solver_threads} solver and {policy.blas_threads} BLAS threads per worker")
+    default = run(n_workers)
+    limited = run(n_workers, policy)
+    pinned = run(n_workers, WorkerPolicy(n_workers, pin=True))
+    print(f"default threads: {default:.1f} tasks/s")
+    print(f"worker policy: {limited:.1f} tasks/s ({limited / default:.2f}x)")
+    print(f"worker policy, pinned: {pinned:.1f} tasks/s ({pinned / default:.2f}x)")
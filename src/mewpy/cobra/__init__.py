@@ -16,5 +16,6 @@
 
 from .medium import minimal_medium
 from .parsimonious import pFBA
+from .variability import FVA
 from .util import *
 from .com import *
\ No newline at end of file
@@ -24,7 +24,7 @@ from ..solvers.solution import Status, print_values
 from ..solvers import solver_instance
 from ..util.utilities import molecular_weight
 from warnings import warn
-from math import inf, isinf
+from math import inf, isinf, isnan
 
 
 def SteadyCom(community, constraints=None, solver=None):
@@ -68,15 +68,13 @@ def SteadyComVA(community, obj_frac=1.0, constraints=None, solver=None):
     growth = obj_frac * sol.values[community.biomass]
     solver.update_growth(growth)
 
-    variability = {org_id: [None, None] for org_id in community.organisms}
+    organisms = list(community.organisms)
+    objectives = [f"x_{org_id}" for org_id in organisms]
+    fobj, _, _ = solver.solve_objectives(objectives * 2, [True] * len(organisms) + [False] * len(organisms),
+                                         constraints=constraints)
+    fobj = [None if isnan(x) else x for x in fobj]
 
-    for org_id in community.organisms:
-        sol2 = solver.solve({f"x_{org_id}": 1}, minimize=True, get_values=False, constraints=constraints)
-        variability[org_id][0] = sol2.fobj
-
-    for org_id in community.organisms:
-        sol2 = solver.solve({f"x_{org_id}": 1}, minimize=False, get_values=False, constraints=constraints)
-        variability[org_id][1] = sol2.fobj
+    variability = {org_id: [fobj[i], fobj[i + len(organisms)]] for i, org_id in enumerate(organisms)}
 
     return variability
 
@@ -151,6 +149,8 @@ def binary_search(solver, objective, obj_frac=1, minimize=False, max_iters=30, a
     fold = 2
     feasible = False
     last_feasible = 0
+    # infeasible solves end on a phase 1 basis, so each solve starts from the last feasible one
+    basis = None
 
     for i in range(max_iters):
         diff = value - previous_value
@@ -168,15 +168,19 @@ def binary_search(solver, objective, obj_frac=1, minimize=False, max_iters=30, a
             value = fold*diff + previous_value
 
         solver.update_growth(value)
-        sol = solver.solve(objective, get_values=False, minimize=minimize, constraints=constraints)
+        sol = solver.solve(objective, get_values=False, minimize=minimize, constraints=constraints,
+                           warm_start=basis if basis is not None else True)
 
         feasible = sol.status == Status.OPTIMAL
+        if feasible:
+            basis = solver.get_basis()
 
     if feasible:
         solver.update_growth(obj_frac * value)
     else:
         solver.update_growth(obj_frac * last_feasible)
-    sol = solver.solve(objective, minimize=minimize, constraints=constraints)
+    sol = solver.solve(objective, minimize=minimize, constraints=constraints,
+                       warm_start=basis if basis is not None else True)
 
     if i == max_iters - 1:
         warn("Max iterations exceeded.")
@@ -0,0 +1,298 @@
+# Copyright (C) 2019- Centre of Biological Engineering,
+#     University of Minho, Portugal
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+##############################################################################
+Flux Variability Analysis engine.
+
+The LP problem is built only once by each worker process, and reused to
+compute the minimum and maximum flux of all the reactions in a chunk.
+Consecutive solves on a same problem only change the objective, so each
+solve is warm started from the basis of the previous one.
+
+Without tracking, the minimum and maximum of all the reactions in a chunk
+are solved as a single batch of objectives, on constraints applied only once.
+
+Every primal solution holds feasible values for all the reactions. The
+minimum and maximum values observed are tracked, and a reaction solve is
+skipped when the observed value already attains the reaction bound.
+
+Author: Vitor Pereira
+##############################################################################
+"""
+import multiprocessing
+from math import inf, ceil
+from warnings import warn
+
+import numpy as np
+
+from mewpy.solvers import solver_instance
+from mewpy.solvers.solution import Status
+from mewpy.simulation import get_simulator
+from mewpy.util.resources import WorkerPolicy
+
+
+class FluxRangeTracker:
+    """ Tracks the minimum and maximum values of reactions observed in primal solutions.
+
+    Any primal solution of an FVA problem is feasible, so an observed value is a bound
+    on the reaction minimum (maximum). When it attains the reaction lower (upper) bound,
+    it is the minimum (maximum) and the respective solve can be skipped.
+    """
+
+    def __init__(self, bounds, abstol=1e-6):
+        """
+        :param dict bounds: The (lower, upper) bounds of the tracked reactions.
+        :param float abstol: Absolute tolerance when comparing values to bounds (default: 1e-6).
+        """
+        self.reactions = list(bounds.keys())
+        self.index = {r_id: i for i, r_id in enumerate(self.reactions)}
+        self.lb = np.array([bounds[r_id][0] for r_id in self.reactions], dtype=float)
+        self.ub = np.array([bounds[r_id][1] for r_id in self.reactions], dtype=float)
+        self.minimum = np.full(len(self.reactions), inf)
+        self.maximum = np.full(len(self.reactions), -inf)
+        self.abstol = abstol
+        self.skipped = 0
+
+    def update(self, values):
+        """ Updates the observed ranges with the values of a primal solution. """
+        x = np.array([values[r_id] for r_id in self.reactions], dtype=float)
+        np.minimum(self.minimum, x, out=self.minimum)
+        np.maximum(self.maximum, x, out=self.maximum)
+
+    def attained(self, r_id, minimize):
+        """ Returns the reaction bound if it was already attained, None otherwise. """
+        i = self.index[r_id]
+        if minimize and self.minimum[i] <= self.lb[i] + self.abstol:
+            return self.lb[i]
+        elif not minimize and self.maximum[i] >= self.ub[i] - self.abstol:
+            return self.ub[i]
+        return None
+
+    def order(self, reactions):
+        """ Sorts reactions by decreasing range not yet observed, so that solves are more
+        likely to find solutions reaching the bounds of the following reactions.
+        """
+        def unexplored(r_id):
+            i = self.index[r_id]
+            return (self.ub[i] - self.maximum[i]) + (self.minimum[i] - self.lb[i])
+        return sorted(reactions, key=unexplored, reverse=True)
+
+
+def _reaction_bounds(sim, reactions, constraints):
+    bounds = dict()
+    for r_id in reactions:
+        if r_id in constraints:
+            x = constraints[r_id]
+            bounds[r_id] = x if isinstance(x, tuple) else (x, x)
+        else:
+            bounds[r_id] = sim.get_reaction_bounds(r_id)
+    return bounds
+
+
+def _build_solver(sim, obj_frac=0.9, constraints=None, reactions=None):
+    """ Builds the FVA LP problem, constraining the objective to a fraction of its optimum.
+
+    :param sim: A Simulator instance
+    :param float obj_frac: The minimum fraction of the maximum objective value
+    :param dict constraints: Additional constraints
+    :param list reactions: Reactions whose primal values are tracked (optional)
+    :returns: A tuple (solver, constraints, tracker)
+    """
+    _constraints = dict(sim.environmental_conditions)
+    if constraints:
+        _constraints.update(constraints)
+
+    solver = solver_instance(sim)
+    tracker = None
+    if reactions is not None:
+        tracker = FluxRangeTracker(_reaction_bounds(sim, reactions, _constraints))
+
+    objective = sim.objective
+    target = solver.solve(objective, minimize=False, constraints=_constraints,
+                          get_values=tracker is not None, shadow_prices=False)
+    if target.status != Status.OPTIMAL:
+        if obj_frac > 0:
+            raise ValueError(f"Could not optimize the objective: {target.status.value}")
+    elif tracker is not None:
+        tracker.update(target.values)
+
+    if obj_frac > 0:
+        solver.add_constraint('obj', objective, '>', obj_frac * target.fobj)
+
+    return solver, _constraints, tracker
+
+
+def _variability(solver, r_id, constraints, tracker=None):
+    """ Computes the minimum and maximum flux of a reaction.
+
+    :returns: A tuple (r_id, minimum, maximum)
+    """
+    row = [r_id, None, None]
+    for i, minimize in ((1, True), (2, False)):
+        if tracker is not None:
+            value = tracker.attained(r_id, minimize)
+            if value is not None:
+                row[i] = value
+                tracker.skipped += 1
+                continue
+        solution = solver.solve({r_id: 1}, minimize=minimize, constraints=constraints,
+                                get_values=tracker is not None, shadow_prices=False)
+        if solution.status == Status.OPTIMAL:
+            row[i] = solution.fobj
+            if tracker is not None:
+                tracker.update(solution.values)
+        elif solution.status in (Status.UNBOUNDED, Status.INF_OR_UNB):
+            row[i] = -inf if minimize else inf
+        elif solution.status == Status.INFEASIBLE:
+            warn('Infeasible solution status')
+        else:
+            warn('Unknown solution status')
+    return tuple(row)
+
+
+def _batch_variability(solver, reactions, constraints):
+    """ Computes the minimum and maximum flux of reactions in a single batch of solves,
+    applying the constraints only once.
+
+    :returns: A list of (r_id, minimum, maximum) tuples
+    """
+    n = len(reactions)
+    fobj, status, _ = solver.solve_objectives(list(reactions) * 2, [True] * n + [False] * n,
+                                              constraints=constraints)
+    rows = [[r_id, None, None] for r_id in reactions]
+    for k in range(2 * n):
+        row, i, minimize = rows[k % n], 1 + k // n, k < n
+        if status[k] == Status.OPTIMAL:
+            row[i] = fobj[k]
+        elif status[k] in (Status.UNBOUNDED, Status.INF_OR_UNB):
+            row[i] = -inf if minimize else inf
+        elif status[k] == Status.INFEASIBLE:
+            warn('Infeasible solution status')
+        else:
+            warn('Unknown solution status')
+    return [tuple(row) for row in rows]
+
+
+def _run(solver, reactions, constraints, tracker=None):
+    if tracker is None:
+        yield from _batch_variability(solver, reactions, constraints)
+        return
+    reactions = tracker.order(reactions)
+    for r_id in reactions:
+        yield _variability(solver, r_id, constraints, tracker)
+
+
+_worker_solver = None
+_worker_constraints = None
+_worker_tracker = None
+
+
+def _init_worker(sim, obj_frac, constraints, reactions, policy=None):
+    """ Builds the worker LP problem, which is kept for all its chunks. """
+    global _worker_solver, _worker_constraints, _worker_tracker
+    if policy is not None:
+        policy.apply()
+    _worker_solver, _worker_constraints, _worker_tracker = _build_solver(sim, obj_frac, constraints, reactions)
+
+
+def _run_chunk(reactions):
+    tracker = _worker_tracker
+    skipped = tracker.skipped if tracker else 0
+    rows = list(_run(_worker_solver, reactions, _worker_constraints, tracker))
+    return rows, (tracker.skipped - skipped if tracker else 0)
+
+
+def fva_rows(model, reactions=None, obj_frac=0.9, constraints=None, jobs=None, chunk_size=None,
+             skip_solves=True, stats=None):
+    """ Runs a Flux Variability Analysis (FVA), yielding (reaction, minimum, maximum)
+    rows as they are computed.
+
+    Rows are not necessarily yielded in the order of the reactions, which are sorted
+    to favour skipping solves and, when running in parallel, yielded as chunks finish.
+
+    :param model: A COBRApy or REFRAMED model, or an instance of Simulator.
+    :param list reactions: List of reactions to analyze (default: all).
+    :param float obj_frac: The minimum fraction of the maximum objective value (default 0.9).
+    :param dict constraints: Additional constraints (optional).
+    :param int jobs: The number of worker processes (default: 1).
+    :param int chunk_size: The number of reactions sent to a worker at a time.\
+        By default, reactions are split into four chunks per worker.
+    :param bool skip_solves: Skip solves whose result is already known from previous primal solutions\
+        (default: True).
+    :param dict stats: A dictionary updated with the number of 'solves' and 'skipped' solves (optional).
+    """
+    sim = get_simulator(model)
+    reactions = sim.reactions if reactions is None else list(reactions)
+    tracked = reactions if skip_solves else None
+    skipped = 0
+
+    if not jobs or jobs <= 1 or len(reactions) <= 1:
+        solver, _constraints, tracker = _build_solver(sim, obj_frac, constraints, tracked)
+        yield from _run(solver, reactions, _constraints, tracker)
+        skipped = tracker.skipped if tracker else 0
+    else:
+        jobs = min(jobs, len(reactions))
+        if not chunk_size:
+            chunk_size = ceil(len(reactions) / (4 * jobs))
+        chunks = [reactions[i:i + chunk_size] for i in range(0, len(reactions), chunk_size)]
+
+        with multiprocessing.Pool(processes=jobs, initializer=_init_worker,
+                                  initargs=(sim, obj_frac, constraints, tracked, WorkerPolicy(jobs))) as pool:
+            for rows, n in pool.imap_unordered(_run_chunk, chunks):
+                skipped += n
+                yield from rows
+
+    if stats is not None:
+        stats['solves'] = stats.get('solves', 0) + 2 * len(reactions) - skipped
+        stats['skipped'] = stats.get('skipped', 0) + skipped
+
+
+def FVA(model, reactions=None, obj_frac=0.9, constraints=None, jobs=None, chunk_size=None, format='dict',
+        skip_solves=True, stats=None):
+    """ Flux Variability Analysis (FVA).
+
+    :param model: A COBRApy or REFRAMED model, or an instance of Simulator.
+    :param list reactions: List of reactions to analyze (default: all).
+    :param float obj_frac: The minimum fraction of the maximum objective value (default 0.9).\
+        A value of 0.85 for instance means that the objective has to be at least at 85% percent of its maximum.
+    :param dict constraints: Additional constraints (optional).
+    :param int jobs: The number of worker processes (default: 1).
+    :param int chunk_size: The number of reactions sent to a worker at a time (optional).
+    :param format: The return format: 'dict' returns a dictionary, 'df' a data frame and 'array'\
+        a (reactions x 2) array of minimum and maximum values, following the order of the reactions.
+    :param bool skip_solves: Skip solves whose result is already known from previous primal solutions\
+        (default: True).
+    :param dict stats: A dictionary updated with the number of 'solves' and 'skipped' solves (optional).
+    :returns: The flux variation ranges.
+    """
+    sim = get_simulator(model)
+    reactions = sim.reactions if reactions is None else list(reactions)
+
+    variability = {r_id: [None, None] for r_id in reactions}
+    for r_id, minimum, maximum in fva_rows(sim, reactions, obj_frac=obj_frac, constraints=constraints,
+                                           jobs=jobs, chunk_size=chunk_size, skip_solves=skip_solves,
+                                           stats=stats):
+        variability[r_id] = [minimum, maximum]
+
+    if format == 'array':
+        return np.array([[np.nan if x is None else x for x in variability[r_id]] for r_id in reactions],
+                        dtype=float)
+    elif format == 'df':
+        import pandas as pd
+        f = [[a, b, c] for a, [b, c] in variability.items()]
+        df = pd.DataFrame(f, columns=['Reaction ID', 'Minimum', 'Maximum'])
+        return df.set_index(df.columns[0])
+    return variability
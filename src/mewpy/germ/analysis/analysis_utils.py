@@ -1,6 +1,6 @@
 from collections import namedtuple
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Tuple, Union, Dict, Callable
+from typing import TYPE_CHECKING, Tuple, Union, Dict, Callable, Sequence, List
 
 from math import log, exp
 
@@ -71,6 +71,60 @@ def run_method_and_decode(method: 'LinearProblem',
     return objective_value, status
 
 
+def run_fva_and_decode(method: 'LinearProblem',
+                       reactions: Sequence[str],
+                       bounds: Dict[str, Tuple[float, float]],
+                       constraints: Dict[str, Tuple[float, float]] = None,
+                       skip_solves: bool = True,
+                       stats: Dict[str, int] = None,
+                       **kwargs) -> Dict[str, List[float]]:
+    """
+    It runs the minimization and maximization of each reaction, decoding the objective values returned by the solver.
+    Every primal solution holds feasible values for all reactions. Hence, a solve is skipped when the minimum
+    (maximum) value observed in previous solutions already attains the reaction lower (upper) bound.
+
+    :param method: the method to be run
+    :param reactions: the reactions to be minimized and maximized
+    :param bounds: the (lower, upper) bounds of the reactions, including the temporary constraints
+    :param constraints: alternative temporary constraints
+    :param skip_solves: skip solves whose result is already known from previous primal solutions (default: True)
+    :param stats: a dictionary updated with the number of 'solves' and 'skipped' solves (optional)
+    :param kwargs: additional arguments to be passed to the method
+    :return: a dictionary of reactions and their minimum and maximum values
+    """
+    from mewpy.cobra.variability import FluxRangeTracker
+
+    tracker = FluxRangeTracker({rxn: bounds[rxn] for rxn in reactions}) if skip_solves else None
+
+    result = {}
+    for rxn in reactions:
+        result[rxn] = []
+        for minimize in (True, False):
+            value = tracker.attained(rxn, minimize) if tracker is not None else None
+            if value is not None:
+                tracker.skipped += 1
+                result[rxn].append(float(value))
+                continue
+
+            solver_kwargs = {'linear': {rxn: 1.0},
+                             'minimize': minimize,
+                             'get_values': tracker is not None}
+            if constraints:
+                solver_kwargs['constraints'] = constraints
+
+            solution = method.optimize(to_solver=True, solver_kwargs=solver_kwargs, **kwargs)
+            objective_value, _ = decode_solver_solution(solution=solution)
+            if tracker is not None and solution.status == Status.OPTIMAL:
+                tracker.update(solution.values)
+            result[rxn].append(objective_value)
+
+    if stats is not None:
+        skipped = tracker.skipped if tracker is not None else 0
+        stats['solves'] = stats.get('solves', 0) + 2 * len(reactions) - skipped
+        stats['skipped'] = stats.get('skipped', 0) + skipped
+    return result
+
+
 # ---------------------------------
 # CoRegFlux utils
 # ---------------------------------
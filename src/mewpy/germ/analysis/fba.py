@@ -1,10 +1,13 @@
-from typing import Union, Dict
+from typing import Union, Dict, TYPE_CHECKING
 
-from mewpy.germ.lp import ConstraintContainer, VariableContainer, LinearProblem
+from mewpy.germ.lp import ConstraintContainer, VariableContainer, LinearProblem, ChangeSet
 from mewpy.germ.models import Model, MetabolicModel, RegulatoryModel
 from mewpy.solvers.solution import Solution
 from mewpy.solvers.solver import VarType, Solver
 
+if TYPE_CHECKING:
+    from mewpy.germ.variables import Reaction, Metabolite
+
 
 class FBA(LinearProblem):
 
@@ -30,27 +33,33 @@ class FBA(LinearProblem):
         """
         super().__init__(model=model, solver=solver, build=build, attach=attach)
 
+    def _gene_state(self) -> Dict[str, float]:
+        return {gene.id: max(gene.coefficients) for gene in self.model.yield_genes()}
+
+    @staticmethod
+    def _reaction_variable(reaction: 'Reaction', gene_state: Dict[str, float]) -> VariableContainer:
+        if reaction.gpr.is_none:
+            lb, ub = reaction.bounds
+
+        else:
+            res = reaction.gpr.evaluate(values=gene_state)
+            if not res:
+                lb, ub = 0.0, 0.0
+            else:
+                lb, ub = reaction.bounds
+
+        return VariableContainer(name=reaction.id, sub_variables=[reaction.id],
+                                 lbs=[float(lb)], ubs=[float(ub)], variables_type=[VarType.CONTINUOUS])
+
     def _build_mass_constraints(self):
-        gene_state = {gene.id: max(gene.coefficients) for gene in self.model.yield_genes()}
+        gene_state = self._gene_state()
 
         constraints = {metabolite.id: ConstraintContainer(name=metabolite.id, lbs=[0.0], ubs=[0.0], coefs=[{}])
                        for metabolite in self.model.yield_metabolites()}
         variables = {}
 
         for reaction in self.model.yield_reactions():
-            if reaction.gpr.is_none:
-                lb, ub = reaction.bounds
-
-            else:
-                res = reaction.gpr.evaluate(values=gene_state)
-                if not res:
-                    lb, ub = 0.0, 0.0
-                else:
-                    lb, ub = reaction.bounds
-
-            variable = VariableContainer(name=reaction.id, sub_variables=[reaction.id],
-                                         lbs=[float(lb)], ubs=[float(ub)], variables_type=[VarType.CONTINUOUS])
-            variables[reaction.id] = variable
+            variables[reaction.id] = self._reaction_variable(reaction, gene_state)
 
             for metabolite, stoichiometry in reaction.stoichiometry.items():
                 constraints[metabolite.id].coefs[0][reaction.id] = stoichiometry
@@ -59,6 +68,79 @@ class FBA(LinearProblem):
         self.add_constraints(*constraints.values())
         return
 
+    def _mass_constraint(self, metabolite: 'Metabolite', reactions: Dict[str, 'Reaction']) -> ConstraintContainer:
+        coef = {}
+
+        for reaction in metabolite.yield_reactions():
+            if reaction.id not in reactions:
+                continue
+
+            for reactant, stoichiometry in reaction.stoichiometry.items():
+                if reactant.id == metabolite.id:
+                    coef[reaction.id] = stoichiometry
+
+        return ConstraintContainer(name=metabolite.id, lbs=[0.0], ubs=[0.0], coefs=[coef])
+
+    def _update_mass_constraints(self, changes: ChangeSet) -> Dict[str, 'Reaction']:
+        """
+        It updates the reactions' variables and the mass balance constraints affected by the model changes.
+        Bounds changes only update the reactions' variables,
+        whereas added or removed reactions and metabolites also update the mass balance constraints.
+        :param changes: the model changes
+        :return: the reactions whose variables were updated
+        """
+        reactions = {}
+        metabolites = {}
+
+        for variable in changes.bounds.values():
+            if variable.is_reaction():
+                reactions[variable.id] = variable
+
+            if variable.is_gene():
+                reactions.update(variable.reactions)
+
+        for variable in (*changes.added.values(), *changes.removed.values()):
+            if variable.is_reaction():
+                reactions[variable.id] = variable
+                metabolites.update((metabolite.id, metabolite) for metabolite in variable.yield_metabolites())
+
+            if variable.is_metabolite():
+                metabolites[variable.id] = variable
+
+            if variable.is_gene():
+                reactions.update(variable.reactions)
+
+        if not reactions and not metabolites:
+            return {}
+
+        model_reactions = self.model.reactions
+        gene_state = self._gene_state()
+
+        updated = {}
+        for rxn_id in reactions:
+            reaction = model_reactions.get(rxn_id)
+
+            if reaction is None:
+                if rxn_id in changes.removed and rxn_id in self._variables:
+                    self.remove_variables(self._variables[rxn_id])
+                continue
+
+            self.add_variables(self._reaction_variable(reaction, gene_state))
+            updated[rxn_id] = reaction
+
+        model_metabolites = self.model.metabolites
+        for met_id in metabolites:
+            metabolite = model_metabolites.get(met_id)
+
+            if metabolite is None:
+                if met_id in self._constraints:
+                    self.remove_constraints(self._constraints[met_id])
+                continue
+
+            self.add_constraints(self._mass_constraint(metabolite, model_reactions))
+
+        return updated
+
     def _build(self):
         """
         It builds the linear problem from the model. The linear problem is built from the model
@@ -74,6 +156,22 @@ class FBA(LinearProblem):
 
         return
 
+    def _apply_changes(self, changes: ChangeSet) -> bool:
+        """
+        It applies the model changes to the reactions' variables and mass balance constraints.
+        :param changes: the model changes
+        :return: whether the changes were applied
+        """
+        if not self.model.is_metabolic():
+            return False
+
+        self._update_mass_constraints(changes)
+
+        if changes.added or changes.removed:
+            self._linear_objective = {var.id: value for var, value in self.model.objective.items()}
+
+        return True
+
     def _optimize(self, solver_kwargs: Dict = None, **kwargs) -> Solution:
         """
         It optimizes the linear problem. The linear problem is solved by the solver interface.
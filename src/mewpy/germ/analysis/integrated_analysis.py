@@ -1,4 +1,3 @@
-from collections import defaultdict
 from multiprocessing import Pool
 from typing import Union, TYPE_CHECKING, Dict, Tuple, Optional, Sequence
 
@@ -11,8 +10,9 @@ from cobra.util import ProcessPool
 import numpy as np
 
 from mewpy.util.constants import ModelConstants
+from mewpy.util.resources import WorkerPolicy, set_native_threads
 from mewpy.germ.analysis.analysis_utils import decode_solver_solution
-from .analysis_utils import run_method_and_decode
+from .analysis_utils import run_method_and_decode, run_fva_and_decode
 from .metabolic_analysis import fva
 from .coregflux import CoRegFlux
 from .prom import PROM
@@ -152,7 +152,9 @@ def ifva(model: Union['Model', 'MetabolicModel', 'RegulatoryModel'],
          objective: Union[str, Dict[str, float]] = None,
          constraints: Dict[str, Tuple[float, float]] = None,
          initial_state: Dict[str, float] = None,
-         method: str = 'srfba') -> pd.DataFrame:
+         method: str = 'srfba',
+         skip_solves: bool = True,
+         stats: Dict[str, int] = None) -> pd.DataFrame:
     """
     Integrated Flux Variability Analysis (iFVA) of an integrated Metabolic-Regulatory model.
     iFVA is a flux variability analysis method that considers:
@@ -174,10 +176,13 @@ def ifva(model: Union['Model', 'MetabolicModel', 'RegulatoryModel'],
     :param constraints: additional constraints to be added to the model. If None, no additional constraints are added
     :param method: the method to be used for the simulation. Available methods: 'rfba', 'srfba'. Default: 'srfba'
     :param initial_state: the initial state of the model. If None, the default initial state is used (default: None)
+    :param skip_solves: skip solves whose result is already known from previous primal solutions (default: True)
+    :param stats: a dictionary updated with the number of 'solves' and 'skipped' solves (optional)
     :return: a DataFrame with the results of the simulation
     """
     if not reactions:
         reactions = model.reactions.keys()
+    reactions = list(reactions)
 
     if objective:
         if hasattr(objective, 'keys'):
@@ -200,21 +205,26 @@ def ifva(model: Union['Model', 'MetabolicModel', 'RegulatoryModel'],
     print("FVA objective value = ",objective_value)
     lp = LP(model).build()
 
-    result = defaultdict(list)
-    for rxn in reactions:
-        min_val, _ = run_method_and_decode(method=lp, objective={rxn: 1.0}, initial_state=initial_state, constraints=constraints, minimize=True)
-        result[rxn].append(min_val)
-
-        max_val, _ = run_method_and_decode(method=lp, objective={rxn: 1.0}, initial_state=initial_state, constraints=constraints, minimize=False)
-        result[rxn].append(max_val)
+    bounds = {rxn: constraints.get(rxn, model.reactions[rxn].bounds) for rxn in reactions}
+    result = run_fva_and_decode(method=lp, reactions=reactions, bounds=bounds, constraints=constraints,
+                                skip_solves=skip_solves, stats=stats, initial_state=initial_state)
 
     return pd.DataFrame.from_dict(data=result, orient='index', columns=['minimum', 'maximum'])
 
-def _init_worker(model_path, trn_path, method='srfba'):
-    """Initialize based on a model identifier instead of the model object itself."""
+def _init_worker(model_path, trn_path, method='srfba', lp=None, policy=None):
+    """Initialize based on a model identifier instead of the model object itself.
+    A built (pickled) linear problem can be given instead, which is faster than reading and building the model.
+    The worker policy, if given, limits the threads of the solver.
+    """
     from mewpy.io import Reader, Engines, read_model
 
     global _method
+    if policy is not None:
+        policy.apply()
+    if lp is not None:
+        set_native_threads(lp.solver.problem)
+        _method = lp
+        return
     print("_init_worker")
     print("Reading model...")
     sbml_fname = model_path #f"..\\results\\SIRT1\\diet_models\\Recon3D_Western_diet.xml"
@@ -334,7 +344,10 @@ def ifva_parallel(model: Union['Model', 'MetabolicModel', 'RegulatoryModel'],
     print("chunk_size=",chunk_size)
     print("num_processes=",num_processes)
     # Create a ProcessPool instance
-    with Pool(processes=num_processes, initializer=_init_worker, initargs=(model_path,trn_path,)) as pool:
+    # without model files, the workers receive the built linear problem
+    worker_lp = _lp if model_path is None else None
+    with Pool(processes=num_processes, initializer=_init_worker,
+              initargs=(model_path, trn_path, method, worker_lp, WorkerPolicy(num_processes))) as pool:
         print("with Pool...")
         # Use pool.map() instead of pool.imap_unordered() for ordered results
         for rxn_id, value_min, value_max in pool.imap_unordered(process_reaction, args_list, chunksize=chunk_size):
@@ -579,12 +592,16 @@ def isingle_reaction_deletion(model: Union['Model', 'MetabolicModel', 'Regulator
     num_processes = min(num_processes,num_reactions)
     chunk_size = num_reactions // num_processes
 
-    #LP = INTEGRATED_ANALYSIS_METHODS[method]
-    #lp = LP(model).build()
+    # without model files, the workers receive the built linear problem
+    lp = None
+    if model_path is None:
+        LP = INTEGRATED_ANALYSIS_METHODS[method]
+        lp = LP(model).build()
     args_list = [(rxn, constraints, initial_state) for rxn in reactions]
 
     result = {}
-    with Pool(processes=num_processes, initializer=_init_worker, initargs=(model_path,trn_path,)) as pool:
+    with Pool(processes=num_processes, initializer=_init_worker,
+              initargs=(model_path, trn_path, method, lp, WorkerPolicy(num_processes))) as pool:
 
         for rxn, solution, status in pool.imap_unordered(process_isingle_reaction, args_list, chunksize=chunk_size):
             result[rxn] = [solution, status]
@@ -1,10 +1,9 @@
-from collections import defaultdict
 from typing import Union, TYPE_CHECKING, Dict, Tuple, Sequence, Optional
 
 import pandas as pd
 
 from mewpy.util.constants import ModelConstants
-from .analysis_utils import run_method_and_decode
+from .analysis_utils import run_method_and_decode, run_fva_and_decode
 from .fba import FBA
 from .pfba import pFBA
 
@@ -71,7 +70,9 @@ def fva(model: Union['Model', 'MetabolicModel', 'RegulatoryModel'],
         fraction: float = 1.0,
         reactions: Sequence[str] = None,
         objective: Union[str, Dict[str, float]] = None,
-        constraints: Dict[str, Tuple[float, float]] = None) -> pd.DataFrame:
+        constraints: Dict[str, Tuple[float, float]] = None,
+        skip_solves: bool = True,
+        stats: Dict[str, int] = None) -> pd.DataFrame:
     """
     Flux Variability Analysis (FVA) of a metabolic model.
     FVA is a method to determine the minimum and maximum fluxes for each reaction in a metabolic model.
@@ -84,10 +85,13 @@ def fva(model: Union['Model', 'MetabolicModel', 'RegulatoryModel'],
     :param reactions: the reactions to be simulated (default: all reactions in the model)
     :param objective: the objective function to be used for the simulation (default: the default objective)
     :param constraints: additional constraints to be used for the simulation (default: None)
+    :param skip_solves: skip solves whose result is already known from previous primal solutions (default: True)
+    :param stats: a dictionary updated with the number of 'solves' and 'skipped' solves (optional)
     :return: a pandas DataFrame with the minimum and maximum fluxes for each reaction
     """
     if not reactions:
         reactions = model.reactions.keys()
+    reactions = list(reactions)
 
     if not constraints:
         constraints = {}
@@ -107,13 +111,9 @@ def fva(model: Union['Model', 'MetabolicModel', 'RegulatoryModel'],
 
     fba = FBA(model).build()
 
-    result = defaultdict(list)
-    for rxn in reactions:
-        min_val, _ = run_method_and_decode(method=fba, objective={rxn: 1.0}, constraints=constraints, minimize=True)
-        result[rxn].append(min_val)
-
-        max_val, _ = run_method_and_decode(method=fba, objective={rxn: 1.0}, constraints=constraints, minimize=False)
-        result[rxn].append(max_val)
+    bounds = {rxn: constraints.get(rxn, model.reactions[rxn].bounds) for rxn in reactions}
+    result = run_fva_and_decode(method=fba, reactions=reactions, bounds=bounds, constraints=constraints,
+                                skip_solves=skip_solves, stats=stats)
 
     return pd.DataFrame.from_dict(data=result, orient='index', columns=['minimum', 'maximum'])
 
@@ -1,7 +1,7 @@
 from typing import Union, Dict
 
 from mewpy.germ.analysis import FBA
-from mewpy.germ.lp import ConstraintContainer, VariableContainer
+from mewpy.germ.lp import ConstraintContainer, VariableContainer, ChangeSet
 from mewpy.germ.models import Model, MetabolicModel, RegulatoryModel
 from mewpy.solvers.solution import Solution, Status
 from mewpy.solvers.solver import VarType, Solver
@@ -122,6 +122,19 @@ class pFBA(FBA):
 
         return
 
+    def _apply_changes(self, changes: ChangeSet) -> bool:
+        """
+        It applies the model changes to the reactions' variables and mass balance constraints.
+        The pFBA constraints are built again, as they depend on the FBA solution.
+        :param changes: the model changes
+        :return: whether the changes were applied
+        """
+        if not super()._apply_changes(changes):
+            return False
+
+        self._build_pfba_constrains()
+        return True
+
     def _optimize(self, fraction: float = None, solver_kwargs: Dict = None, **kwargs) -> Solution:
         """
         It optimizes the linear problem. The linear problem is solved by the solver interface.
@@ -1,3 +1,4 @@
+from math import isnan
 from typing import Union, Dict, TYPE_CHECKING, Any, Sequence, Tuple
 
 import pandas as pd
@@ -13,25 +14,6 @@ if TYPE_CHECKING:
     from mewpy.germ.models import Model, MetabolicModel, RegulatoryModel
 
 
-def _run_and_decode_solver(lp,
-                           additional_constraints: Dict[str, Tuple[float, float]] = None,
-                           **kwargs):
-    if not additional_constraints:
-        additional_constraints = {}
-
-    if not kwargs:
-        kwargs = {}
-
-    if 'constraints' in kwargs:
-        kwargs['constraints'].update(additional_constraints)
-
-    solution = lp.solver.solve(**kwargs)
-    if solution.status == Status.OPTIMAL:
-        return solution.fobj
-    else:
-        return
-
-
 class PROMEXTENDED(FBA):
 
     def __init__(self,
@@ -71,22 +53,21 @@ class PROMEXTENDED(FBA):
         reference = reference.values.copy()
         reference_constraints = {key: (reference[key] * 0.99, reference[key])
                                  for key in self._linear_objective}
+        constraints = solver_kwargs.get('constraints')
+        if constraints is not None:
+            constraints.update(reference_constraints)
+
+        # fva of the reaction at fraction of 0.99 (for wild-type growth rate).
+        # The reactions' problems are solved in a single batch, starting from the wild-type basis
+        reactions = list(self.model.reactions)
+        n = len(reactions)
+        fobj, _, _ = self.solver.solve_objectives(reactions * 2, [True] * n + [False] * n,
+                                                  constraints=constraints)
+        fobj = [None if isnan(x) else x for x in fobj]
 
-        # fva of the reaction at fraction of 0.99 (for wild-type growth rate)
         rates = {}
-        for reaction in self.model.reactions:
-            min_rxn = _run_and_decode_solver(self,
-                                             additional_constraints=reference_constraints,
-                                             **{**solver_kwargs,
-                                                'get_values': False,
-                                                'linear': {reaction: 1},
-                                                'minimize': True})
-            max_rxn = _run_and_decode_solver(self,
-                                             additional_constraints=reference_constraints,
-                                             **{**solver_kwargs,
-                                                'get_values': False,
-                                                'linear': {reaction: 1},
-                                                'minimize': False})
+        for i, reaction in enumerate(reactions):
+            min_rxn, max_rxn = fobj[i], fobj[i + n]
 
             reference_rate = reference[reaction]
 
@@ -296,9 +277,9 @@ class PROMEXTENDED(FBA):
             - pool_gap: The gap between the best solution and the worst solution in the pool. Default: None
         :return: A KOSolution instance or a list of SolverSolution instance if to_solver is True.
         """
-        # build solver if out of sync
+        # update solver if out of sync
         if not self.synchronized:
-            self.build()
+            self.sync()
 
         if not initial_state:
             initial_state = {}
@@ -2,6 +2,7 @@ from typing import Union, Dict, Tuple, List
 from warnings import warn
 
 from mewpy.germ.analysis import FBA
+from mewpy.germ.lp import ChangeSet
 from mewpy.solvers import Solution
 from mewpy.solvers.solver import Solver
 from mewpy.germ.models import Model, MetabolicModel, RegulatoryModel
@@ -83,6 +84,26 @@ class RFBA(FBA):
             self._linear_objective = {var.id: value for var, value in self.model.objective.items()}
             self._minimize = False
 
+    def _apply_changes(self, changes: ChangeSet) -> bool:
+        """
+        It applies the model changes to the reactions' variables and mass balance constraints.
+        :param changes: the model changes
+        :return: whether the changes were applied
+        """
+        if not super()._apply_changes(changes):
+            return False
+
+        if changes.added or changes.removed:
+            self._regulatory_reactions = [rxn.id
+                                          for rxn in self.model.yield_reactions()
+                                          if rxn.is_regulator()]
+
+            self._regulatory_metabolites = [met.id
+                                            for met in self.model.yield_metabolites()
+                                            if met.is_regulator()]
+
+        return True
+
     def initial_state(self, state: Dict[str, float] = None) -> Dict[str, float]:
         """
         Method responsible for retrieving the initial state of the model.
@@ -507,9 +528,9 @@ class RFBA(FBA):
         :param iterations: The maximum number of iterations. Default: 10
         :return: A DynamicSolution instance or a list of solver Solutions if to_solver is True.
         """
-        # build solver if out of sync
+        # update solver if out of sync
         if not self.synchronized:
-            self.build()
+            self.sync()
 
         if not solver_kwargs:
             solver_kwargs = {}
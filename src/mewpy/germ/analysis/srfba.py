@@ -1,10 +1,11 @@
 from functools import partial
+from itertools import chain
 from typing import Union, Dict, TYPE_CHECKING
 
 from mewpy.util.constants import ModelConstants
 
 from mewpy.germ.analysis import pFBA
-from mewpy.germ.lp import ConstraintContainer, VariableContainer, concat_constraints, integer_coefficients
+from mewpy.germ.lp import ConstraintContainer, VariableContainer, ChangeSet, concat_constraints, integer_coefficients
 from mewpy.germ.solution import ModelSolution
 from mewpy.germ.models import Model, MetabolicModel, RegulatoryModel
 from mewpy.solvers import Solution
@@ -843,6 +844,68 @@ class SRFBA(pFBA):
             self._linear_objective = {var.id: value for var, value in self.model.objective.items()}
             self._minimize = False
 
+    def _apply_changes(self, changes: ChangeSet) -> bool:
+        """
+        It applies bounds changes to the linear problem for SRFBA, namely to the reactions' variables,
+        to the GPR constraints of the affected reactions and to the interaction constraints of the affected
+        regulators and targets.
+        Added or removed variables, as well as changes of the default bounds of the model reactions,
+        require building the linear problem from scratch.
+        :param changes: the model changes
+        :return: whether the changes were applied
+        """
+        if changes.added or changes.removed:
+            return False
+
+        if not (self.model.is_metabolic() and self.model.is_regulatory()):
+            return False
+
+        # the GPR constraints of all reactions depend on the default bounds
+        default_lb, default_ub = self._model_default_lb, self._model_default_ub
+        if self.model_default_lb != default_lb or self.model_default_ub != default_ub:
+            return False
+
+        reactions = self._update_mass_constraints(changes)
+
+        variables = []
+        constraints = []
+        for reaction in reactions.values():
+            gpr_variables, gpr_constraints = self.gpr_constraint(reaction)
+            variables.extend(gpr_variables)
+            constraints.extend(gpr_constraints)
+
+        self.add_variables(*variables)
+        self.add_constraints(*constraints)
+
+        # interaction constraints are added last, as in the build.
+        # Note that the coefficients of metabolites are the bounds of their exchange reactions
+        exchanged = (metabolite for reaction in reactions.values() if reaction.boundary
+                     for metabolite in reaction.yield_metabolites())
+
+        interactions = {}
+        for variable in chain(changes.bounds.values(), reactions.values(), exchanged):
+            if variable.is_regulator():
+                interactions.update(variable.interactions)
+
+            if variable.is_target() and variable.interaction is not None:
+                interactions[variable.interaction.id] = variable.interaction
+
+        model_interactions = self.model.interactions
+
+        variables = []
+        constraints = []
+        for interaction in interactions.values():
+            if interaction.id not in model_interactions:
+                continue
+
+            interaction_variables, interaction_constraints = self.interaction_constraint(interaction)
+            variables.extend(interaction_variables)
+            constraints.extend(interaction_constraints)
+
+        self.add_variables(*variables)
+        self.add_constraints(*constraints)
+        return True
+
     def _optimize(self,
                   to_solver: bool = False,
                   solver_kwargs: Dict = None,
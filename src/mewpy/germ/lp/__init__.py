@@ -1,3 +1,3 @@
 from .linear_problem import LinearProblem
 from .linear_containers import VariableContainer, ConstraintContainer, concat_constraints
-from .linear_utils import integer_coefficients
+from .linear_utils import integer_coefficients, ChangeSet
@@ -1,13 +1,14 @@
 from abc import abstractmethod
 from typing import Union, TYPE_CHECKING, Tuple, Dict, Any
 
-from numpy import zeros
+import numpy as np
+from scipy.sparse import csr_matrix
 
 from mewpy.germ.solution import ModelSolution
 from mewpy.solvers.solution import Solution
 from mewpy.solvers.solver import Solver
 from .linear_containers import ConstraintContainer, VariableContainer
-from .linear_utils import LinkedList, Node, get_solver_instance
+from .linear_utils import LinkedList, Node, ChangeSet, get_solver_instance
 
 if TYPE_CHECKING:
     from mewpy.germ.models import Model, MetabolicModel, RegulatoryModel
@@ -75,6 +76,15 @@ class LinearProblem:
         # one to one indexing of all variables
         self._sub_cols = LinkedList()
 
+        # matrix and bounds arrays, which are built on demand and kept until the problem changes
+        self._cache = {}
+
+        # model changes notified since the last build. If None, the linear problem must be built from scratch
+        self._changes = None
+
+        # variables and constraints replaced while applying model changes, along with their previous state
+        self._journal = None
+
         # Holding constraints and variables objects
         self._constraints = {}
         self._variables = {}
@@ -222,26 +232,35 @@ class LinearProblem:
     @property
     def matrix(self):
         """
-        The linear problem matrix
-        :return: a matrix as numpy array
+        The linear problem matrix. Rows follow the order of the constraints and columns the order of the sub-variables
+        :return: a matrix as scipy sparse matrix (CSR)
         """
-        return self._get_matrix()
+        if 'matrix' not in self._cache:
+            self._cache['matrix'] = self._get_matrix()
+
+        return self._cache['matrix']
 
     @property
     def bounds(self):
         """
         The linear problem bounds
-        :return: bounds as list of tuples
+        :return: bounds as numpy array of shape (n_columns, 2)
         """
-        return self.get_bounds(as_list=True)
+        if 'bounds' not in self._cache:
+            self._cache['bounds'] = self._get_bounds_array(self._variables.values())
+
+        return self._cache['bounds']
 
     @property
     def b_bounds(self):
         """
         The linear problem b bounds (constraints bounds)
-        :return: b bounds as list of tuples
+        :return: b bounds as numpy array of shape (n_rows, 2)
         """
-        return self.get_bounds(b_bounds=True, as_list=True)
+        if 'b_bounds' not in self._cache:
+            self._cache['b_bounds'] = self._get_bounds_array(self._constraints.values())
+
+        return self._cache['b_bounds']
 
     @property
     def shape(self):
@@ -266,7 +285,17 @@ class LinearProblem:
         if variables or constraints:
             self._solver = get_solver_instance(self._initial_solver)
 
-        if variables:
+        if variables and constraints:
+            # variables and constraints are loaded in bulk
+            var_ids, var_types = self._columns()
+            bounds = self.bounds
+            matrix, row_ids, senses, rhs = self._solver_rows()
+
+            self.solver.load_matrix(matrix, bounds[:, 0].tolist(), bounds[:, 1].tolist(), var_ids, row_ids,
+                                    senses=senses, rhs=rhs, vartypes=var_types)
+            self.solver.update()
+
+        elif variables:
             for variable in self._variables.values():
 
                 # Using mewpy/reframed solver interface ...
@@ -275,26 +304,13 @@ class LinearProblem:
 
             self.solver.update()
 
-        if constraints:
-            for i, constraint in enumerate(self._constraints.values()):
-
-                # Using mewpy/reframed solver interface ...
-                for j, (coef, lb, ub) in constraint.items():
-
-                    cnt_id = str(i + j)
-
-                    if lb == ub:
-                        rhs = lb
-                        self.solver.add_constraint(constr_id=cnt_id, lhs=coef, sense='=', rhs=rhs, update=False)
+        elif constraints:
+            coefs = [coef for constraint in self._constraints.values() for coef in constraint.coefs]
+            _, row_ids, senses, rhs = self._solver_rows()
 
-                    else:
-                        cnt_id_f = f'{cnt_id}_forward'
-                        rhs = lb
-                        self.solver.add_constraint(constr_id=cnt_id_f, lhs=coef, sense='>', rhs=rhs, update=False)
-
-                        cnt_id_r = f'{cnt_id}_reverse'
-                        rhs = ub
-                        self.solver.add_constraint(constr_id=cnt_id_r, lhs=coef, sense='<', rhs=rhs, update=False)
+            # Using mewpy/reframed solver interface ...
+            for row, cnt_id, sense, value in zip(self._row_positions(), row_ids, senses, rhs):
+                self.solver.add_constraint(constr_id=cnt_id, lhs=coefs[row], sense=sense, rhs=value, update=False)
 
             self.solver.update()
 
@@ -340,6 +356,8 @@ class LinearProblem:
         self._cols = LinkedList()
         self._rows = LinkedList()
         self._sub_cols = LinkedList()
+        self._cache = {}
+        self._changes = None
         self._constraints = {}
         self._variables = {}
         self._linear_objective = {}
@@ -373,9 +391,149 @@ class LinearProblem:
         self.build_solver(variables=True, constraints=True, objective=True)
 
         # update status
+        self._changes = ChangeSet()
+        self._synchronized = True
+        return self
+
+    # -----------------------------------------------------------------------------
+    # Synchronization
+    # -----------------------------------------------------------------------------
+    def _apply_changes(self, changes: ChangeSet) -> bool:
+        """
+        Concrete implementation of the incremental update of the linear problem.
+        It replaces, adds or removes the variables and constraints affected by the model changes,
+        using `add_variables`, `add_constraints`, `remove_variables` and `remove_constraints`.
+        The solver is then updated with these variables and constraints only.
+
+        :param changes: the model changes since the last synchronization
+        :return: whether the changes were applied. Otherwise, the linear problem is built from scratch
+        """
+        return False
+
+    def sync(self) -> 'LinearProblem':
+        """
+        It synchronizes the linear problem and the solver with the model.
+        The model changes notified since the last build are applied to the current solver,
+        if supported by the concrete linear problem. Otherwise, the linear problem is built from scratch.
+        :return: the linear problem
+        """
+        if self._synchronized:
+            return self
+
+        if self._changes is None or self._solver is None:
+            return self.build()
+
+        objective = (dict(self._linear_objective), dict(self._quadratic_objective), self._minimize)
+
+        self._journal = ({}, {})
+        try:
+            applied = self._apply_changes(self._changes) and self._apply_journal()
+
+        except Exception:
+            # the linear problem may be partially updated
+            self._changes = None
+            raise
+
+        finally:
+            self._journal = None
+
+        if not applied:
+            return self.build()
+
+        if (self._linear_objective, self._quadratic_objective, self._minimize) != objective:
+            self.build_solver(variables=False, constraints=False, objective=True)
+
+        self._changes = ChangeSet()
         self._synchronized = True
         return self
 
+    def _record(self, variable: str = None, constraint: str = None):
+        """
+        It records the state of a variable or constraint before being replaced or removed
+        while applying model changes. Only the first state is recorded, as it is the one loaded into the solver.
+        :param variable: the variable name
+        :param constraint: the constraint name
+        :return:
+        """
+        if self._journal is None:
+            return
+
+        variables, constraints = self._journal
+
+        if variable is not None and variable not in variables:
+            old = self._variables.get(variable)
+            variables[variable] = dict(old.items()) if old is not None else {}
+
+        if constraint is not None and constraint not in constraints:
+            old = self._constraints.get(constraint)
+            constraints[constraint] = self._constraint_rows(old) if old is not None else []
+
+    def _apply_journal(self) -> bool:
+        """
+        It updates the solver with the variables and constraints replaced, added or removed
+        while applying model changes
+        :return: whether the solver was updated. Otherwise, the solver must be built from scratch
+        """
+        variables, constraints = self._journal
+
+        solver_variables = set(self.solver.list_variables())
+
+        # new variables and bounds
+        for name, old in variables.items():
+            variable = self._variables.get(name)
+
+            if variable is None:
+                continue
+
+            for sub_variable, (lb, ub, var_type) in variable.items():
+
+                if sub_variable not in solver_variables:
+                    self.solver.add_variable(var_id=sub_variable, lb=lb, ub=ub, vartype=var_type, update=False)
+                    solver_variables.add(sub_variable)
+                    continue
+
+                old_lb, old_ub, old_type = old.get(sub_variable, (None, None, var_type))
+
+                if old_type != var_type:
+                    return False
+
+                if (old_lb, old_ub) != (lb, ub):
+                    self.solver.set_variable_bounds(sub_variable, lb, ub)
+
+        self.solver.update()
+
+        # constraints are replaced
+        to_remove = []
+        to_add = []
+        for name, old_rows in constraints.items():
+            constraint = self._constraints.get(name)
+            rows = self._constraint_rows(constraint) if constraint is not None else []
+
+            if rows == old_rows:
+                continue
+
+            to_remove.extend(row[0] for row in old_rows)
+            to_add.extend(rows)
+
+        if to_remove:
+            self.solver.remove_constraints(to_remove)
+
+        for cnt_id, coef, sense, rhs in to_add:
+            self.solver.add_constraint(constr_id=cnt_id, lhs=coef, sense=sense, rhs=rhs, update=False)
+
+        self.solver.update()
+
+        # variables that are not part of the linear problem anymore
+        stale = [sub_variable
+                 for old in variables.values()
+                 for sub_variable in old
+                 if sub_variable not in self._sub_cols and sub_variable in solver_variables]
+
+        if stale:
+            self.solver.remove_variables(stale)
+
+        return True
+
     # -----------------------------------------------------------------------------
     # Optimization
     # -----------------------------------------------------------------------------
@@ -420,9 +578,9 @@ class LinearProblem:
             - pool_gap: The gap between the best solution and the worst solution in the pool. Default: None
         :return: A ModelSolution instance or a SolverSolution instance if to_solver is True.
         """
-        # build solver if out of sync
+        # update solver if out of sync
         if not self.synchronized:
-            self.build()
+            self.sync()
 
         if not solver_kwargs:
             solver_kwargs = {}
@@ -440,15 +598,29 @@ class LinearProblem:
     # -----------------------------------------------------------------------------
     # Update - Observer interface
     # -----------------------------------------------------------------------------
-    def update(self):
+    def update(self, added=None, removed=None, bounds=None):
         """
         It updates the linear problem object by adding/removing variables and constraints
         Note that linear problems are not updated after each addition/removal of a variable or constraint to the model.
         This is done to avoid unnecessary updates of the solver. Instead, the update is done when the method
-        `build` is called. If required, this method is called by the simulation methods (e.g. fba, pfba, etc) before the
+        `sync` is called. If required, this method is called by the simulation methods (e.g. fba, pfba, etc) before the
         optimization process in the `optimize` method.
+
+        The model changes are collected in a change set, so that the solver can be updated incrementally.
+        If the changes are not described, the linear problem is built from scratch.
+        :param added: the variables added to the model
+        :param removed: the variables removed from the model
+        :param bounds: the variables whose bounds or coefficients changed
         :return:
         """
+        if self._changes is not None:
+
+            if added is None and removed is None and bounds is None:
+                self._changes = None
+
+            else:
+                self._changes.update(added=added, removed=removed, bounds=bounds)
+
         self._synchronized = False
 
     # -----------------------------------------------------------------------------
@@ -497,7 +669,11 @@ class LinearProblem:
     # Operations/Manipulations - add/remove variables and constraints
     # -----------------------------------------------------------------------------
     def add_constraints(self, *constraints: ConstraintContainer):
+        self._cache = {}
+
         for constraint in constraints:
+            self._record(constraint=constraint.name)
+
             if constraint.name in self._rows:
                 # The constraint is replaced, as the linear problem behaves like a set
                 # This also mimics the solver interface behavior
@@ -515,13 +691,20 @@ class LinearProblem:
             self._constraints[constraint.name] = constraint
 
     def remove_constraints(self, *constraints: ConstraintContainer):
+        self._cache = {}
+
         for constraint in constraints:
             if constraint.name in self._rows:
+                self._record(constraint=constraint.name)
                 self._rows.pop(constraint.name)
                 self._constraints.pop(constraint.name)
 
     def add_variables(self, *variables: VariableContainer):
+        self._cache = {}
+
         for variable in variables:
+            self._record(variable=variable.name)
+
             if variable.name in self._cols:
                 # The variable is replaced, as the linear problem behaves like a set
                 # This also mimics the solver interface behavior
@@ -542,8 +725,11 @@ class LinearProblem:
                 self._sub_cols.add(sub_node)
 
     def remove_variables(self, *variables: VariableContainer):
+        self._cache = {}
+
         for variable in variables:
             if variable.name in self._cols:
+                self._record(variable=variable.name)
 
                 self._cols.pop(variable.name)
                 self._variables.pop(variable.name)
@@ -619,9 +805,36 @@ class LinearProblem:
 
             return slc
 
+    def _columns(self):
+        """
+        It returns the sub-variables and their types in the order of the columns
+        :return: a tuple with the list of sub-variables and the list of variable types
+        """
+        if 'columns' not in self._cache:
+            var_ids = []
+            var_types = []
+
+            for variable in self._variables.values():
+                var_ids.extend(variable.sub_variables)
+                var_types.extend(variable.variables_type)
+
+            self._cache['columns'] = (var_ids, var_types)
+
+        return self._cache['columns']
+
     def _get_matrix(self):
 
-        matrix = zeros(self.shape)
+        var_ids, _ = self._columns()
+        columns = {var: m for m, var in enumerate(var_ids)}
+
+        # coefficients referring to a variable rather than a sub-variable belong to its last sub-variable
+        for name, variable in self._variables.items():
+            if name not in columns and variable.sub_variables:
+                columns[name] = columns[variable.sub_variables[-1]]
+
+        rows = []
+        cols = []
+        data = []
 
         n = 0
         for cnt in self._constraints.values():
@@ -630,16 +843,92 @@ class LinearProblem:
 
                 for var, value in coef.items():
 
-                    m = self.index(variable=var, as_int=True)
+                    m = columns.get(var)
 
                     if m is None:
                         continue
 
-                    matrix[n, m] = value
+                    rows.append(n)
+                    cols.append(m)
+                    data.append(value)
 
                 n += 1
 
-        return matrix
+        return csr_matrix((np.array(data, dtype=float), (np.array(rows, dtype=int), np.array(cols, dtype=int))),
+                          shape=(n, len(var_ids)))
+
+    @staticmethod
+    def _get_bounds_array(containers):
+
+        lbs = []
+        ubs = []
+
+        for container in containers:
+            lbs.extend(container.lbs)
+            ubs.extend(container.ubs)
+
+        bounds = np.empty((len(lbs), 2))
+        bounds[:, 0] = lbs
+        bounds[:, 1] = ubs
+
+        return bounds
+
+    def _row_positions(self):
+        """
+        It returns the constraint row of each solver row.
+        Equality constraints are added as a single row,
+        whereas other constraints are added as a forward (lower bound) and a reverse (upper bound) row
+        :return: an array with the index of the constraint row of each solver row
+        """
+        b_bounds = self.b_bounds
+        equality = b_bounds[:, 0] == b_bounds[:, 1]
+
+        return np.repeat(np.arange(len(equality)), np.where(equality, 1, 2))
+
+    @staticmethod
+    def _constraint_rows(constraint: ConstraintContainer):
+        """
+        It returns the solver rows of a constraint.
+        Rows are identified by the constraint name and the row index within the constraint
+        :param constraint: the constraint container
+        :return: a list of tuples with the row identifier, coefficients, sense and right-hand side
+        """
+        rows = []
+
+        for j, (coef, lb, ub) in constraint.items():
+            cnt_id = f'{constraint.name}_{j}'
+
+            if lb == ub:
+                rows.append((cnt_id, dict(coef), '=', lb))
+
+            else:
+                rows.append((f'{cnt_id}_forward', dict(coef), '>', lb))
+                rows.append((f'{cnt_id}_reverse', dict(coef), '<', ub))
+
+        return rows
+
+    def _solver_rows(self):
+        """
+        It returns the constraints of the solver
+        :return: a tuple with the solver matrix, the row identifiers, senses and right-hand sides
+        """
+        b_bounds = self.b_bounds
+        equality = b_bounds[:, 0] == b_bounds[:, 1]
+        positions = self._row_positions()
+
+        # the second solver row of a constraint row is the reverse one
+        reverse = np.zeros(len(positions), dtype=bool)
+        reverse[1:] = positions[1:] == positions[:-1]
+        forward = ~equality[positions] & ~reverse
+
+        senses = np.where(reverse, '<', np.where(forward, '>', '='))
+        rhs = np.where(reverse, b_bounds[positions, 1], b_bounds[positions, 0])
+
+        names = [f'{name}_{j}' for name, constraint in self._constraints.items() for j in range(len(constraint.coefs))]
+        row_ids = [f'{names[row]}_forward' if f else f'{names[row]}_reverse' if r else names[row]
+                   for row, f, r in zip(positions, forward, reverse)]
+
+        return self.matrix[positions], row_ids, senses.tolist(), rhs.tolist()
 
     def _get_b_bounds(self, as_list=False, as_tuples=False):
 
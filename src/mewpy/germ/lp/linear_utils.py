@@ -338,3 +338,51 @@ class LinkedList:
 
         self._tail = None
         self._head = None
+
+
+class ChangeSet:
+
+    def __init__(self):
+        """
+        The model variables added, removed or whose bounds (or coefficients) changed since the last
+        synchronization of a linear problem with its model.
+        Linear problems use the change set to update the solver incrementally, instead of building it again.
+        """
+        self.added = {}
+        self.removed = {}
+        self.bounds = {}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.bounds)
+
+    def __repr__(self):
+        return f'ChangeSet(added={list(self.added)}, removed={list(self.removed)}, bounds={list(self.bounds)})'
+
+    def update(self, added=None, removed=None, bounds=None):
+        """
+        It adds model changes to the change set
+        :param added: the variables added to the model
+        :param removed: the variables removed from the model
+        :param bounds: the variables whose bounds or coefficients changed
+        :return:
+        """
+        for variable in added or ():
+            self.removed.pop(variable.id, None)
+            self.added[variable.id] = variable
+
+        for variable in removed or ():
+            self.added.pop(variable.id, None)
+            self.removed[variable.id] = variable
+
+        for variable in bounds or ():
+            if variable is not None:
+                self.bounds[variable.id] = variable
+
+    def variables(self):
+        """
+        It yields all variables of the change set
+        :return: a generator of variables
+        """
+        yield from self.added.values()
+        yield from self.removed.values()
+        yield from self.bounds.values()
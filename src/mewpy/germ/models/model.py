@@ -737,7 +737,7 @@ class Model(Serializer, metaclass=MetaModel, factory=True):
                                        kwargs={'comprehensive': comprehensive,
                                                'history': history})
 
-        self.notify()
+        self.notify(added=variables)
 
     def remove(self,
                *variables: 'Variable',
@@ -772,7 +772,7 @@ class Model(Serializer, metaclass=MetaModel, factory=True):
                                        kwargs={'remove_orphans': remove_orphans,
                                                'history': history})
 
-        self.notify()
+        self.notify(removed=variables)
 
     def update(self, name: str = None):
         """
@@ -859,14 +859,19 @@ class Model(Serializer, metaclass=MetaModel, factory=True):
         """
         self.simulators.remove(simulator)
 
-    def notify(self):
+    def notify(self, added=None, removed=None, bounds=None):
         """
         It notifies all simulators with the recent changes in the model.
+        The changes allow simulators to update their solvers incrementally.
+        If the changes are not described, simulators are built from scratch.
 
+        :param added: the variables added to the model
+        :param removed: the variables removed from the model
+        :param bounds: the variables whose bounds or coefficients changed
         :return:
         """
         for simulator in self.simulators:
-            simulator.update()
+            simulator.update(added=added, removed=removed, bounds=bounds)
 
     # -----------------------------------------------------------------------------
     # History manager command pattern
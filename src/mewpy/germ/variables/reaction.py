@@ -18,7 +18,7 @@ def _bounds_setter(instance, old_bounds):
     instance._bounds = tuple(old_bounds)
 
     if instance.model:
-        instance.model.notify()
+        instance.model.notify(bounds=(instance,))
 
 
 class Reaction(Variable, variable_type='reaction', register=True, constructor=True, checker=True):
@@ -180,7 +180,7 @@ class Reaction(Variable, variable_type='reaction', register=True, constructor=Tr
         self._bounds = value
 
         if self.model:
-            self.model.notify()
+            self.model.notify(bounds=(self,))
 
     @stoichiometry.setter
     @recorder
@@ -364,7 +364,7 @@ class Reaction(Variable, variable_type='reaction', register=True, constructor=Tr
         self._bounds = value
 
         if self.model:
-            self.model.notify()
+            self.model.notify(bounds=(self,))
 
     @upper_bound.setter
     @recorder
@@ -384,7 +384,7 @@ class Reaction(Variable, variable_type='reaction', register=True, constructor=Tr
         self._bounds = (self.lower_bound, value)
 
         if self.model:
-            self.model.notify()
+            self.model.notify(bounds=(self,))
 
     # -----------------------------------------------------------------------------
     # Generators
@@ -547,7 +547,7 @@ class Reaction(Variable, variable_type='reaction', register=True, constructor=Tr
         self._bounds = (minimum_coefficient, minimum_coefficient)
 
         if self.model:
-            self.model.notify()
+            self.model.notify(bounds=(self,))
 
         if history:
             self.history.queue_command(undo_func=_bounds_setter,
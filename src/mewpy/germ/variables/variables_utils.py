@@ -26,6 +26,8 @@ def coefficients_setter(instance: 'Variable', value: Union[Tuple[float, float],
     else:
         raise ValueError('Invalid value for coefficients')
 
+    changed = [instance]
+
     # if it is a reaction, bounds must be set
     if hasattr(instance, '_bounds'):
         instance._bounds = value
@@ -34,9 +36,10 @@ def coefficients_setter(instance: 'Variable', value: Union[Tuple[float, float],
     elif hasattr(instance, 'exchange_reaction'):
         if hasattr(instance.exchange_reaction, '_bounds'):
             instance.exchange_reaction._bounds = value
+            changed.append(instance.exchange_reaction)
 
     else:
         instance._coefficients = value
 
     if instance.model:
-        instance.model.notify()
+        instance.model.notify(bounds=changed)
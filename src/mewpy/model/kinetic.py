@@ -278,7 +278,7 @@ class KineticReaction(Rule):
         Returns:
             str: kinetic rule.
         """
-        m = {p_id: f"p['{p_id}']" for p_id in self.parameters.keys()}
+        m = {p_id: f"p['{p_id}']" for p_id in self.parameters.keys() if p_id not in map}
         r_map = map.copy()
         r_map.update(m)
 
@@ -361,9 +361,34 @@ class ODEModel:
         self._func_str = None
         self._constants = None
         self._m_r_lookup = None
+        # compiled right-hand sides of the ODE system, by the set of metabolites
+        # with a null factor, and the positions of the parameters in its parameter vectors
+        self._ode = dict()
+        self._rates = None
+        self._jac = None
+        self._N = None
+        self._p_index = None
+        self._v_index = None
+        self._rmap = None
+        # incremented when the compiled functions are invalidated
+        self._version = 0
 
     def _clear_temp(self):
+        self._version += 1
         self._func_str = None
+        self._m_r_lookup = None
+        self._ode = dict()
+        self._rates = None
+        self._jac = None
+        self._N = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # compiled functions are not picklable, and are rebuilt when needed
+        state['_ode'] = dict()
+        state['_rates'] = None
+        state['_jac'] = None
+        return state
 
     def add_compartment(self, compartment, replace=True):
         """ Add a compartment to the model.
@@ -390,6 +415,7 @@ class ODEModel:
                 has invalid compartment {metabolite.compartment}.")
 
         self.metabolites[metabolite.id] = metabolite
+        self._clear_temp()
 
     @property
     def reactions(self):
@@ -514,6 +540,7 @@ class ODEModel:
         """
         law._model = self
         self.ratelaws[r_id] = law
+        self._clear_temp()
 
     def get_ratelaw(self, r_id):
         if r_id in self.ratelaws.keys():
@@ -563,6 +590,25 @@ class ODEModel:
                     self._m_r_lookup[m_id][r_id] = coeff
         return self._m_r_lookup
 
+    def stoichiometric_matrix(self, sparse=False):
+        """Returns the stoichiometric matrix of the model, with metabolites as rows and 
+        reactions as columns, ordered as in metabolites and ratelaws.
+
+        Args:
+            sparse (bool): returns a scipy CSR matrix. Defaults to False.
+        """
+        if self._N is None:
+            r_index = {r_id: j for j, r_id in enumerate(self.ratelaws)}
+            N = np.zeros((len(self.metabolites), len(self.ratelaws)))
+            for i, m_id in enumerate(self.metabolites):
+                for r_id, coeff in self.metabolite_reaction_lookup()[m_id].items():
+                    N[i, r_index[r_id]] = coeff
+            self._N = N
+        if sparse:
+            from scipy.sparse import csr_matrix
+            return csr_matrix(self._N)
+        return self._N
+
     def print_balance(self, m_id, factors=None):
         """Returns a string representation of the mass balance equation 
            of a metabolite
@@ -663,39 +709,29 @@ class ODEModel:
             yprime += reaction.reaction(m_y, self.get_parameters(),p)
         return yprime.tolist()
 
-    def build_ode(self, factors: dict = None, local: bool = False) -> str:
+    def build_ode(self, local: bool = False, nulls=()) -> str:
         """ 
         Auxiliary function to build the ODE as a string
         to be evaluated by eval, as an alternative to deriv. 
-        Allows the inclusion of factors to be applied to the parameters
+        Parameters are not included in the string, they are read from the vectors
+        p (constant parameters, ordered as in merge_constants) and v (variable parameters)
+        and the vector f of factors applied to the production of each metabolite.
 
         Args:
-            factors (dict): factors to be applied to parameters
             local (bool): enforces the usage of parameter values defined within
             the reactions
+            nulls: positions of the metabolites with a null factor, whose balance is 0
         Returns:
             func_str the right-hand side of the system. 
         """
-
-        m = {m_id: f"x[{i}]" for i, m_id in enumerate(self.metabolites)}
-        c = {c_id: f"p['{c_id}']" for c_id in self.compartments}
-        p = {p_id: f"p['{p_id}']" for p_id in self.constant_params}
-        v = {p_id: f"v['{p_id}']" for p_id in self.variable_params}
-        rmap = OrderedDict({**m, **c, **p, **v})
-
-        parsed_rates = {r_id: ratelaw.parse_law(rmap, local=local)
-                        for r_id, ratelaw in self.ratelaws.items()}
-
-        r = {r_id: f"({parsed_rates[r_id]})" for r_id in self.ratelaws.keys()}
-
-        rmap.update(r)
+        parsed_rates = self._parse_laws(local)
 
         rate_exprs = [' '*4+"r['{}'] = {}".format(r_id, parsed_rates[r_id])
                       for r_id in self.ratelaws.keys()]
 
-        balances = [' '*8 + self.print_balance(m_id, factors=factors) for m_id in self.metabolites]
+        balances = [' '*8 + self._balance(m_id, i, i in nulls) for i, m_id in enumerate(self.metabolites)]
 
-        func_str = 'def ode_func(t, x, r, p, v):\n\n' + \
+        func_str = 'def ode_func(t, x, r, p, v, f):\n\n' + \
             '\n'.join(rate_exprs) + '\n\n' + \
             '    dxdt = [\n' + \
             ',\n'.join(balances) + '\n' + \
@@ -705,27 +741,267 @@ class ODEModel:
         self._func_str = func_str
         return self._func_str
 
-    def get_ode(self, r_dict=None, params=None, factors=None):
+    def build_rates(self, local: bool = False) -> str:
+        """
+        Auxiliary function to build, as a string, a function that computes the 
+        vector of reaction rates, rate_func(t, x, p, v, r), writing the rates
+        into the array r. Used by the vectorized right-hand side, dxdt = N @ r.
+
+        Args:
+            local (bool): enforces the usage of parameter values defined within
+            the reactions
+        Returns:
+            the rates function string.
+        """
+        parsed_rates = self._parse_laws(local)
+        rate_exprs = [' '*4+"r[{}] = {}".format(j, parsed_rates[r_id])
+                      for j, r_id in enumerate(self.ratelaws.keys())]
+        return 'def rate_func(t, x, p, v, r):\n\n' + \
+            '\n'.join(rate_exprs) + '\n\n' + \
+            '    return r\n'
+
+    def build_jacobian(self) -> str:
+        """
+        Auxiliary function to build, as a string, a function that computes the 
+        Jacobian of the reaction rates, rjac_func(t, x, p, v, R), writing the partial
+        derivatives dr_j/dx_i, derived from the parsing trees of the rate laws, into R[j, i].
+        The Jacobian of the system is N @ R.
+
+        Returns:
+            the Jacobian function string.
+
+        Raises:
+            ValueError: if a rate law can not be differentiated.
+        """
+        self._parse_laws()
+        rmap = self._rmap
+        exprs = []
+        for j, ratelaw in enumerate(self.ratelaws.values()):
+            for m_id, i in self._state_symbols(ratelaw).items():
+                d = ratelaw.tree.derivative(m_id)
+                exprs.append(' '*4+"R[{}, {}] = {}".format(j, i, d.replace(rmap).to_infix()))
+        return 'def rjac_func(t, x, p, v, R):\n\n' + \
+            '\n'.join(exprs) + '\n\n' + \
+            '    return R\n'
+
+    def _state_symbols(self, ratelaw):
+        """Metabolites, and their positions in the state vector, on which a rate law depends."""
+        symbols = ratelaw.tree.get_parameters()
+        return {m_id: i for i, m_id in enumerate(self.metabolites)
+                if m_id in symbols and self._rmap.get(m_id) == f"x[{i}]"}
+
+    def jacobian_sparsity(self):
+        """Returns the sparsity pattern of the Jacobian of the system, 
+        as a boolean matrix (metabolites x metabolites).
+        """
+        if self._p_index is None:
+            self._parse_laws()
+        R = np.zeros((len(self.ratelaws), len(self.metabolites)), dtype=bool)
+        for j, ratelaw in enumerate(self.ratelaws.values()):
+            for i in self._state_symbols(ratelaw).values():
+                R[j, i] = True
+        N = self.stoichiometric_matrix() != 0
+        return (N.astype(int) @ R.astype(int)) > 0
+
+    def _parse_laws(self, local=False):
+        """Rate laws, where metabolites and parameters are replaced by
+        their positions in the state and parameter vectors.
+        """
+        self._p_index = {p_id: i for i, p_id in enumerate(self.merge_constants())}
+        self._v_index = {p_id: i for i, p_id in enumerate(self.variable_params)}
+
+        m = {m_id: f"x[{i}]" for i, m_id in enumerate(self.metabolites)}
+        p = {p_id: f"p[{i}]" for p_id, i in self._p_index.items()}
+        v = {p_id: f"v[{i}]" for p_id, i in self._v_index.items()}
+        rmap = OrderedDict({**m, **p, **v})
+        self._rmap = rmap
+
+        return {r_id: ratelaw.parse_law(rmap, local=local)
+                for r_id, ratelaw in self.ratelaws.items()}
+
+    def _balance(self, m_id, index, null=False):
+        """Mass balance of a metabolite in the ODE function, where the factor f[index]
+        is applied to the producing reactions. Metabolites with a null factor have a
+        balance of 0, even when the rates are not finite.
+        """
+        metabolite = self.metabolites[m_id]
+        c_id = metabolite.compartment
+        table = self.metabolite_reaction_lookup()
+
+        terms = []
+        for r_id, coeff in table[m_id].items():
+            f = f" * f[{index}]" if coeff > 0 else ""
+            terms.append(f"{coeff:+g}{f} * r['{r_id}']")
+
+        if (null or len(terms) == 0 or
+            (getattr(metabolite, 'constant', False) and
+             getattr(metabolite, 'boundary', False)
+             )):
+            return "0"
+        return f"1/p[{self._p_index[c_id]}] * ({' '.join(terms)})"
+
+    def compile_ode(self, nulls=()):
+        """Compiles the right-hand side of the ODE system, 
+        ode_func(t, x, r, p, v, f), which is built only once for each set of metabolites
+        with a null factor, until rate laws, metabolites or the set of parameters are modified.
+
+        Args:
+            nulls: positions of the metabolites with a null factor.
+        Returns:
+            function: the compiled right-hand side.
+        """
+        self._check_parameters()
+        nulls = frozenset(nulls)
+        if nulls not in self._ode:
+            self._ode[nulls] = _compile(self.build_ode(nulls=nulls), 'ode_func')
+        return self._ode[nulls]
+
+    def compile_rates(self):
+        """Compiles the function that computes the vector of reaction rates, 
+        rate_func(t, x, p, v, r), which is built only once, until rate laws,
+        metabolites or the set of parameters are modified.
+
+        Returns:
+            function: the compiled rates function.
+        """
+        self._check_parameters()
+        if self._rates is None:
+            self._rates = _compile(self.build_rates(), 'rate_func')
+        return self._rates
+
+    def compile_jacobian(self):
+        """Compiles the function that computes the Jacobian of the reaction rates, 
+        rjac_func(t, x, p, v, R), which is built only once, until rate laws,
+        metabolites or the set of parameters are modified.
+
+        Returns:
+            function: the compiled function.
+
+        Raises:
+            ValueError: if a rate law can not be differentiated.
+        """
+        self._check_parameters()
+        if self._jac is None:
+            self._jac = _compile(self.build_jacobian(), 'rjac_func')
+        return self._jac
+
+    def _check_parameters(self):
+        """Clears the compiled functions if the set of parameters has changed."""
+        if self._p_index is not None and list(self.merge_constants()) != list(self._p_index):
+            self._clear_temp()
+
+    def parameter_vector(self, params=None, factors=None):
+        """Returns the vector of constant parameters of the compiled ODE.
+
+        Args:
+            params: modified parameters
+            factors: factors to be applied to parameters
+        """
+        self._check_parameters()
+        if self._p_index is None:
+            self._parse_laws()
+        constants = self.merge_constants()
+        p = np.fromiter(constants.values(), dtype=float, count=len(constants))
+        for k, value in (params or {}).items():
+            if k in self._p_index:
+                p[self._p_index[k]] = value
+        for k, value in (factors or {}).items():
+            if k in self._p_index:
+                p[self._p_index[k]] *= value
+        return p
+
+    def get_ode(self, r_dict=None, params=None, factors=None, vectorized=False, sparse=False):
         """
         Args:
             r_dict: reaction identifiers to be modified
             params: modified parameters
             factors: factors to be applied to parameters
+            vectorized: computes the vector of rates and the derivatives as dxdt = N @ r, 
+                instead of the mass balance of each metabolite
+            sparse: uses a sparse stoichiometric matrix N in the vectorized right-hand side
         """
-        p = self.merge_constants()
-        if params:
-            p.update(params)
+        p, v, f = self._vectors(params, factors)
+        ode_func = self.compile_rates() if vectorized else self.compile_ode(np.flatnonzero(f == 0).tolist())
 
-        if factors is not None:
-            for k, v in factors.items():
-                if k in p.keys():
-                    p[k] = v * p[k]
+        np.seterr(divide='ignore', invalid='ignore')
+        if vectorized:
+            return self._vectorized_ode(ode_func, r_dict, p, v, f, sparse)
 
-        v = self.variable_params.copy()
         r = r_dict if r_dict is not None else dict()
+        # indexing lists of floats is faster than indexing arrays
+        p, v, f = p.tolist(), v.tolist(), f.tolist()
+        return lambda t, y: ode_func(t, y, r, p, v, f)
+
+    def get_jacobian(self, params=None, factors=None, sparse=False):
+        """Returns the analytic Jacobian of the ODE system, jac(t, y) = N @ R(t, y), 
+        where R is the Jacobian of the reaction rates.
+
+        Args:
+            params: modified parameters
+            factors: factors to be applied to parameters
+            sparse: uses a sparse stoichiometric matrix N
+
+        Raises:
+            ValueError: if a rate law can not be differentiated.
+        """
+        rjac_func = self.compile_jacobian()
+        p, v, f = self._vectors(params, factors)
+        N = self._scaled_stoichiometry(p, f)
+        if sparse:
+            from scipy.sparse import csr_matrix
+            N = csr_matrix(N)
+        R = np.zeros((len(self.ratelaws), len(self.metabolites)))
+        p, v = p.tolist(), v.tolist()
 
         np.seterr(divide='ignore', invalid='ignore')
-        exec(self.build_ode(factors), globals())
-        ode_func = eval('ode_func')
+        return lambda t, y: N @ rjac_func(t, y, p, v, R)
+
+    def _vectors(self, params=None, factors=None):
+        """Vectors of constant parameters, variable parameters and metabolite factors."""
+        p = self.parameter_vector(params, factors)
+        v = np.array(list(self.variable_params.values()), dtype=float)
+        f = np.ones(len(self.metabolites))
+        if factors:
+            for i, m_id in enumerate(self.metabolites):
+                f[i] = factors.get(m_id, 1)
+        return p, v, f
+
+    def _scaled_stoichiometry(self, p, f):
+        """Stoichiometric matrix where the factors f of the metabolites 
+        and the compartment volumes are applied to the rows.
+        """
+        N = self.stoichiometric_matrix()
+        volumes = np.array([p[self._p_index[m.compartment]] for m in self.metabolites.values()])
+        scale = np.where(f != 0, 1 / volumes, 0)
+        for i, m in enumerate(self.metabolites.values()):
+            if getattr(m, 'constant', False) and getattr(m, 'boundary', False):
+                scale[i] = 0
+        return np.where(N > 0, N * f[:, None], N) * scale[:, None]
+
+    def _vectorized_ode(self, rate_func, r_dict, p, v, f, sparse=False):
+        """Right-hand side dxdt = N @ r, where the factors f of the metabolites 
+        and the compartment volumes are applied to the rows of N.
+        """
+        N = self._scaled_stoichiometry(p, f)
+        if sparse:
+            from scipy.sparse import csr_matrix
+            N = csr_matrix(N)
+
+        r_ids = list(self.ratelaws.keys())
+        rates = np.zeros(len(r_ids))
+        p, v = p.tolist(), v.tolist()
+
+        def ode_func(t, y):
+            rate_func(t, y, p, v, rates)
+            if r_dict is not None:
+                r_dict.update(zip(r_ids, rates.tolist()))
+            return N @ rates
+
+        return ode_func
+
 
-        return lambda t, y: ode_func(t, y, r, p, v)
+def _compile(source, name):
+    """Compiles a function generated by ODEModel."""
+    namespace = {'np': np, 'exp': np.exp, 'log': np.log, 'ln': np.log, 'sqrt': np.sqrt}
+    exec(source, namespace)
+    return namespace[name]
@@ -25,6 +25,7 @@ import signal
 import sys
 from mewpy.util.constants import EAConstants
 from mewpy.util.process import cpu_count
+from mewpy.util.stats import solver_stats
 from typing import TYPE_CHECKING, Any, Dict, List, Union, Tuple
 
 if TYPE_CHECKING:
@@ -167,10 +168,19 @@ class AbstractEA(ABC):
         # builds the target list
         self.problem.pre_process()
 
-        if self.problem.number_of_objectives == 1:
-            final_pop = self._run_so()
-        else:
-            final_pop = self._run_mo()
+        # evaluations exceeding the time budget are reported, with the solver
+        # statistics, by the observers at each generation
+        stats = bool(getattr(self.problem, 'time_budget', None)) and not solver_stats.enabled
+        if stats:
+            solver_stats.enable()
+        try:
+            if self.problem.number_of_objectives == 1:
+                final_pop = self._run_so()
+            else:
+                final_pop = self._run_mo()
+        finally:
+            if stats:
+                solver_stats.disable()
         pop = self._convertPopulation(final_pop)
         pop = filter_duplicates(pop)
         if simplify:
@@ -23,6 +23,7 @@ Authors: Vitor Pereira
 import numpy
 from inspyred.ec.emo import Pareto
 
+from mewpy.util.stats import solver_stats
 from mewpy.visualization.plot import StreamingPlot
 from ..ea import Solution, non_dominated_population
 
@@ -73,6 +74,8 @@ def results_observer(population, num_generations, num_evaluations, args):
     - the solution candidates
     - the solution encoded candidates
 
+    If the solver statistics are enabled, they are also printed and reset at each generation.
+
     :param population: (list) the population of Individuals.
     :param num_generations: (int) the number of elapsed generations.
     :param num_evaluations: (int) the number of evaluations already performed.
@@ -95,6 +98,9 @@ def results_observer(population, num_generations, num_evaluations, args):
     if num_generations == 0:
         print(title)
     print(values)
+    if solver_stats.enabled:
+        print(solver_stats.summary())
+        solver_stats.reset()
 
 
 class VisualizerObserver():
@@ -25,6 +25,7 @@ import logging
 from typing import List, TypeVar
 
 import numpy
+from mewpy.util.stats import solver_stats
 from mewpy.visualization.plot import StreamingPlot
 from ..ea import non_dominated_population, Solution
 
@@ -85,6 +86,7 @@ class PrintObjectivesStatObserver():
 
     def __init__(self, frequency: float = 1.0) -> None:
         """ Show the number of evaluations, best fitness and computing time.
+        If the solver statistics are enabled, they are also shown and reset.
 
         :param frequency: Display frequency. """
         self.display_frequency = frequency
@@ -154,3 +156,6 @@ class PrintObjectivesStatObserver():
                 message = 'Evaluations: {}\tFitness: {}'.format(
                     evaluations, res)
             print(message)
+            if solver_stats.enabled:
+                print(solver_stats.summary())
+                solver_stats.reset()
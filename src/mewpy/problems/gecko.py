@@ -22,9 +22,11 @@ Contributors: Sergio Salgado Briegas
 ##############################################################################
 """
 import warnings
+from contextlib import nullcontext
 
 from .problem import AbstractKOProblem, AbstractOUProblem
 from mewpy.util.constants import ModelConstants
+from mewpy.util.resources import TimeBudget
 from mewpy.simulation import SStatus, get_simulator
 from copy import copy
 
@@ -365,19 +367,23 @@ class KcatOptProblem(AbstractOUProblem):
 
         # pre simulation
         simulation_results = dict()
+        budget = TimeBudget(self.time_budget) if self.time_budget else nullcontext()
         try:
             p = []
-            for method in self.methods:
-                simulation_result = simulator.simulate(method=method)
-                simulation_results[method] = simulation_result
-            # apply the evaluation function(s)
-            for f in self.fevaluation:
-                v = f(simulation_results, decoded, scalefactor=self.scalefactor, simulator=simulator)
-                p.append(v)
+            with budget:
+                for method in self.methods:
+                    simulation_result = simulator.simulate(method=method)
+                    simulation_results[method] = simulation_result
+                # apply the evaluation function(s)
+                for f in self.fevaluation:
+                    v = f(simulation_results, decoded, scalefactor=self.scalefactor, simulator=simulator)
+                    p.append(v)
         except Exception as e:
             p = []
             for f in self.fevaluation:
                 p.append(f.worst_fitness)
+        if self.time_budget and budget.expired:
+            p = self._timeout(solution)
         del simulation_results
         return p
 
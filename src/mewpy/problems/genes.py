@@ -26,7 +26,7 @@ Author: Vitor Pereira
 """
 import logging
 from .problem import AbstractKOProblem, AbstractOUProblem
-from mewpy.util.parsing import GeneEvaluator, build_tree, Boolean
+from mewpy.util.parsing import GeneEvaluator, compile_expression
 from mewpy.simulation import SStatus
 from typing import Union, TYPE_CHECKING, List, Dict
 
@@ -79,11 +79,7 @@ class GKOProblem(AbstractKOProblem):
         """
         Converts a candidate, dict of genes:0 into a dictionary of constraints.
         """
-        genes = list(candidate.keys())
-        active_genes = set(self.simulator.genes) - set(genes)
-        active_reactions = self.simulator.evaluate_gprs(active_genes)
-        inactive_reactions = set(
-            self.simulator.reactions) - set(active_reactions)
+        inactive_reactions = self.simulator.gene_knockout_reactions(candidate.keys())
         gr_constraints = {rxn: 0 for rxn in inactive_reactions}
         return gr_constraints
 
@@ -122,6 +118,7 @@ class GOUProblem(AbstractOUProblem):
         # operators to replace 'and'/'or'. By default min/max
         self._temp_op = kwargs.get('operators', None)
         self._operators = None
+        self._default_operators = False
 
     def _build_target_list(self):
 
@@ -141,6 +138,7 @@ class GOUProblem(AbstractOUProblem):
             pass
         elif not self._temp_op or None in self._temp_op or len(self._temp_op) < 2:
             self._operators = (lambda x, y: min(x, y), lambda x, y: max(x, y))
+            self._default_operators = True
         else:
             ops = []
             for i in [0, 1]:
@@ -167,9 +165,7 @@ class GOUProblem(AbstractOUProblem):
         if self.twostep:
             try:
                 deletions = [gene for gene, lv in candidate.items() if lv == 0]
-                active_genes = set(self.simulator.genes) - set(deletions)
-                active_reactions = self.simulator.evaluate_gprs(active_genes)
-                inactive_reactions = set(self.simulator.reactions) - set(active_reactions)
+                inactive_reactions = self.simulator.gene_knockout_reactions(deletions)
                 gr_constraints = {rxn: 0 for rxn in inactive_reactions}
                 sr = self.simulator.simulate(constraints=gr_constraints, method='pFBA')
                 if sr.status in (SStatus.OPTIMAL, SStatus.SUBOPTIMAL):
@@ -181,10 +177,15 @@ class GOUProblem(AbstractOUProblem):
         # evaluate gpr
         evaluator = GeneEvaluator(
             genes, self._operators[0], self._operators[1])
-        for rxn_id in self.simulator.reactions:
+        # min/max only yield a level other than 1 for reactions with a modified gene
+        if self._default_operators:
+            reactions = self.simulator.genes_reactions(genes.keys())
+        else:
+            reactions = self.simulator.reactions
+        for rxn_id in reactions:
             gpr = self.simulator.get_gpr(rxn_id)
             if gpr:
-                tree = build_tree(gpr, Boolean)
+                tree = compile_expression(str(gpr))
                 # apply the operators to obtain a level for the reaction
                 # if a gene as no level associated its factor is 1 (see GeneEvaluator)
                 lv = tree.evaluate(evaluator.f_operand, evaluator.f_operator)
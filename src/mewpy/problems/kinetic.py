@@ -34,10 +34,12 @@ class KineticKOProblem(AbstractKOProblem):
         kinetic_parameters = kwargs.get('kparam', None)
         t_points = kwargs.get('t_points', None)
         timeout = kwargs.get('timeout', KineticConfigurations.SOLVER_TIMEOUT)
+        steady_state = kwargs.get('steady_state', False)
         self.kinetic_sim = KineticSimulation(model, 
                                              parameters=kinetic_parameters,
                                              timeout=timeout,
-                                             t_points=t_points)
+                                             t_points=t_points,
+                                             steady_state=steady_state)
         for f in self.fevaluation:
             if isinstance(f,KineticEvaluationFunction):
                 f.kinetic = True
@@ -78,10 +80,12 @@ class KineticOUProblem(AbstractOUProblem):
         kinetic_parameters = kwargs.get('kparam', None)
         t_points = kwargs.get('t_points', None)
         timeout = kwargs.get('timeout', KineticConfigurations.SOLVER_TIMEOUT)
+        steady_state = kwargs.get('steady_state', False)
         self.kinetic_sim = KineticSimulation(model, 
                                              parameters=kinetic_parameters,
                                              timeout=timeout,
-                                             t_points=t_points)
+                                             t_points=t_points,
+                                             steady_state=steady_state)
         for f in self.fevaluation:
             if isinstance(f,KineticEvaluationFunction):
                 f.kinetic = True
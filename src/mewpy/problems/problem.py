@@ -23,12 +23,15 @@ Author: Vitor Pereira
 """
 import copy
 import warnings
+from contextlib import nullcontext
 from abc import ABC, abstractmethod
 from enum import Enum
 import numpy as np
 from mewpy.optimization.ea import Solution, filter_duplicates
 from mewpy.simulation import get_simulator
 from mewpy.util.constants import EAConstants, ModelConstants
+from mewpy.util.resources import TimeBudget
+from mewpy.util.stats import solver_stats
 from typing import Union, TYPE_CHECKING, List, Dict
 
 if TYPE_CHECKING:
@@ -124,6 +127,7 @@ class AbstractProblem(ABC):
         :param list target: List of modification target genes.
         :param list non_target: List of non target genes. Not considered if a target list is provided.
         :param float scalefactor: A scaling factor to be used in the LP formulation.
+        :param float time_budget: The time budget, in seconds, of each evaluation (Default EAConstants.TIME_BUDGET).
         """
         
         self.model = model
@@ -157,6 +161,11 @@ class AbstractProblem(ABC):
         self._bounder = None
         # scaling factor
         self.scalefactor = kwargs.get('scalefactor', None)
+        # time budget of each evaluation and number of evaluations that exceeded it,
+        # to which the parallel evaluators add the timeouts of their workers while
+        # the solver statistics are enabled (as done by the EAs for problems with a budget)
+        self.time_budget = kwargs.get('time_budget', EAConstants.TIME_BUDGET)
+        self.timeouts = 0
         # required simulations
         methods = []
         for f in self.fevaluation:
@@ -274,6 +283,10 @@ class AbstractProblem(ABC):
         """
         Evaluates a single solution, a list of constraints.
 
+        If the problem has a time budget, all the solves of the evaluation are limited
+        to the remaining time, and the solution is assigned the worst fitness if the
+        budget is exceeded.
+
         :param solution: The solution to be evaluated.
         :param decode: If the solution needs to be decoded.
         :returns: A list of fitness.
@@ -288,28 +301,40 @@ class AbstractProblem(ABC):
 
         # pre simulation
         simulation_results = dict()
+        budget = TimeBudget(self.time_budget) if self.time_budget else nullcontext()
         try:
             p = []
-            for method in self.methods:
-                simulation_result = self.simulator.simulate(
-                    constraints=constraints, method=method, scalefactor=self.scalefactor)
-                simulation_results[method] = simulation_result
-            # apply the evaluation function(s)
-            for f in self.fevaluation:
-                v = f(simulation_results, 
-                      decoded, 
-                      scalefactor=self.scalefactor,
-                      constraints=constraints)
-                p.append(v)
+            with budget:
+                for method in self.methods:
+                    simulation_result = self.simulator.simulate(
+                        constraints=constraints, method=method, scalefactor=self.scalefactor)
+                    simulation_results[method] = simulation_result
+                # apply the evaluation function(s)
+                for f in self.fevaluation:
+                    v = f(simulation_results,
+                          decoded,
+                          scalefactor=self.scalefactor,
+                          constraints=constraints)
+                    p.append(v)
         except Exception as e:
             p = []
             for f in self.fevaluation:
                 p.append(f.worst_fitness)
             if EAConstants.DEBUG:
                 warnings.warn(f"Solution couldn't be evaluated [{e}]\n {constraints}")
+        if self.time_budget and budget.expired:
+            p = self._timeout(constraints)
         del simulation_results
         return p
 
+    def _timeout(self, constraints):
+        """ Counts an evaluation that exceeded the time budget, returning the worst fitness. """
+        self.timeouts += 1
+        solver_stats.timeout()
+        if EAConstants.DEBUG:
+            warnings.warn(f"Solution evaluation exceeded the time budget\n {constraints}")
+        return [f.worst_fitness for f in self.fevaluation]
+
     @property
     def is_maximization(self):
         return all([f.maximize for f in self.fevaluation])
@@ -20,7 +20,7 @@ Author: Vítor Pereira
 """
 
 from .simulator import get_simulator, get_container
-from .simulation import Simulator, SimulationMethod, SStatus, SimulationResult
+from .simulation import Simulator, SimulationMethod, SStatus, SimulationResult, BatchSimulationResult, IndexedValues
 from .environment import Environment
 from .sglobal import __MEWPY_sim_solvers__
 
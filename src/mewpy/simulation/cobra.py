@@ -23,15 +23,21 @@ Author: Vítor Pereira
 """
 import logging
 from collections import OrderedDict
+from math import isinf
+from operator import is_
 import numpy as np
 
 from cobra.core.model import Model
 from cobra.core.solution import Solution
 from cobra.flux_analysis import pfba, moma, room
+from cobra.exceptions import OptimizationError
+from cobra.util.solver import linear_reaction_coefficients
 
 from . import get_default_solver, SimulationMethod, SStatus
-from .simulation import Simulator, SimulationResult, ModelContainer
+from .simulation import Simulator, SimulationResult, ModelContainer, IndexedValues, FrozenIndex
 from mewpy.util.constants import ModelConstants
+from mewpy.util.resources import limit_time, set_native_threads
+from mewpy.util.stats import solver_stats
 from mewpy.util.utilities import AttrDict
 from tqdm import tqdm
 
@@ -48,6 +54,46 @@ if TYPE_CHECKING:
 LOGGER = logging.getLogger(__name__)
 
 
+def _split_bounds(lb, ub):
+    """Returns the bounds of the forward and reverse optlang variables of a reaction,
+    following COBRApy's Reaction.update_variable_bounds.
+    """
+    def finite(value):
+        return None if isinf(value) else value
+
+    if lb > 0:
+        return (finite(lb), finite(ub)), (0, 0)
+    elif ub < 0:
+        return (0, 0), (finite(-ub), finite(-lb))
+    else:
+        return (0, finite(ub)), (0, finite(-lb))
+
+
+def _same_objects(cached, current):
+    """True if two lists hold the same objects in the same order."""
+    return len(cached) == len(current) and all(map(is_, cached, current))
+
+
+def _primal_values(solver):
+    """Primal values of the optlang variables, ordered as solver.variables.
+    The values are read in bulk from the interface, when available.
+    """
+    try:
+        return solver._get_primal_values()
+    except AttributeError:
+        return list(solver.primal_values.values())
+
+
+def _shadow_prices(solver):
+    """Shadow prices of the optlang constraints, ordered as solver.constraints.
+    The values are read in bulk from the interface, when available.
+    """
+    try:
+        return solver._get_shadow_prices()
+    except AttributeError:
+        return list(solver.shadow_prices.values())
+
+
 class CobraModelContainer(ModelContainer):
     """ A basic container for COBRApy models.
 
@@ -254,6 +300,8 @@ class Simulation(CobraModelContainer, Simulator):
         self._reset_solver = reset_solver
         self.reverse_sintax = []
         self._m_r_lookup = None
+        # optlang variables and positions used by FBA simulations
+        self._optlang = None
 
         self._MAX_STR = 'maximize'
         self._MIN_STR = 'minimize'
@@ -311,6 +359,7 @@ class Simulation(CobraModelContainer, Simulator):
             raise ValueError(
                 'The objective must be a reaction identifier or a dictionary of \
                 reaction identifier with respective coeficients.')
+        self._model_changed()
 
     def add_compartment(self, comp_id, name=None, external=False):
         """ Adds a compartment
@@ -384,6 +433,8 @@ class Simulation(CobraModelContainer, Simulator):
         self.model.add_reactions([reaction])
         if objective!=0:
             set_objective(self.model, {reaction: objective})
+        self._reset_gene_index()
+        self._model_changed()
 
     def remove_reaction(self, r_id):
         """Removes a reaction from the model.
@@ -392,7 +443,9 @@ class Simulation(CobraModelContainer, Simulator):
             r_id (str): The reaction identifier.
         """
         self.model.remove_reactions([r_id])
-        
+        self._reset_gene_index()
+        self._model_changed()
+
     def remove_reactions(self, rxn_ids:List[str]):
         """_summary_
 
@@ -400,7 +453,9 @@ class Simulation(CobraModelContainer, Simulator):
             rxn_ids (List[str]): _description_
         """
         self.model.remove_reactions(rxn_ids)
-        
+        self._reset_gene_index()
+        self._model_changed()
+
 
     def update_stoichiometry(self, rxn_id, stoichiometry):
         """Updates the stoichiometry of a reaction by creating a 
@@ -530,6 +585,7 @@ class Simulation(CobraModelContainer, Simulator):
                 self._constraints[reaction_id] = (lb, ub)
         rxn = self.model.reactions.get_by_id(reaction_id)
         rxn.bounds = (lb, ub)
+        self._model_changed()
 
     def find_bounds(self):
         """
@@ -557,6 +613,74 @@ class Simulation(CobraModelContainer, Simulator):
             if rxn.lower_bound <= lower_bound and rxn.upper_bound >= upper_bound
         ]
 
+    def _simulation_constraints(self, constraints):
+        """Returns the simulation constraints, excluding those that would
+        alter the environmental conditions when such changes are not allowed.
+        """
+        simul_constraints = {}
+        if constraints:
+            if not self._allow_env_changes:
+                simul_constraints.update({k: v for k, v in constraints.items()
+                                          if k not in list(self._environmental_conditions.keys())})
+            else:
+                simul_constraints.update(constraints)
+        return simul_constraints
+
+    def _apply_constraints(self, model, constraints):
+        """Sets the reactions bounds within a model context."""
+        for rxn in list(constraints.keys()):
+            reac = model.reactions.get_by_id(rxn)
+
+            # constraints defined as a tuple (lower_bound, upper_bound) or 
+            # as a single float value
+            if isinstance(constraints.get(rxn), tuple):
+                reac.bounds = (constraints.get(
+                    rxn)[0], constraints.get(rxn)[1])
+            else:
+                reac.bounds = (constraints.get(
+                    rxn), constraints.get(rxn))
+
+    def _solve(self, model, method, maximize, slim=False):
+        """Runs a simulation method on a model context.
+
+        :returns: A COBRApy Solution or the objective value if slim.
+        """
+        # If working directly over optlang use 'max' and 'min'
+        # such is the case with pytfa.core.Model.
+        objective_sense = self._MAX_STR if maximize else self._MIN_STR
+
+        #FBA
+        if method == SimulationMethod.FBA:
+            if slim:
+                solution = model.slim_optimize()
+            else:
+                solution = model.optimize(objective_sense=objective_sense)
+        # pFBA
+        elif method == SimulationMethod.pFBA:
+            # make fraction_of_optimum a configurable parameter?
+            solution = pfba(model)
+
+        # MOMA/lMOMA
+        elif method == SimulationMethod.lMOMA or method == SimulationMethod.MOMA:
+            s = None
+            if not maximize:
+                s = model.optimize(objective_sense=objective_sense)
+            linear = True if method == SimulationMethod.lMOMA else False
+            solution = moma(model, solution=s, linear=linear)
+
+        # ROOM
+        elif method == SimulationMethod.ROOM:
+            solution = room(model)
+
+        # Special case in which only the simulation context is required without any simulation result
+        elif method == SimulationMethod.NONE:
+            solution = Solution(None, 'unknown', None)
+
+        else:
+            raise Exception(
+                "Unknown method to perform the simulation.")
+        return solution
+
     # The simulator
     def simulate(self, 
                  objective: Dict[str,float]=None,
@@ -580,91 +704,216 @@ class Simulation(CobraModelContainer, Simulator):
 
         '''
 
-        if not objective:
-            objective = self.model.objective
-        elif isinstance(objective, dict) and len(objective) > 0:
-            objective = next(iter(objective.keys()))
+        limit_time(self.model.solver)
+        timer = solver_stats.timer('simulation')
 
-        simul_constraints = {}
-        if constraints:
-            if not self._allow_env_changes:
-                simul_constraints.update({k: v for k, v in constraints.items()
-                                          if k not in list(self._environmental_conditions.keys())})
-            else:
-                simul_constraints.update(constraints)
+        if isinstance(objective, dict) and len(objective) > 0:
+            objective = next(iter(objective.keys()))
 
+        simul_constraints = self._simulation_constraints(constraints)
+
+        if method == SimulationMethod.FBA:
+            cache = self._optlang_cache(objective)
+            if cache is not None:
+                result = self._simulate_fba(cache, maximize, simul_constraints, constraints, slim)
+                timer.lap('simulate')
+                status = None if slim else result.status
+                timer.done(status, len(cache['reactions']) if status == SStatus.OPTIMAL else 0, self.model.solver)
+                return result
+
+        # The model keeps a persistent solver problem and constraints are
+        # applied as bound changes reverted on exit, so the solver retains
+        # its basis between simulations. The objective is only set when a
+        # simulation objective is given, as resetting the model objective
+        # would force it to be rebuilt twice at each simulation.
         with self.model as model:
-            model.objective = objective
-            for rxn in list(simul_constraints.keys()):
-                reac = model.reactions.get_by_id(rxn)
-
-                # constraints defined as a tuple (lower_bound, upper_bound) or 
-                # as a single float value
-                if isinstance(simul_constraints.get(rxn), tuple):
-                    reac.bounds = (simul_constraints.get(
-                        rxn)[0], simul_constraints.get(rxn)[1])
-                else:
-                    reac.bounds = (simul_constraints.get(
-                        rxn), simul_constraints.get(rxn))
-
-            # If working directly over optlang use 'max' and 'min'
-            # such is the case with pytfa.core.Model.
-            objective_sense = self._MAX_STR if maximize else self._MIN_STR
-            
-            #FBA
-            if method == SimulationMethod.FBA:
-                if slim:
-                    solution = model.slim_optimize()
-                else:
-                    solution = model.optimize(objective_sense=objective_sense)
-            # pFBA
-            elif method == SimulationMethod.pFBA:
-                # make fraction_of_optimum a configurable parameter?
-                solution = pfba(model)
-
-            # MOMA/lMOMA
-            elif method == SimulationMethod.lMOMA or method == SimulationMethod.MOMA:
-                s = None
-                if not maximize:
-                    s = model.optimize(objective_sense=objective_sense)
-                linear = True if method == SimulationMethod.lMOMA else False
-                solution = moma(model, solution=s, linear=linear)
-
-            # ROOM
-            elif method == SimulationMethod.ROOM:
-                solution = room(model)
-
-            # Special case in which only the simulation context is required without any simulation result
-            elif method == SimulationMethod.NONE:
-                solution = Solution(None, 'unknown', None)
-
-            else:
-                raise Exception(
-                    "Unknown method to perform the simulation.")
+            if objective:
+                model.objective = objective
+            self._apply_constraints(model, simul_constraints)
+            solution = self._solve(model, method, maximize, slim)
+        timer.lap('simulate')
+        if slim:
+            timer.done(problem=self.model.solver)
+        else:
+            timer.done(self.__status_mapping.get(solution.status, SStatus.UNKNOWN),
+                       len(solution.fluxes) if solution.fluxes is not None else 0, self.model.solver)
 
         if slim:
             return solution
 
         else:
             status = self.__status_mapping[solution.status]
+            # fluxes and shadow prices are kept as vectors, dictionaries are only built if required
+            fluxes, prices = None, None
+            if solution.fluxes is not None:
+                fluxes = IndexedValues(solution.fluxes.index, solution.fluxes.values)
+            if solution.shadow_prices is not None:
+                prices = IndexedValues(solution.shadow_prices.index, solution.shadow_prices.values)
             result = SimulationResult(model, 
                                       solution.objective_value,
-                                      fluxes=solution.fluxes.to_dict(OrderedDict),
+                                      fluxes=fluxes,
                                       status=status, envcond=self.environmental_conditions,
                                       model_constraints=self._constraints.copy(),
                                       simul_constraints=constraints,
                                       maximize=maximize,
                                       method=method,
-                                      shadow_prices=solution.shadow_prices.to_dict(OrderedDict)
+                                      shadow_prices=prices
                                       )
             return result
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # optlang variables are bound to the solver of the model
+        state['_optlang'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # limits the solver threads in worker processes
+        set_native_threads(self.model.solver)
+
+    def _optlang_cache(self, objective=None):
+        """Returns the optlang variables of the reactions and their positions in the solver.
+        The cache is validated on each call against the variables and constraints of the solver,
+        and rebuilt when they differ, including after changes made directly to the model.
+        Returns None if the simulation objective differs from the model objective.
+        """
+        solver = self.model.solver
+        variables = list(solver.variables)
+        constraints = list(solver.constraints)
+        cache = self._optlang
+        if (cache is None or cache['solver'] is not solver
+                or not _same_objects(cache['order'], variables)
+                or not _same_objects(cache['rows'], constraints)):
+            positions = {v.name: i for i, v in enumerate(variables)}
+            rows = {c.name: i for i, c in enumerate(constraints)}
+            reactions = self.model.reactions
+            metabolites = self.model.metabolites
+            cache = self._optlang = {
+                'solver': solver,
+                'order': variables,
+                'rows': constraints,
+                'variables': {rxn.id: (rxn.forward_variable, rxn.reverse_variable) for rxn in reactions},
+                'reactions': FrozenIndex([rxn.id for rxn in reactions]),
+                'forward': np.array([positions[rxn.id] for rxn in reactions], dtype=int),
+                'reverse': np.array([positions[rxn.reverse_id] for rxn in reactions], dtype=int),
+                'metabolites': FrozenIndex([met.id for met in metabolites]),
+                'shadow': np.array([rows[met.id] for met in metabolites], dtype=int),
+                'objective': None
+            }
+        if objective:
+            # the objective is only compared when the model objective changes
+            cached = cache['objective']
+            if cached is None or cached[0] is not solver.objective or cached[1] != objective:
+                coefficients = linear_reaction_coefficients(self.model)
+                same = {r.id: c for r, c in coefficients.items()} == {objective: 1}
+                cached = cache['objective'] = (solver.objective, objective, same)
+            if not cached[2]:
+                return None
+        return cache
+
+    def _simulate_fba(self, cache, maximize, simul_constraints, constraints, slim=False):
+        """FBA simulation that only changes, and restores, the bounds of the optlang variables of the
+        constrained reactions, and reads the primal values from the solver into an array.
+        """
+        solver = self.model.solver
+        direction = solver.objective.direction
+        changed = []
+        try:
+            for r_id, bounds in simul_constraints.items():
+                lb, ub = bounds if isinstance(bounds, tuple) else (bounds, bounds)
+                if lb > ub:
+                    raise ValueError(f"The lower bound must be less or equal to the upper bound ({lb} <= {ub}).")
+                forward, reverse = cache['variables'][r_id]
+                changed.append((forward, forward.lb, forward.ub))
+                changed.append((reverse, reverse.lb, reverse.ub))
+                for variable, (v_lb, v_ub) in zip((forward, reverse), _split_bounds(lb, ub)):
+                    variable.set_bounds(lb=v_lb, ub=v_ub)
+            sense = 'max' if maximize else 'min'
+            if direction != sense:
+                solver.objective.direction = sense
+            solver.optimize()
+            status = solver.status
+            optimal = status in ('optimal', 'suboptimal')
+            objective_value = solver.objective.value if optimal else float('nan')
+            if slim:
+                return objective_value
+            fluxes, prices = None, None
+            if optimal:
+                primals = np.asarray(_primal_values(solver), dtype=float)
+                fluxes = IndexedValues(cache['reactions'], primals[cache['forward']] - primals[cache['reverse']])
+                if not solver.is_integer:
+                    shadow = np.asarray(_shadow_prices(solver), dtype=float)
+                    prices = IndexedValues(cache['metabolites'], shadow[cache['shadow']])
+        finally:
+            for variable, lb, ub in reversed(changed):
+                variable.set_bounds(lb=lb, ub=ub)
+            if solver.objective.direction != direction:
+                solver.objective.direction = direction
+
+        return SimulationResult(self.model,
+                                objective_value,
+                                fluxes=fluxes,
+                                status=self.__status_mapping.get(status, SStatus.UNKNOWN),
+                                envcond=self.environmental_conditions,
+                                model_constraints=self._constraints.copy(),
+                                simul_constraints=constraints,
+                                maximize=maximize,
+                                method=SimulationMethod.FBA,
+                                shadow_prices=prices
+                                )
+
+    def _simulate_batch(self, constraints_list, method=SimulationMethod.FBA, objective=None,
+                        maximize=True, reference=None):
+        if isinstance(objective, dict) and len(objective) > 0:
+            objective = next(iter(objective.keys()))
+
+        reactions = self.model.reactions
+        n = len(constraints_list)
+        fluxes = np.full((n, len(reactions)), np.nan)
+        status = np.empty(n, dtype=object)
+        objective_values = np.full(n, np.nan)
+        forward = [rxn.forward_variable.name for rxn in reactions]
+        reverse = [rxn.reverse_variable.name for rxn in reactions]
+
+        with self.model as model:
+            if objective:
+                model.objective = objective
+            model.objective.direction = 'max' if maximize else 'min'
+            for i, constraints in enumerate(constraints_list):
+                with model:
+                    self._apply_constraints(model, self._simulation_constraints(constraints))
+                    if method == SimulationMethod.FBA:
+                        # reads the primal values directly from the solver
+                        # avoiding the construction of a COBRApy Solution
+                        model.slim_optimize()
+                        s = model.solver.status
+                        if s in ('optimal', 'suboptimal'):
+                            objective_values[i] = model.solver.objective.value
+                            primals = model.solver.primal_values
+                            fluxes[i] = [primals[f] - primals[r] for f, r in zip(forward, reverse)]
+                    else:
+                        try:
+                            solution = self._solve(model, method, maximize)
+                            s = solution.status
+                            if s in ('optimal', 'suboptimal'):
+                                objective_values[i] = solution.objective_value
+                                fluxes[i] = solution.fluxes.values
+                        except OptimizationError:
+                            s = model.solver.status
+                    status[i] = self.__status_mapping.get(s, SStatus.UNKNOWN)
+        return fluxes, status, objective_values
+
     def FVA(self, reactions:Union[List[str],None]=None,
             obj_frac:float=0.9,
             constraints:Dict[str,Union[float,Tuple[float,float]]]=None,
             loopless:bool=False, 
             solver=None,
-            format:bool='dict') -> Union[dict,"DataFrame"]:
+            format:bool='dict',
+            jobs:int=None,
+            chunk_size:int=None,
+            skip_solves:bool=True,
+            stats:dict=None) -> Union[dict,"DataFrame","ndarray"]:
         """ Flux Variability Analysis (FVA).
 
         :param model: An instance of a constraint-based model.
@@ -675,12 +924,15 @@ class Simulation(CobraModelContainer, Simulator):
         :param dic constraints: Additional constraints (optional).
         :param boolean loopless: Run looplessFBA internally (very slow) (default: false).
         :param solver: A pre-instantiated solver instance (optional).
-        :param format: The return format: 'dict', returns a dictionary,'df' returns a data frame.
+        :param format: The return format: 'dict', returns a dictionary,'df' returns a data frame, \
+            'array' returns a (reactions x 2) array.
+        :param int jobs: The number of worker processes (default: 1).
+        :param int chunk_size: The number of reactions sent to a worker at a time (optional).
+        :param bool skip_solves: Skip solves already attained by previous primal solutions (default: True).
+        :param dict stats: A dictionary updated with the number of 'solves' and 'skipped' solves (optional).
         :returns: A dictionary of flux variation ranges.
 
         """
-        from cobra.flux_analysis.variability import flux_variability_analysis
-
         simul_constraints = {}
         if constraints:
             simul_constraints.update({k: v for k, v in constraints.items()
@@ -695,6 +947,13 @@ class Simulation(CobraModelContainer, Simulator):
         else:
             raise ValueError('Invalid reactions.')
 
+        if not loopless:
+            from mewpy.cobra.variability import FVA
+            return FVA(self, obj_frac=obj_frac, reactions=_reactions, constraints=simul_constraints,
+                       jobs=jobs, chunk_size=chunk_size, skip_solves=skip_solves, stats=stats, format=format)
+
+        from cobra.flux_analysis.variability import flux_variability_analysis
+
         with self.model as model:
 
             if simul_constraints:
@@ -715,7 +974,9 @@ class Simulation(CobraModelContainer, Simulator):
             variability[r_id] = [
                 float(df.loc[r_id][0]), float(df.loc[r_id][1])]
 
-        if format == 'df':
+        if format == 'array':
+            return np.array([variability[r_id] for r_id in _reactions], dtype=float)
+        elif format == 'df':
             import pandas as pd
             e = variability.items()
             f = [[a, b, c] for a, [b, c] in e]
@@ -727,6 +988,7 @@ class Simulation(CobraModelContainer, Simulator):
 
     def set_objective(self, reaction_id:str):
         self.model.objective = reaction_id
+        self._model_changed()
 
     def create_empty_model(self, model_id: str):
         return Simulation(Model(model_id))
@@ -933,6 +1195,7 @@ class GeckoSimulation(Simulation):
                 break
         if m is not None:
             rxn.subtract_metabolites({m: -1/kcat})
+            self._model_changed()
         else:
             LOGGER.warn(f'Could not identify {protein} ' 
                         f'protein specie in reaction {reaction}')
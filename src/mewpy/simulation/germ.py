@@ -9,6 +9,7 @@ from .simulation import Simulator, SimulationResult, ModelContainer
 from mewpy.germ.models import Model, MetabolicModel, RegulatoryModel
 from mewpy.germ.variables import Reaction
 from mewpy.util.constants import ModelConstants
+from mewpy.util.stats import solver_stats
 from mewpy.util.utilities import Dispatcher, AttrDict
 from mewpy.germ.analysis import FBA, pFBA, fva
 from mewpy.solvers.solution import Solution, Status
@@ -199,6 +200,7 @@ class GERMModel(ModelContainer):
         """
         if self.model.is_metabolic():
             self.model.objective = reaction
+            self._model_changed()
 
     # -----------------------------------------------------------------------------
     # Regulatory static attributes
@@ -341,6 +343,7 @@ class Simulation(GERMModel, Simulator):
         :return:
         """
         self.model.objective = value
+        self._model_changed()
 
     @property
     def reference(self) -> Dict[str, Union[float, int]]:
@@ -452,6 +455,42 @@ class Simulation(GERMModel, Simulator):
         return [rxn.id for rxn in self.model.yield_reactions()
                 if rxn.gpr.is_none or rxn.gpr.evaluate(values=values)]
 
+    def genes_reactions(self, genes: List[str]) -> List[str]:
+        """
+        Returns the reactions whose GPR depends on any of the genes, following the order of the model.
+        :param list genes: list of genes identifiers.
+        :return: a list of reaction identifiers.
+        """
+        if not self.model.is_metabolic():
+            return []
+
+        position = getattr(self, '_reaction_position', None)
+        if position is None:
+            position = self._reaction_position = {r_id: i for i, r_id in enumerate(self.reactions)}
+
+        rxns = set()
+        for g_id in genes:
+            gene = self.model.get(g_id)
+            if gene is not None:
+                rxns.update(gene.reactions.keys())
+        # reactions added after the positions were cached are kept last
+        return sorted(rxns, key=lambda r_id: position.get(r_id, len(position)))
+
+    def gene_knockout_reactions(self, genes: List[str]) -> List[str]:
+        """
+        Returns the reactions inactivated by the knockout of a list of genes.
+        Only the GPRs of the reactions associated with the deleted genes are evaluated.
+        :param list genes: list of deleted genes identifiers.
+        :return: a list of inactive reaction identifiers.
+        """
+        values = {g_id: 0.0 for g_id in genes}
+        inactive_reactions = []
+        for r_id in self.genes_reactions(genes):
+            rxn = self.model.get(r_id)
+            if not rxn.gpr.is_none and not rxn.gpr.evaluate(values=values, missing_value=1.0):
+                inactive_reactions.append(r_id)
+        return inactive_reactions
+
     def add_reaction(self, reaction: Reaction, replace: bool = True, comprehensive: bool = True):
         """
         Adds a reaction to the germ model
@@ -470,6 +509,9 @@ class Simulation(GERMModel, Simulator):
             if reaction.id not in self.model.reactions:
                 self.model.add(reaction, comprehensive=comprehensive, history=False)
 
+        self._reset_gene_index()
+        self._model_changed()
+
     def remove_reaction(self, reaction: Reaction, remove_orphans: bool = True):
         """
         Removes a reaction from the germ model
@@ -481,6 +523,8 @@ class Simulation(GERMModel, Simulator):
             return
 
         self.model.remove(reaction, remove_orphans=remove_orphans, history=False)
+        self._reset_gene_index()
+        self._model_changed()
 
     def get_uptake_reactions(self) -> List[str]:
         """
@@ -673,6 +717,8 @@ class Simulation(GERMModel, Simulator):
         :return: SimulationResult object that holds the model, objective, solution values, status,
         environmental conditions and further constraints
         """
+        timer = solver_stats.timer('simulation')
+
         if not objective:
 
             objective = {}
@@ -690,6 +736,9 @@ class Simulation(GERMModel, Simulator):
                                              objective=objective,
                                              minimize=not maximize,
                                              constraints=simulation_constraints)
+        timer.lap('simulate')
+        # the iterations are recorded by the MEWpy solver
+        timer.done(solution.status, len(solution.values) if solution.values else 0)
 
         status = self.__status_mapping[solution.status]
 
@@ -703,6 +752,55 @@ class Simulation(GERMModel, Simulator):
                                 maximize=maximize,
                                 method=method)
 
+    def _simulate_batch(self,
+                        constraints_list: List[Dict[str, Union[float, Tuple[float, float]]]],
+                        method: SimulationMethod = SimulationMethod.FBA,
+                        objective: Dict[str, Union[int, float]] = None,
+                        maximize: bool = True,
+                        reference: Dict[str, Union[int, float]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        It runs a batch of simulations over a single linear problem, which is built only once.
+        MOMA, lMOMA and ROOM are not currently available with GERM models.
+
+        :param constraints_list: a list of dictionaries with additional constraints, one for each simulation
+        :param method: a simulation method
+        :param objective: a dictionary with the objective function
+        :param maximize: maximize or minimize the objective function
+        :param reference: a dictionary with the reference wild-type conditions for KO simulations
+        :return: the fluxes, status and objective values arrays
+        """
+        if method == SimulationMethod.FBA:
+            lp = FBA(self.model).build()
+        elif method == SimulationMethod.pFBA:
+            lp = pFBA(self.model).build()
+        else:
+            return super()._simulate_batch(constraints_list, method=method, objective=objective,
+                                           maximize=maximize, reference=reference)
+
+        if not objective:
+            objective = {}
+
+            if self.model.is_metabolic():
+                objective = {var.id: val for var, val in self.model.objective.items()}
+
+        reactions = self.reactions
+        n = len(constraints_list)
+        fluxes = np.full((n, len(reactions)), np.nan)
+        status = np.empty(n, dtype=object)
+        objective_values = np.full(n, np.nan)
+        for i, constraints in enumerate(constraints_list):
+            constraints = {k: v if isinstance(v, tuple) else (v, v) for k, v in constraints.items()}
+            simulation_constraints = {**constraints, **self.constraints, **self.environmental_conditions}
+            solver_kwargs = {'linear': objective, 'minimize': not maximize, 'constraints': simulation_constraints}
+            solution = lp.optimize(solver_kwargs=solver_kwargs, to_solver=True, get_values=True)
+
+            status[i] = self.__status_mapping[solution.status]
+            if solution.status in (Status.OPTIMAL, Status.SUBOPTIMAL):
+                objective_values[i] = solution.fobj
+                values = solution.values
+                fluxes[i] = [values[r_id] for r_id in reactions]
+        return fluxes, status, objective_values
+
     def FVA(self,
             obj_frac: float = 0.9,
             reactions: List[str] = None,
@@ -710,7 +808,9 @@ class Simulation(GERMModel, Simulator):
             loopless: bool = False,
             internal: List[str] = None,
             solver: Union['Solver', 'CplexSolver', 'GurobiSolver', 'OptLangSolver'] = None,
-            format: str = 'dict'):
+            format: str = 'dict',
+            skip_solves: bool = True,
+            stats: Dict[str, int] = None):
         """
         It performs a Flux Variability Analysis (FVA).
 
@@ -723,6 +823,8 @@ class Simulation(GERMModel, Simulator):
         :param internal: List of internal reactions for looplessFBA (optional).
         :param solver: A pre-instantiated solver instance (optional)
         :param format: The return format: 'dict' to return a dictionary; 'df' to return a data frame.
+        :param skip_solves: Skip solves already attained by previous primal solutions (default: True).
+        :param stats: A dictionary updated with the number of 'solves' and 'skipped' solves (optional).
 
         :return: A dictionary or data frame of flux variation ranges.
         """
@@ -735,7 +837,9 @@ class Simulation(GERMModel, Simulator):
         solution = fva(model=self.model,
                        fraction=obj_frac,
                        reactions=reactions,
-                       constraints=simulation_constraints)
+                       constraints=simulation_constraints,
+                       skip_solves=skip_solves,
+                       stats=stats)
 
         if format == 'df':
             df = pd.concat([pd.DataFrame(solution.index), solution], axis=1)
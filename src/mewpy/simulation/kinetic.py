@@ -20,8 +20,12 @@ Kinetic simulation module
 Author: Vitor Pereira
 ##############################################################################
 """
-from multiprocessing import Process, Manager
+import pickle
+import weakref
+from multiprocessing import Process, Pipe, current_process
+from multiprocessing.connection import wait
 from collections import OrderedDict
+from time import perf_counter
 from mewpy.simulation.simulation import SimulationResult, SimulationInterface
 from mewpy.model.kinetic import ODEModel
 from mewpy.solvers import (KineticConfigurations,
@@ -40,7 +44,9 @@ def kinetic_solve(model: ODEModel,
                   y0: List[float],
                   time_steps: List[float],
                   parameters: Dict[str, float] = None,
-                  factors: Dict[str, float] = None
+                  factors: Dict[str, float] = None,
+                  timeout: float = None,
+                  steady_state: bool = False
                   ) -> Tuple[ODEStatus,
                              Dict['str', float],
                              Dict['str', float],
@@ -58,19 +64,53 @@ def kinetic_solve(model: ODEModel,
     :type parameters: Dict[str,float], optional
     :param factors: factors to be applied to parameters, defaults to None
     :type factors: Dict[str, float], optional
+    :param timeout: The integration timeout, in seconds, defaults to None
+    :type timeout: float, optional
+    :param steady_state: Stops the integration once the norm of dx/dt is below\
+        KineticConfigurations.STEADY_STATE_TOL, in which case the last time point is that of the\
+        steady state, defaults to False
+    :type steady_state: bool, optional
     :return: _description_
     :rtype: _type_
+    :raises TimeoutError: if the integration exceeds the timeout.
     """
 
     rates = OrderedDict()
-    f = model.get_ode(r_dict=rates, params=parameters, factors=factors)
+    f = model.get_ode(r_dict=rates, params=parameters, factors=factors,
+                      vectorized=KineticConfigurations.VECTORIZED_RHS,
+                      sparse=KineticConfigurations.SPARSE_RHS)
+    jac, jac_sparsity = None, None
+    if KineticConfigurations.ANALYTIC_JACOBIAN:
+        jac_sparsity = model.jacobian_sparsity()
+        try:
+            jac = model.get_jacobian(params=parameters, factors=factors,
+                                     sparse=KineticConfigurations.SPARSE_RHS)
+        except ValueError as e:
+            # rate laws that can not be differentiated, the solver uses finite differences
+            warnings.warn(str(e))
+    if timeout:
+        f = _with_deadline(f, timeout)
+    events = None
+    if steady_state:
+        def steady(t, y):
+            return np.linalg.norm(f(t, y)) - KineticConfigurations.STEADY_STATE_TOL
+        events = [steady]
     solver = ode_solver_instance(f, KineticConfigurations.SOLVER_METHOD)
 
-    C, t, y = solver.solve(y0, time_steps)
+    C, t, y = solver.solve(y0, time_steps, jac=jac, jac_sparsity=jac_sparsity, events=events)
+
+    if steady_state and len(t) and t[-1] < time_steps[-1]:
+        # the integration also stops early when the solver fails
+        if np.linalg.norm(f(t[-1], np.asarray(C))) > KineticConfigurations.STEADY_STATE_TOL:
+            return ODEStatus.ERROR, {}, {}, t, y
+        if KineticConfigurations.STEADY_STATE_POLISH and jac is not None:
+            C = _newton_polish(f, jac, t[-1], C)
+        # rates at the steady state
+        f(t[-1], np.asarray(C))
 
     for c in C:
         if c < -1 * SolverConfigurations.RELATIVE_TOL:
-            return ODEStatus.ERROR, {}, {}
+            return ODEStatus.ERROR, {}, {}, t, y
 
     # values bellow solver precision will be set to 0
     rates.update({k: 0 for k, v in rates.items() if (
@@ -80,63 +120,230 @@ def kinetic_solve(model: ODEModel,
     return ODEStatus.OPTIMAL, rates, conc, t, y
 
 
-class KineticThread(Process):
+def _newton_polish(f, jac, t, x, max_iter=10):
+    """Refines a steady state with Newton iterations, using least-squares steps as
+    the Jacobian is singular when there are conserved moieties. 
+    The refined state is only returned if it reduces the norm of dx/dt
+    and has no negative concentrations.
     """
-    Solves the ODE inside a thread enabling to impose a timeout limit
-    with thread.join(timeout)
+    x0 = np.asarray(x, dtype=float)
+    x = x0.copy()
+    fx = np.asarray(f(t, x))
+    norm0 = norm = np.linalg.norm(fx)
+    for _ in range(max_iter):
+        if norm <= SolverConfigurations.ABSOLUTE_TOL * 1e-3:
+            break
+        dx = np.linalg.lstsq(jac(t, x), fx, rcond=None)[0]
+        x_new = x - dx
+        f_new = np.asarray(f(t, x_new))
+        norm_new = np.linalg.norm(f_new)
+        if not norm_new < norm:
+            break
+        x, fx, norm = x_new, f_new, norm_new
+    if norm < norm0 and np.all(x >= -SolverConfigurations.ABSOLUTE_TOL):
+        return x.tolist()
+    return x0.tolist()
+
+
+def _with_deadline(func, seconds):
+    """Wraps the right-hand side of an ODE so that the integration
+    is stopped, with a TimeoutError, once the time is exceeded.
     """
+    end = perf_counter() + seconds
 
-    def __init__(self,
-                 model: ODEModel,
-                 initial_concentrations: List[float] = None,
-                 time_steps: List[float] = None,
-                 parameters: Dict[str, float] = None,
-                 factors: Dict[str, float] = None) -> None:
-        """
-        TSolves the ODE inside a thread enabling to impose a timeout limit
-        with thread.join(timeout)
+    def f(t, y):
+        if perf_counter() > end:
+            raise TimeoutError('Kinetic simulation timeout')
+        return func(t, y)
+    return f
+
+
+def _kinetic_worker(conn, data):
+    """Loop of a kinetic pool worker, which holds the model (and its compiled ODE)
+    and solves the tasks received through the connection.
+    Results are sent back as arrays ordered as the model reactions and metabolites.
+    """
+    model = pickle.loads(data)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        try:
+            status, rates, conc, t, y = kinetic_solve(model, *task)
+            result = (status,
+                      np.fromiter(rates.values(), dtype=float, count=len(rates)),
+                      np.fromiter(conc.values(), dtype=float, count=len(conc)),
+                      np.asarray(t),
+                      np.asarray(y))
+        except Exception as e:
+            result = e
+        conn.send(result)
+
+
+class KineticPool:
+
+    def __init__(self, model: ODEModel, n_workers: int = 1) -> None:
+        """A pool of persistent worker processes that run kinetic simulations of a model.
+        Each worker holds a copy of the model, so that the ODE is only compiled once.
+        A worker that exceeds the timeout of a simulation is killed and replaced,
+        while the other workers are kept.
+        Workers are restarted when rate laws, metabolites, parameters or their values
+        are modified. The pool only holds a weak reference to the model.
 
         :param model: The kinetic model
         :type model: ODEModel
-        :param initial_concentrations: A list of initial concentrations, defaults to None
-        :type initial_concentrations: List[float], optional
-        :param time_steps: List of integration time steps, defaults to None
-        :type time_steps: List[float], optional
-        :param parameters: Kinetic parameters to be modified, defaults to None
-        :type parameters: Dict[str, float], optional
-        :param factors: Factors to be applied to kinetic parameters, defaults to None
-        :type factors: Dict[str, float], optional
+        :param n_workers: The number of workers, defaults to 1
+        :type n_workers: int, optional
+        """
+        self._model = weakref.ref(model)
+        self.n_workers = n_workers
+        self.workers = []
+        self._state = None
+        self._data = None
+
+    @property
+    def model(self) -> ODEModel:
+        model = self._model()
+        if model is None:
+            raise RuntimeError('The kinetic model of the pool no longer exists')
+        return model
+
+    def _start(self):
+        conn, child = Pipe()
+        process = Process(target=_kinetic_worker, args=(child, self._data), daemon=True)
+        process.start()
+        child.close()
+        return process, conn
+
+    def _restart(self, i):
+        process, conn = self.workers[i]
+        process.kill()
+        process.join()
+        conn.close()
+        self.workers[i] = self._start()
+
+    def _check(self):
+        """Starts the workers, or restarts them if the model was modified."""
+        model = self.model
+        # the values of the parameters are pickled with the model of the workers
+        state = (model._version,
+                 tuple(model.merge_constants().values()),
+                 tuple(model.variable_params.values()))
+        if self.workers and self._state == state:
+            return
+        self.close()
+        self._state = state
+        self._data = pickle.dumps(model)
+        self.workers = [self._start() for _ in range(self.n_workers)]
+
+    def map(self,
+            tasks: List[Tuple[List[float], List[float], Dict[str, float], Dict[str, float]]],
+            timeout: float = None) -> List[Tuple[ODEStatus, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """Runs kinetic simulations.
+
+        :param tasks: A list of tuples of kinetic_solve arguments (initial concentrations,\
+            time steps, parameters, factors[, timeout, steady_state])
+        :param timeout: The timeout of each simulation, defaults to None
+        :type timeout: float, optional
+        :return: A list with, for each task, a tuple (status, rates, concentrations, t, y), where rates and\
+            concentrations are arrays ordered as the model reactions and metabolites, or an exception\
+            if the simulation failed or was timed out.
         """
+        self._check()
+        results = [None] * len(tasks)
+        pending = list(enumerate(tasks))
+        pending.reverse()
+        free = list(range(len(self.workers)))
+        busy = dict()
+        while pending or busy:
+            while pending and free:
+                i = free.pop()
+                k, task = pending.pop()
+                try:
+                    self.workers[i][1].send(task)
+                except (BrokenPipeError, OSError):
+                    # the worker died while idle
+                    self._restart(i)
+                    self.workers[i][1].send(task)
+                busy[i] = (k, perf_counter() + timeout if timeout else None)
+            deadlines = [d for _, d in busy.values() if d is not None]
+            wait_time = max(0, min(deadlines) - perf_counter()) if deadlines else None
+            conns = {self.workers[i][1]: i for i in busy}
+            for conn in wait(list(conns), wait_time):
+                i = conns[conn]
+                k, _ = busy.pop(i)
+                try:
+                    results[k] = conn.recv()
+                except EOFError:
+                    results[k] = RuntimeError('The kinetic worker has died')
+                    self._restart(i)
+                free.append(i)
+            now = perf_counter()
+            for i, (k, d) in list(busy.items()):
+                if d is not None and now >= d:
+                    del busy[i]
+                    results[k] = TimeoutError('Kinetic simulation timeout')
+                    self._restart(i)
+                    free.append(i)
+        return results
+
+    def solve(self,
+              y0: List[float],
+              time_steps: List[float],
+              parameters: Dict[str, float] = None,
+              factors: Dict[str, float] = None,
+              timeout: float = None,
+              steady_state: bool = False):
+        """Runs a kinetic simulation. See map."""
+        return self.map([(y0, time_steps, parameters, factors, None, steady_state)], timeout)[0]
+
+    def close(self):
+        """Stops the workers."""
+        for process, conn in self.workers:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+            process.join(1)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self.workers = []
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
-        Process.__init__(self, daemon=False)
-        self.model = model
-        self.parameters = parameters
-        self.factors = factors
-        self.initial_concentrations = initial_concentrations
-        self.time_steps = time_steps
 
-        self.result = Manager().dict()
-        self.result['status'] = None
-        self.result["rates"] = None
-        self.result["concentrations"] = None
-        self.result["t"] = None
-        self.result["y"] = None
+# persistent pools of the models, closed when the models are collected
+_pools = dict()
+
+
+def _close_kinetic_pool(key):
+    pool = _pools.pop(key, None)
+    if pool is not None:
+        pool.close()
 
-    def run(self):
-        try:
-            status, rates, concentrations, t, y = kinetic_solve(self.model,
-                                                                self.initial_concentrations,
-                                                                self.time_steps,
-                                                                self.parameters,
-                                                                self.factors)
-            self.result['status'] = status
-            self.result["rates"] = rates
-            self.result["concentrations"] = concentrations
-            self.result["t"] = t
-            self.result["y"] = y
-        except Exception:
-            warnings.warn('Timeout')
-        return
+
+def kinetic_pool(model: ODEModel) -> KineticPool:
+    """Returns the persistent pool of kinetic workers of a model.
+
+    :param model: The kinetic model
+    :type model: ODEModel
+    :return: The pool
+    :rtype: KineticPool
+    """
+    pool = _pools.get(id(model))
+    if pool is None:
+        pool = _pools[id(model)] = KineticPool(model)
+        weakref.finalize(model, _close_kinetic_pool, id(model))
+    return pool
 
 
 class KineticSimulationResult(SimulationResult):
@@ -148,7 +355,8 @@ class KineticSimulationResult(SimulationResult):
                  rates: Dict[str, float] = None,
                  concentrations: List[float] = None,
                  t: List[float] = None,
-                 y: List[float] = None) -> None:
+                 y: List[float] = None,
+                 steady_state_time: float = None) -> None:
         """Result class of a kinetic simulation
 
         :param model: The kinetic model
@@ -165,12 +373,15 @@ class KineticSimulationResult(SimulationResult):
         :type t: List[float], optional
         :param y: _description_, defaults to None
         :type y: List[float], optional
+        :param steady_state_time: time at which the steady state was reached, defaults to None
+        :type steady_state_time: float, optional
         """
         super(KineticSimulationResult, self).__init__(model, None, fluxes=rates, status=status)
         self.factors = factors
         self.concentrations = concentrations
         self.t = t
         self.y = y
+        self.steady_state_time = steady_state_time
         self.m_indexes = {k: v for v, k in enumerate(concentrations.keys())}
 
     def get_y(self, m_id):
@@ -232,7 +443,8 @@ class KineticSimulation(SimulationInterface):
                  model: ODEModel,
                  parameters: Dict[str, float] = None,
                  t_points: List[float] = [0, 1e9],
-                 timeout: int = KineticConfigurations.SOLVER_TIMEOUT) -> None:
+                 timeout: int = KineticConfigurations.SOLVER_TIMEOUT,
+                 steady_state: bool = False) -> None:
         """Class that runs kinetic simulations
 
         :param model: The kinetic model
@@ -244,12 +456,15 @@ class KineticSimulation(SimulationInterface):
         :type t_points: List[float], optional
         :param timeout: The integration timeout, defaults to KineticConfigurations.SOLVER_TIMEOUT
         :type timeout: int, optional
+        :param steady_state: Stops simulations once a steady state is reached, defaults to False
+        :type steady_state: bool, optional
         """
         if not isinstance(model, ODEModel):
             raise ValueError('model is not an instance of ODEModel.')
         self.model = model
         self.t_points = t_points
         self.timeout = timeout
+        self.steady_state = steady_state
         self.parameters = parameters if parameters else dict()
 
     def get_initial_concentrations(self, initcon: Dict[str, float] = None):
@@ -280,7 +495,8 @@ class KineticSimulation(SimulationInterface):
                  parameters: Dict[str, float] = None,
                  initcon: List[float] = None,
                  factors: Dict[str, float] = None,
-                 t_points: List[float] = None) -> KineticSimulationResult:
+                 t_points: List[float] = None,
+                 steady_state: bool = None) -> KineticSimulationResult:
         """
         Solve an initial value problem for a system of ODEs.
 
@@ -290,10 +506,15 @@ class KineticSimulation(SimulationInterface):
         :param list t_points: Times at which to store the computed solution,\
             must be sorted and lie within t_span. Default None, in which case the number of
             time steps is defined by SolverConfigurations.N_STEPS.
+        :param bool steady_state: Stops the integration once the norm of dx/dt is below\
+            KineticConfigurations.STEADY_STATE_TOL, refining the steady state with Newton iterations\
+            if KineticConfigurations.STEADY_STATE_POLISH. The time at which the steady state was reached\
+            is returned in the result steady_state_time. Default None, as defined in the simulator.
         :returns: Returns a kineticSimulationResult with the steady-state flux distribution and concentrations.
         """
 
         _factors = factors if factors is not None else {}
+        steady_state = self.steady_state if steady_state is None else steady_state
         initConcentrations = self.get_initial_concentrations(initcon)
 
         status = None
@@ -313,31 +534,46 @@ class KineticSimulation(SimulationInterface):
                                      num=SolverConfigurations.N_STEPS,
                                      endpoint=True)
 
-        if self.timeout:
+        if self.timeout and current_process().daemon:
+            # daemonic processes, such as the workers of multiprocessing evaluators,
+            # can not have children: the integration is stopped once the time is exceeded
             try:
-                th = KineticThread(self.model,
-                                   initial_concentrations=initConcentrations,
-                                   time_steps=time_steps,
-                                   parameters=params,
-                                   factors=_factors)
-
-                th.start()
-                th.join(self.timeout)
-                status = th.result['status']
-                sstateRates = th.result['rates']
-                sstateConc = th.result['concentrations']
-                t = th.result['t']
-                y = th.result['y']
-            except AssertionError as e:
-                raise AssertionError(f"{str(e)}. Installing ray for multiprocessing will solve this issue.")
+                status, sstateRates, sstateConc, t, y = kinetic_solve(self.model,
+                                                                      initConcentrations,
+                                                                      time_steps,
+                                                                      params,
+                                                                      _factors,
+                                                                      timeout=self.timeout,
+                                                                      steady_state=steady_state)
             except Exception as e:
                 warnings.warn(str(e))
+                status, sstateRates, sstateConc = ODEStatus.ERROR, {}, {}
+        elif self.timeout:
+            result = kinetic_pool(self.model).solve(initConcentrations,
+                                                    time_steps,
+                                                    parameters=params,
+                                                    factors=_factors,
+                                                    timeout=self.timeout,
+                                                    steady_state=steady_state)
+            if isinstance(result, Exception):
+                warnings.warn(str(result))
+                status, sstateRates, sstateConc = ODEStatus.ERROR, {}, {}
+            else:
+                status, rates, conc, t, y = result
+                sstateRates = OrderedDict(zip(self.model.ratelaws.keys(), rates.tolist())) if len(rates) else {}
+                sstateConc = OrderedDict(zip(self.model.metabolites.keys(), conc.tolist())) if len(conc) else {}
         else:
             status, sstateRates, sstateConc, t, y = kinetic_solve(self.model,
                                                                   initConcentrations,
                                                                   time_steps,
                                                                   params,
-                                                                  _factors)
+                                                                  _factors,
+                                                                  steady_state=steady_state)
+
+        steady_state_time = None
+        if status == ODEStatus.OPTIMAL and steady_state and len(t) and t[-1] < time_steps[-1]:
+            steady_state_time = t[-1]
 
         return KineticSimulationResult(self.model, status, factors=_factors, rates=sstateRates,
-                                       concentrations=sstateConc, t=t, y=y)
+                                       concentrations=sstateConc, t=t, y=y,
+                                       steady_state_time=steady_state_time)
@@ -37,7 +37,11 @@ from reframed.core.model import ReactionType
 from . import SimulationMethod, SStatus, get_default_solver
 from .simulation import Simulator, SimulationResult, ModelContainer
 from mewpy.model.gecko import GeckoModel
+from mewpy.solvers.solution import UnscaledValues
+from mewpy.solvers.solver import scale_bound
 from mewpy.util.constants import ModelConstants
+from mewpy.util.resources import limit_time, set_native_threads
+from mewpy.util.stats import solver_stats
 from mewpy.util.utilities import elements, AttrDict
 from tqdm import tqdm
 
@@ -53,6 +57,85 @@ reaction_type_map = {
     "OTHER": ReactionType.OTHER,
 }
 
+def _pFBA(model, objective=None, obj_frac=None, minimize=False, constraints=None, solver=None):
+    """ Runs REFRAMED pFBA on a persistent solver.
+
+    REFRAMED pFBA adds the objective constraint without committing it to the solver,
+    which only occurs when the pFBA auxiliary variables are first created. On a reused
+    solver, the constraint would otherwise be missing from the flux minimization.
+    """
+    if not hasattr(solver, 'pFBA_flag'):
+        return pFBA(model, objective=objective, obj_frac=obj_frac, minimize=minimize,
+                    constraints=constraints, solver=solver)
+
+    if not objective:
+        objective = model.get_objective()
+    elif isinstance(objective, str):
+        objective = {objective: 1}
+
+    pre_solution = FBA(model, objective, minimize, constraints, solver)
+    if pre_solution.status != s_status.OPTIMAL:
+        return pre_solution
+
+    if obj_frac is None:
+        solver.add_constraint('obj', objective, '=', pre_solution.fobj)
+    else:
+        solver.add_constraint('obj', objective, '>', obj_frac * pre_solution.fobj)
+
+    reversible = [r_id for r_id, rxn in model.reactions.items() if rxn.reversible]
+    p_objective = {r_id: 1 for r_id, rxn in model.reactions.items() if not rxn.reversible}
+    for r_id in reversible:
+        p_objective[r_id + '_p'] = 1
+        p_objective[r_id + '_n'] = 1
+
+    solution = solver.solve(p_objective, minimize=True, constraints=constraints)
+    solution.pre_solution = pre_solution
+    solver.remove_constraint('obj')
+    if solution.values:
+        for r_id in reversible:
+            del solution.values[r_id + '_p']
+            del solution.values[r_id + '_n']
+    return solution
+
+
+def _solver_instance(model, scalefactor=None):
+    """ Returns a REFRAMED solver instance for the model.
+
+    With a scale factor, the LP problem is built with scaled reaction bounds,
+    leaving the model bounds unchanged.
+    """
+    if not scalefactor:
+        solver = solver_instance(model)
+        set_native_threads(solver.problem)
+        return solver
+
+    solver = solver_instance()
+    set_native_threads(solver.problem)
+    for r_id, reaction in model.reactions.items():
+        solver.add_variable(r_id, scale_bound(reaction.lb, scalefactor),
+                            scale_bound(reaction.ub, scalefactor), update=False)
+    solver.update()
+
+    table = model.metabolite_reaction_lookup()
+    for m_id in model.metabolites:
+        solver.add_constraint(m_id, table[m_id], update=False)
+    solver.update()
+    return solver
+
+
+def _scale_values(values, scalefactor):
+    """ Scales a dictionary of constraints or reference fluxes."""
+    if not values:
+        return values
+    scaled = dict()
+    for r_id, x in values.items():
+        if isinstance(x, (tuple, list)):
+            scaled[r_id] = tuple(scale_bound(v, scalefactor) for v in x)
+        else:
+            scaled[r_id] = scale_bound(x, scalefactor)
+    return scaled
+
+
 # TODO: missing proteins and set objective implementations
 class CBModelContainer(ModelContainer):
     """ A basic container for REFRAMED models.
@@ -202,6 +285,9 @@ class Simulation(CBModelContainer, Simulator):
         self._gene_to_reaction = None
         self.solver = solver
         self._reset_solver = reset_solver
+        # persistent solver sessions (one per simulation method)
+        # used when the solver is not reset between simulations
+        self._sessions = dict()
         self.reverse_sintax = [('_b', '_f')]
         self._m_r_lookup = None
 
@@ -265,9 +351,52 @@ class Simulation(CBModelContainer, Simulator):
                 reaction identifier with respective coeficients.')
 
         self.model.set_objective(d)
+        self._model_changed()
 
     def set_objective(self, reaction_id: str):
         self.model.set_objective({reaction_id: 1})
+        self._model_changed()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # solver instances are not serializable
+        state['solver'] = None
+        state['_sessions'] = dict()
+        return state
+
+    def reset_sessions(self):
+        """Discards the persistent solver sessions, and replaces the worker pool on the next
+        parallel simulation. Needs to be invoked whenever the model is changed outside the simulator,
+        otherwise the LP problems kept by the sessions and the models of the workers become outdated.
+        """
+        self.solver = None
+        self._sessions = dict()
+        self._model_changed()
+
+    def _session_solver(self, method, reference=None, scalefactor=None):
+        """Returns the persistent solver of a simulation method.
+
+        The LP problem is built only once and reused by consecutive simulations.
+        Simulation constraints are applied as temporary bounds, which the solver
+        reverts after each solve, keeping the last basis as warm start.
+        As lMOMA and ROOM add the reference to the problem, their sessions are
+        rebuilt when the reference changes. Scaled problems have their own sessions,
+        one for each scale factor.
+
+        :param method: The SimulationMethod
+        :param dict reference: The reference flux distribution
+        :param float scalefactor: A scaling factor of the LP problem
+        :returns: A solver instance
+        """
+        if method == SimulationMethod.FBA and self.solver is not None and not scalefactor:
+            return self.solver
+        key = (method, scalefactor) if scalefactor else method
+        a_solver, a_reference = self._sessions.get(key, (None, None))
+        if a_solver is None or (method in (SimulationMethod.lMOMA, SimulationMethod.ROOM)
+                                and a_reference is not reference):
+            a_solver = _solver_instance(self.model, scalefactor)
+            self._sessions[key] = (a_solver, reference)
+        return a_solver
 
     def update(self):
         """Updates the model
@@ -357,6 +486,8 @@ class Simulation(CBModelContainer, Simulator):
 
         reaction.metadata = annotations
         self.model.add_reaction(reaction, replace=replace)
+        self.reset_sessions()
+        self._reset_gene_index()
 
     def remove_reaction(self, r_id:str):
         """Removes a reaction from the model.
@@ -365,6 +496,8 @@ class Simulation(CBModelContainer, Simulator):
             r_id (str): The reaction identifier.
         """
         self.model.remove_reaction(r_id)
+        self.reset_sessions()
+        self._reset_gene_index()
     
     def remove_reactions(self, rxn_ids):
         """_summary_
@@ -374,13 +507,15 @@ class Simulation(CBModelContainer, Simulator):
         """
         for r_id in rxn_ids:
             self.model.remove_reactions(r_id)
+        self.reset_sessions()
+        self._reset_gene_index()
     
 
     def update_stoichiometry(self, rxn_id:str, stoichiometry:dict):
         rxn = self.model.reactions[rxn_id]
         rxn.stoichiometry = OrderedDict(stoichiometry)
         self.model._needs_update = True
-        self.solver = None
+        self.reset_sessions()
 
     def get_uptake_reactions(self):
         """
@@ -495,6 +630,7 @@ class Simulation(CBModelContainer, Simulator):
             else:
                 self._constraints[reaction] = (lb, ub)
         self.model.set_flux_bounds(reaction, lb, ub)
+        self.reset_sessions()
 
     def find_bounds(self):
         """
@@ -522,6 +658,48 @@ class Simulation(CBModelContainer, Simulator):
             if rxn.lb <= lower_bound and rxn.ub >= upper_bound
         ]
 
+    def _simulation_constraints(self, constraints):
+        """Returns the simulation constraints, excluding those that would
+        alter the environmental conditions when such changes are not allowed.
+        """
+        simul_constraints = OrderedDict()
+        if constraints:
+            if not self._allow_env_changes:
+                simul_constraints.update({k: v for k, v in constraints.items()
+                                        if k not in list(self._environmental_conditions.keys())})
+            else:
+                simul_constraints.update(constraints)
+        return simul_constraints
+
+    def _solve(self, method, objective, maximize, constraints, reference, solver, get_values=True):
+        """Runs a simulation method on a solver instance.
+
+        :returns: A REFRAMED Solution
+        """
+        if method == SimulationMethod.FBA:
+            solution = FBA(self.model, objective=objective, minimize=not maximize,
+                           constraints=constraints, solver=solver, get_values=get_values)
+        elif method == SimulationMethod.pFBA:
+            solution = _pFBA(self.model, objective=objective, minimize=not maximize,
+                             constraints=constraints, solver=solver, obj_frac=0.999)
+        elif method == SimulationMethod.lMOMA:
+            solution = lMOMA(self.model, constraints=constraints,
+                             reference=reference, solver=solver)
+        elif method == SimulationMethod.MOMA:
+            solution = MOMA(self.model, constraints=constraints,
+                            reference=reference, solver=solver)
+        elif method == SimulationMethod.ROOM:
+            solution = ROOM(self.model, constraints=constraints,
+                            reference=reference, solver=solver)
+        # Special case in which only the simulation context is required without any simulatin result
+        elif method == SimulationMethod.NONE:
+            solution = Solution(status=s_status.UNKNOWN,
+                                message=None, fobj=None, values=None)
+        else:
+            raise Exception(
+                "Unknown method to perform the simulation.")
+        return solution
+
     # Simulate
     def simulate(self, objective=None, method=SimulationMethod.FBA,
                  maximize=True, constraints=None, reference=None,
@@ -535,82 +713,51 @@ class Simulation(CBModelContainer, Simulator):
         :param dic constraints: A dictionary of constraints to be applied to the model.
         :param dic reference: A dictionary of reaction flux values.
         :param float scalefactor: A positive scaling factor for the solver. Default None.
+            The LP problem is built with scaled bounds, and simulation constraints and reference fluxes are
+            scaled accordingly. Scaling is not applied to ROOM nor to user provided solver instances.
         :param solver: An instance of the solver.
         '''
 
+        timer = solver_stats.timer('simulation')
+
         if not objective:
             objective = self.model.get_objective()
 
-        simul_constraints = OrderedDict()
-        if constraints:
-            if not self._allow_env_changes:
-                simul_constraints.update({k: v for k, v in constraints.items()
-                                        if k not in list(self._environmental_conditions.keys())})
-            else:
-                simul_constraints.update(constraints)
-
-        if solver is not None:
-            a_solver = solver
-        elif self._reset_solver:
-            a_solver = solver_instance(self.model)
-        else:
-            if self.solver is None:
-                self.solver = solver_instance(self.model)
-            a_solver = self.solver
-
-        # scales the model if a scalling factor is defined.
-        # ... scalling should be implemented at the solver level.
-        if scalefactor:
-            for _, rxn in self.model.reactions.items():
-                rxn.lb = rxn.lb * scalefactor
-                rxn.ub = rxn.ub * scalefactor
-            if simul_constraints:
-                for idx, constraint in simul_constraints.items():
-                    if isinstance(constraint, (int, float)):
-                        simul_constraints[idx] = constraint * scalefactor
-                    elif isinstance(constraint, tuple):
-                        simul_constraints[idx] = tuple(
-                            x * scalefactor for x in constraint)
-                    else:
-                        raise ValueError("Could not scale the model")
+        simul_constraints = self._simulation_constraints(constraints)
 
         # TODO: simplifly ...using python >=3.10 cases
         if method in [SimulationMethod.lMOMA, SimulationMethod.MOMA, SimulationMethod.ROOM] and reference is None:
             reference = self.reference
 
-        if method == SimulationMethod.FBA:
-            get_values = not slim
-            solution = FBA(self.model, objective=objective, minimize=not maximize,
-                           constraints=simul_constraints, solver=a_solver, get_values=get_values)
-        elif method == SimulationMethod.pFBA:
-            solution = pFBA(self.model, objective=objective, minimize=not maximize,
-                            constraints=simul_constraints, solver=a_solver, obj_frac=0.999)
-        elif method == SimulationMethod.lMOMA:
-            solution = lMOMA(self.model, constraints=simul_constraints,
-                             reference=reference, solver=a_solver)
-        elif method == SimulationMethod.MOMA:
-            solution = MOMA(self.model, constraints=simul_constraints,
-                            reference=reference, solver=a_solver)
-        elif method == SimulationMethod.ROOM:
-            solution = ROOM(self.model, constraints=simul_constraints,
-                            reference=reference, solver=a_solver)
-        # Special case in which only the simulation context is required without any simulatin result
-        elif method == SimulationMethod.NONE:
-            solution = Solution(status=s_status.UNKNOWN,
-                                message=None, fobj=None, values=None)
+        if solver is not None or method == SimulationMethod.ROOM:
+            scalefactor = None
+
+        if solver is not None:
+            a_solver = solver
+        elif self._reset_solver:
+            a_solver = _solver_instance(self.model, scalefactor)
         else:
-            raise Exception(
-                "Unknown method to perform the simulation.")
+            a_solver = self._session_solver(method, reference, scalefactor)
+        limit_time(a_solver.problem)
+        timer.lap('build')
 
-        # undoes the model scaling
         if scalefactor:
-            for _, rxn in self.model.reactions.items():
-                rxn.lb = rxn.lb / scalefactor
-                rxn.ub = rxn.ub / scalefactor
-            if solution.status in (s_status.OPTIMAL, s_status.SUBOPTIMAL):
-                solution.fobj = solution.fobj / scalefactor
-                for x, y in solution.values.items():
-                    solution.values[x] = y / scalefactor
+            simul_constraints = _scale_values(simul_constraints, scalefactor)
+            # reference fluxes are scaled as the problem bounds
+            reference = _scale_values(reference, scalefactor)
+
+        solution = self._solve(method, objective, maximize, simul_constraints,
+                               reference, a_solver, get_values=not slim)
+        timer.lap('simulate')
+        timer.done(solution.status, len(solution.values) if solution.values else 0,
+                   getattr(a_solver, 'problem', None))
+
+        # results are unscaled lazily
+        if scalefactor and solution.status in (s_status.OPTIMAL, s_status.SUBOPTIMAL):
+            # the MOMA objective is quadratic
+            solution.fobj = solution.fobj / (scalefactor ** 2 if method == SimulationMethod.MOMA else scalefactor)
+            if solution.values:
+                solution.values = UnscaledValues(solution.values, scalefactor)
 
         if slim:
             return solution.fobj
@@ -622,8 +769,34 @@ class Simulation(CBModelContainer, Simulator):
                                       simul_constraints=constraints, maximize=maximize, method=method)
             return result
 
+    def _simulate_batch(self, constraints_list, method=SimulationMethod.FBA, objective=None,
+                        maximize=True, reference=None):
+        if not objective:
+            objective = self.model.get_objective()
+        if method in [SimulationMethod.lMOMA, SimulationMethod.MOMA, SimulationMethod.ROOM] and reference is None:
+            reference = self.reference
+        if self._reset_solver:
+            a_solver = _solver_instance(self.model)
+        else:
+            a_solver = self._session_solver(method, reference)
+
+        reactions = self.reactions
+        n = len(constraints_list)
+        fluxes = np.full((n, len(reactions)), np.nan)
+        status = np.empty(n, dtype=object)
+        objective_values = np.full(n, np.nan)
+        for i, constraints in enumerate(constraints_list):
+            solution = self._solve(method, objective, maximize, self._simulation_constraints(constraints),
+                                   reference, a_solver)
+            status[i] = self.__status_mapping[solution.status]
+            if solution.status in (s_status.OPTIMAL, s_status.SUBOPTIMAL):
+                objective_values[i] = solution.fobj
+                values = solution.values
+                fluxes[i] = [values[r_id] for r_id in reactions]
+        return fluxes, status, objective_values
+
     def FVA(self, reactions=None, obj_frac=0.9, constraints=None, loopless=False, internal=None, solver=None,
-            format='dict'):
+            format='dict', jobs=None, chunk_size=None, skip_solves=True, stats=None):
         """ Flux Variability Analysis (FVA).
 
         :param model: An instance of a constraint-based model.
@@ -635,7 +808,12 @@ class Simulation(CBModelContainer, Simulator):
         :param boolean loopless: Run looplessFBA internally (very slow) (default: false).
         :param list internal: List of internal reactions for looplessFBA (optional).
         :param solver: A pre-instantiated solver instance (optional)
-        :param format: The return format: 'dict', returns a dictionary,'df' returns a data frame.
+        :param format: The return format: 'dict', returns a dictionary,'df' returns a data frame,\
+            'array' returns a (reactions x 2) array.
+        :param int jobs: The number of worker processes (default: 1).
+        :param int chunk_size: The number of reactions sent to a worker at a time (optional).
+        :param bool skip_solves: Skip solves already attained by previous primal solutions (default: True).
+        :param dict stats: A dictionary updated with the number of 'solves' and 'skipped' solves (optional).
         :returns: A dictionary of flux variation ranges.
 
         """
@@ -652,11 +830,18 @@ class Simulation(CBModelContainer, Simulator):
         else:
             raise ValueError('Invalid reactions.')
 
+        if loopless or solver is not None:
+            from reframed.cobra.variability import FVA
+            res = FVA(self.model, obj_frac=obj_frac, reactions=_reactions,
+                      constraints=simul_constraints, loopless=loopless, internal=internal, solver=solver)
+        else:
+            from mewpy.cobra.variability import FVA
+            res = FVA(self, obj_frac=obj_frac, reactions=_reactions, constraints=simul_constraints,
+                      jobs=jobs, chunk_size=chunk_size, skip_solves=skip_solves, stats=stats)
 
-        from reframed.cobra.variability import FVA
-        res = FVA(self.model, obj_frac=obj_frac, reactions=_reactions,
-                  constraints=simul_constraints, loopless=loopless, internal=internal, solver=solver)
-        if format == 'df':
+        if format == 'array':
+            return np.array([[np.nan if x is None else x for x in res[r_id]] for r_id in _reactions], dtype=float)
+        elif format == 'df':
             import pandas as pd
             e = res.items()
             f = [[a, b, c] for a, [b, c] in e]
@@ -777,7 +962,7 @@ class GeckoSimulation(Simulation):
             st[met] = -1/kcat
             rx.stoichiometry = st
             self.model._needs_update=True
-            self.solver=None
+            self.reset_sessions()
         else:
             LOGGER.warn(f'Could not identify {protein} ' 
                         f'protein specie in reaction {reaction}')
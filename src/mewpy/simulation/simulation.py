@@ -23,14 +23,24 @@ Author: Vitor Pereira
 """
 from abc import abstractmethod, ABC
 from collections import OrderedDict
+from collections.abc import MutableMapping
 from enum import Enum
+from functools import partial
 from joblib import Parallel, delayed
 from tqdm import tqdm
 from copy import deepcopy
+import hashlib
+import json
 import math
+import multiprocessing
+import os
+import weakref
+import numpy as np
 
-from ..util.parsing import evaluate_expression_tree
+from ..util.constants import ModelConstants
+from ..util.parsing import BooleanEvaluator, compile_expression
 from ..util.process import cpu_count
+from ..util.resources import WorkerPolicy, set_native_threads
 
 from typing import List, Union
 
@@ -203,6 +213,7 @@ class Simulator(ModelContainer, SimulationInterface):
     @abstractmethod
     def FVA(self, reactions=None, obj_frac=0, constraints=None, loopless=False, internal=None, solver=None):
         """ Abstract method to run Flux Variability Analysis (FVA).
+        Simulators may also accept the number of parallel ``jobs`` and ``format='array'``.
 
         :returns: A dictionary of flux range values.
 
@@ -213,6 +224,8 @@ class Simulator(ModelContainer, SimulationInterface):
                     reference=None, solver=None, jobs=None, desc="Parallel Simulation", **kwargs):
         """Parallel phenotype simulations.
 
+        Simulations run on a pool of worker processes kept by the simulator (see imap_simulate).
+
         :param (dict) objective: The simulations objective. If none, the model objective is considered.
         :param (SimulationMethod) method: The SimulationMethod (FBA, pFBA, lMOMA, etc ...)
         :param (boolean) maximize: The optimization direction
@@ -225,12 +238,136 @@ class Simulator(ModelContainer, SimulationInterface):
         constraints_list = [None] if not constraints_list else constraints_list
         jobs = jobs if jobs else cpu_count()
         print(f"Using {jobs} jobs")
-        from ..util.utilities import tqdm_joblib
-        with tqdm_joblib(tqdm(desc=desc, total=len(constraints_list))) as progress_bar:
-            res = Parallel(n_jobs=jobs)(delayed(simulate)(self.model, self.environmental_conditions, objective, method,
-                                                          maximize, constraints, reference, solver, **kwargs) for constraints in constraints_list)
+        res = self.imap_simulate(constraints_list, objective=objective, method=method, maximize=maximize,
+                                 reference=reference, solver=solver, jobs=jobs, **kwargs)
+        return list(tqdm(res, desc=desc, total=len(constraints_list)))
+
+    def imap_simulate(self, constraints_list, objective=None, method=SimulationMethod.FBA, maximize=True,
+                      reference=None, solver=None, jobs=None, ordered=True, chunksize=None, **kwargs):
+        """Runs a phenotype simulation for each set of constraints on a pool of worker processes,
+        yielding the results as they are returned.
+
+        The pool is kept by the simulator and reused by following calls. Workers receive the simulator,
+        including the model and environmental conditions, only once and keep their own solver instances,
+        so that tasks only carry the constraints. The pool is replaced when the number of jobs changes, or
+        when the model bounds, reactions, stoichiometry or objective are changed through the simulator.
+        Changes made directly to the model require close_pool (or reset_sessions, for REFRAMED).
+        Results are returned without the model, which is set back by the calling process.
+
+        :param (list) constraints_list: A list of dictionaries of constraints, one for each simulation.
+        :param (dict) objective: The simulations objective. If none, the model objective is considered.
+        :param (SimulationMethod) method: The SimulationMethod (FBA, pFBA, lMOMA, etc ...)
+        :param (boolean) maximize: The optimization direction
+        :param (dict) reference: A dictionary of reaction flux values.
+        :param (Solver) solver: An instance of the solver.
+        :param (int) jobs: The number of worker processes. Default, cpu_count().
+        :param (boolean) ordered: If True, results are yielded in the order of the constraints.\
+            Otherwise, (index, result) tuples are yielded as simulations complete.
+        :param (int) chunksize: The number of simulations sent to a worker at a time.\
+            By default, simulations are split into four chunks per worker.
+        :returns: A generator of SimulationResult instances.
+        """
+        constraints_list = list(constraints_list)
+        jobs = jobs if jobs else cpu_count()
+        if not chunksize:
+            chunksize = max(1, math.ceil(len(constraints_list) / (4 * jobs)))
+        pool = self._simulation_pool(jobs)
+        task = partial(_simulate_task, objective=objective, method=method, maximize=maximize,
+                       reference=reference, solver=solver, **kwargs)
+        if ordered:
+            for res in pool.imap(task, enumerate(constraints_list), chunksize=chunksize):
+                yield self._attach_model(res[1])
+        else:
+            for i, res in pool.imap_unordered(task, enumerate(constraints_list), chunksize=chunksize):
+                yield i, self._attach_model(res)
+
+    def _attach_model(self, res):
+        if isinstance(res, SimulationResult) and res.model is None:
+            res.model = self.model
         return res
 
+    def _simulation_pool(self, jobs):
+        """Returns the worker pool of the simulator, which is created, or replaced if the number
+        of jobs or the model changed since its creation.
+        """
+        key = id(self)
+        revision = getattr(self, '_revision', 0)
+        pool, pool_jobs, pool_revision = _POOLS.get(key, (None, None, None))
+        if pool is not None and (pool_jobs != jobs or pool_revision != revision):
+            self.close_pool()
+            pool = None
+        if pool is None:
+            pool = multiprocessing.Pool(processes=jobs, initializer=_init_simulation_worker,
+                                        initargs=(self, WorkerPolicy(jobs)))
+            _POOLS[key] = (pool, jobs, revision)
+            if key not in _FINALIZERS:
+                _FINALIZERS[key] = weakref.finalize(self, _release_pool, key)
+        return pool
+
+    def _model_changed(self):
+        """Invoked by the methods that change the model, so that the worker pool,
+        whose workers hold a copy of the model, is replaced on the next parallel simulation.
+        """
+        self._revision = getattr(self, '_revision', 0) + 1
+
+    def close_pool(self):
+        """Terminates the worker processes used by simulate_mp, if any."""
+        _close_pool(id(self))
+
+    def simulate_batch(self, constraints_list, method=SimulationMethod.FBA, objective=None, maximize=True,
+                       reference=None, jobs=None):
+        """Runs a phenotype simulation for each set of constraints reusing a same solver instance.
+        Contrary to simulate, the results are not kept as SimulationResult instances but as arrays,
+        which makes it suitable for large knockout screens or sweeps over environmental conditions.
+
+        :param (list) constraints_list: A list of dictionaries of constraints, one for each simulation.
+        :param (SimulationMethod) method: The SimulationMethod (FBA, pFBA, lMOMA, etc ...)
+        :param (dict) objective: The simulations objective. If none, the model objective is considered.
+        :param (boolean) maximize: The optimization direction
+        :param (dict) reference: A dictionary of reaction flux values.
+        :param (int) jobs: The number of processes among which the simulations are split.
+            Default None, the simulations are run in the current process.
+        :returns: A BatchSimulationResult.
+        """
+        constraints_list = [c if c else {} for c in constraints_list]
+        n = len(constraints_list)
+        if jobs and jobs > 1 and n > 1:
+            chunks = [list(c) for c in np.array_split(np.arange(n), min(jobs, n))]
+            res = Parallel(n_jobs=len(chunks))(delayed(_simulate_batch)(self,
+                                                                        [constraints_list[i] for i in chunk],
+                                                                        method, objective, maximize, reference)
+                                               for chunk in chunks)
+            fluxes = np.vstack([r[0] for r in res])
+            status = np.concatenate([r[1] for r in res])
+            objective_values = np.concatenate([r[2] for r in res])
+        else:
+            fluxes, status, objective_values = self._simulate_batch(constraints_list, method=method,
+                                                                    objective=objective, maximize=maximize,
+                                                                    reference=reference)
+        return BatchSimulationResult(self.reactions, fluxes, status, objective_values,
+                                     constraints_list=constraints_list, method=method, maximize=maximize)
+
+    def _simulate_batch(self, constraints_list, method=SimulationMethod.FBA, objective=None,
+                        maximize=True, reference=None):
+        """Runs the batch of simulations in the current process. Simulators should override this method
+        to reuse a single solver instance and avoid building SimulationResult instances.
+
+        :returns: The flux values, status and objective values arrays.
+        """
+        reactions = self.reactions
+        n = len(constraints_list)
+        fluxes = np.full((n, len(reactions)), np.nan)
+        status = np.empty(n, dtype=object)
+        objective_values = np.full(n, np.nan)
+        for i, constraints in enumerate(constraints_list):
+            res = self.simulate(objective=objective, method=method, maximize=maximize,
+                                constraints=constraints, reference=reference)
+            status[i] = res.status
+            if res.status in (SStatus.OPTIMAL, SStatus.SUBOPTIMAL):
+                objective_values[i] = res.objective_value
+                fluxes[i] = [res.fluxes[r_id] for r_id in reactions]
+        return fluxes, status, objective_values
+
     @abstractmethod
     def get_reaction_bounds(self, r_id):
         raise NotImplementedError
@@ -330,23 +467,28 @@ class Simulator(ModelContainer, SimulationInterface):
         res = self.simulate(constraints={rxn: 0}, slim=True)
         return res is None or math.isnan(res) or res < min_growth
 
-    def essential_reactions(self, min_growth=0.01):
+    def essential_reactions(self, min_growth=0.01, jobs=None):
         """Essential reactions are those when knocked out enable a biomass flux value above a minimal growth defined as
         a percentage of the wild type growth.
 
+        Reactions that carry no flux in a solution with a growth above the minimal growth, such as the wild type
+        pFBA solution, can not be essential and are not simulated.
+
         :param float min_growth: Minimal percentage of the wild type growth value. Default 0.01 (1%).
+        :param (int) jobs: The number of parallel jobs. Default None, simulations run in the current process.
         :returns: A list of essential reactions.
         """
         essential = getattr(self, '_essential_reactions', None)
         if essential is not None:
             return essential
-        essential = []
-        for rxn in tqdm(self.reactions):
-            if self.is_essential_reaction(rxn, min_growth=min_growth):
-                essential.append(rxn)
-        self._essential_reactions = essential
+        candidates = [(r_id, [r_id]) for r_id in self.reactions]
+        self._essential_reactions = self._essential(candidates, 'reactions', min_growth=min_growth, jobs=jobs)
         return self._essential_reactions
 
+    def _evaluate_gpr(self, gpr, active_genes):
+        evaluator = BooleanEvaluator(active_genes)
+        return compile_expression(str(gpr)).evaluate(evaluator.f_operand, evaluator.f_operator)
+
     def evaluate_gprs(self, active_genes):
         """Returns the list of active reactions for a given list of active genes.
 
@@ -359,45 +501,115 @@ class Simulator(ModelContainer, SimulationInterface):
         for r_id in reactions:
             gpr = self.get_gpr(r_id)
             if gpr:
-                if evaluate_expression_tree(str(gpr), active_genes):
+                if self._evaluate_gpr(gpr, active_genes):
                     active_reactions.append(r_id)
             else:
                 active_reactions.append(r_id)
         return active_reactions
 
-    def is_essential_gene(self, gene, min_growth=0.01):
+    def genes_reactions(self, genes):
+        """Returns the reactions whose GPR rule depends on any of the genes, following the order of the model.
+
+        :param list genes: List of genes identifiers.
+        :returns: A list of reaction identifiers.
+        """
         gr = self.get_gene_reactions()
-        active_genes = set(self.genes) - {gene}
-        rxns = gr.get(gene, [])
-        if not rxns:
-            return False
+        position = getattr(self, '_reaction_position', None)
+        if position is None:
+            position = self._reaction_position = {r_id: i for i, r_id in enumerate(self.reactions)}
+        rxns = set(r_id for g in genes for r_id in gr.get(g, []))
+        # reactions added after the positions were cached are kept last
+        return sorted(rxns, key=lambda r_id: position.get(r_id, len(position)))
+
+    def _reset_gene_index(self):
+        """Discards the cached gene to reactions map and reaction positions when reactions change."""
+        self._gene_to_reaction = None
+        self._reaction_position = None
+
+    def gene_knockout_reactions(self, genes):
+        """Returns the reactions inactivated by the knockout of a list of genes.
+        Only the GPR rules of reactions associated to the deleted genes are evaluated.
+
+        :param list genes: List of deleted genes identifiers.
+        :returns: A list of inactive reaction identifiers.
+        """
+        deleted = set(genes)
+        active_genes = _ActiveGenes(self.get_gene_reactions(), deleted)
         inactive_reactions = []
-        for r_id in rxns:
+        for r_id in self.genes_reactions(deleted):
             gpr = self.get_gpr(r_id)
-            if gpr and not evaluate_expression_tree(str(gpr), active_genes):
+            if gpr and not self._evaluate_gpr(gpr, active_genes):
                 inactive_reactions.append(r_id)
+        return inactive_reactions
+
+    def is_essential_gene(self, gene, min_growth=0.01):
+        gr = self.get_gene_reactions()
+        if not gr.get(gene):
+            return False
+        inactive_reactions = self.gene_knockout_reactions([gene])
         constraints = {rxn: 0 for rxn in inactive_reactions}
         res = self.simulate(constraints=constraints, slim=True)
         return res is None or math.isnan(res) or res < min_growth
 
-    def essential_genes(self, min_growth=0.01):
+    def essential_genes(self, min_growth=0.01, jobs=None):
         """Essential genes are those when deleted enable a biomass flux value above a minimal growth defined as
         a percentage of the wild type growth.
 
+        Genes whose deletion only inactivates reactions that carry no flux in a solution with a growth above
+        the minimal growth, such as the wild type pFBA solution, can not be essential and are not simulated.
+
         :param float min_growth: Minimal percentage of the wild type growth value. Default 0.01 (1%).
+        :param (int) jobs: The number of parallel jobs. Default None, simulations run in the current process.
         :returns: A list of essential genes.
 
         """
         essential = getattr(self, '_essential_genes', None)
         if essential is not None:
             return essential
-        essential = []
-        for g in tqdm(self.genes):
-            if self.is_essential_gene(g, min_growth=min_growth):
-                essential.append(g)
-        self._essential_genes = essential
+        gr = self.get_gene_reactions()
+        candidates = [(g, self.gene_knockout_reactions([g])) for g in self.genes if gr.get(g)]
+        self._essential_genes = self._essential(candidates, 'genes', min_growth=min_growth, jobs=jobs)
         return self._essential_genes
 
+    def _essential(self, candidates, kind, min_growth=0.01, jobs=None):
+        """Identifies the essential candidates, each defined by the list of reactions it knocks out.
+
+        :param list candidates: A list of (identifier, reactions) tuples.
+        :param str kind: The kind of candidates, used to identify cached results.
+        :param float min_growth: The minimal growth.
+        :param (int) jobs: The number of parallel jobs.
+        :returns: The list of essential identifiers.
+        """
+        filename = _essential_cache_file(self, kind, min_growth)
+        if filename and os.path.exists(filename):
+            with open(filename) as f:
+                return json.load(f)
+
+        solutions = []
+        wt = self.simulate(method=SimulationMethod.pFBA)
+        if wt.status in (SStatus.OPTIMAL, SStatus.SUBOPTIMAL):
+            x = np.array([wt.fluxes[r_id] for r_id in self.reactions])
+            if _growth(self, x) >= min_growth:
+                solutions.append(x)
+        candidates = _prune(self, candidates, solutions)
+
+        jobs = min(jobs, len(candidates)) if jobs else 1
+        if jobs > 1:
+            chunks = np.array_split(np.arange(len(candidates)), jobs)
+            res = Parallel(n_jobs=jobs)(delayed(_essential_screen)(self, [candidates[i] for i in chunk], min_growth)
+                                        for chunk in chunks)
+            found = set(key for r in res for key in r)
+        else:
+            found = set(_essential_screen(self, candidates, min_growth))
+        # keeps the order of the model
+        essential = [key for key, _ in candidates if key in found]
+
+        if filename:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, 'w') as f:
+                json.dump(essential, f)
+        return essential
+
     @property
     def reference(self):
         """The reference wild type reaction flux values.
@@ -469,6 +681,280 @@ class Simulator(ModelContainer, SimulationInterface):
         return deepcopy(self)
 
 
+class _ActiveGenes:
+    """The genes that remain active after a knockout, without building the list of all active genes."""
+
+    def __init__(self, genes, deleted):
+        self.genes = genes
+        self.deleted = deleted
+
+    def __contains__(self, gene):
+        return gene in self.genes and gene not in self.deleted
+
+
+def _growth(simulator, fluxes):
+    """Returns the objective value of a flux vector following the order of the simulator reactions."""
+    index = {r_id: i for i, r_id in enumerate(simulator.reactions)}
+    return sum(coef * fluxes[index[r_id]] for r_id, coef in simulator.objective.items())
+
+
+def _prune(simulator, candidates, solutions, abstol=1e-9):
+    """Removes the candidates whose reactions carry no flux in any of the solutions."""
+    if not solutions:
+        return candidates
+    index = {r_id: i for i, r_id in enumerate(simulator.reactions)}
+    zero = np.abs(np.vstack(solutions)) < abstol
+    return [(key, rxns) for key, rxns in candidates
+            if not zero[:, [index[r_id] for r_id in rxns]].all(axis=1).any()]
+
+
+def _essential_screen(simulator, candidates, min_growth, batch_size=16):
+    """Simulates the knockout of each candidate, returning the essential ones.
+    Solutions of non essential candidates are used to prune the remaining candidates.
+    Batches double in size as pruning becomes less likely.
+    """
+    essential = []
+    while candidates:
+        batch, candidates = candidates[:batch_size], candidates[batch_size:]
+        res = simulator.simulate_batch([{r_id: 0 for r_id in rxns} for _, rxns in batch])
+        solutions = []
+        for (key, _), growth, x in zip(batch, res.objective_values, res.fluxes):
+            if np.isnan(growth) or growth < min_growth:
+                essential.append(key)
+            else:
+                solutions.append(x)
+        candidates = _prune(simulator, candidates, solutions)
+        batch_size *= 2
+    return essential
+
+
+def _model_digest(simulator):
+    """Returns a hash of the model structure and bounds, objective, medium and persistent constraints."""
+    h = hashlib.sha256()
+    m_r = simulator.metabolite_reaction_lookup()
+    for r_id in simulator.reactions:
+        h.update(repr((r_id, simulator.get_reaction_bounds(r_id), str(simulator.get_gpr(r_id)))).encode())
+    for m_id in sorted(m_r.keys()):
+        h.update(repr((m_id, sorted(m_r[m_id].items()))).encode())
+    h.update(repr(sorted(simulator.objective.items())).encode())
+    h.update(repr(sorted(simulator.environmental_conditions.items())).encode())
+    h.update(repr(sorted(getattr(simulator, '_constraints', dict()).items())).encode())
+    return h.hexdigest()
+
+
+def _essential_cache_file(simulator, kind, min_growth):
+    """Returns the file where essentiality results are cached, identified by a hash of the model
+    and of the medium, or None if ModelConstants.CACHE_DIR is not defined.
+    """
+    if not ModelConstants.CACHE_DIR:
+        return None
+    h = hashlib.sha256()
+    h.update(_model_digest(simulator).encode())
+    h.update(repr((kind, min_growth)).encode())
+    return os.path.join(ModelConstants.CACHE_DIR, f"essential_{kind}_{h.hexdigest()}.json")
+
+
+# Worker pools of simulators, by simulator id: (pool, jobs, model revision)
+_POOLS = dict()
+# finalizers closing the pool of a simulator when it is collected, by simulator id
+_FINALIZERS = dict()
+
+
+def _close_pool(key):
+    pool = _POOLS.pop(key, (None,))[0]
+    if pool is not None:
+        pool.terminate()
+
+
+def _release_pool(key):
+    _FINALIZERS.pop(key, None)
+    _close_pool(key)
+
+
+_worker_simulator = None
+
+
+def _init_simulation_worker(simulator, policy=None):
+    """Keeps the simulator of a worker process. Solver instances are kept between simulations."""
+    global _worker_simulator
+    if policy is not None:
+        policy.apply()
+        # COBRApy models keep their own solver
+        set_native_threads(getattr(simulator.model, 'solver', None))
+    if hasattr(simulator, '_reset_solver'):
+        simulator._reset_solver = False
+    _worker_simulator = simulator
+
+
+def _simulate_task(task, objective=None, method=SimulationMethod.FBA, maximize=True, reference=None,
+                   solver=None, **kwargs):
+    i, constraints = task
+    res = _worker_simulator.simulate(objective=objective, method=method, maximize=maximize,
+                                     constraints=constraints, reference=reference, solver=solver, **kwargs)
+    return i, res
+
+
+def _simulate_batch(simulator, constraints_list, method, objective, maximize, reference):
+    """Auxiliary function to run a chunk of a batch of simulations in a worker process."""
+    return simulator._simulate_batch(constraints_list, method=method, objective=objective,
+                                     maximize=maximize, reference=reference)
+
+
+class BatchSimulationResult(object):
+    """Results of a batch of phenotype simulations.
+
+    Fluxes are kept in a (simulations x reactions) array whose columns follow
+    the order of the reactions index, shared by all simulations.
+    Simulations without a solution have NaN fluxes and objective value.
+    """
+
+    def __init__(self, reactions, fluxes, status, objective_values, constraints_list=None,
+                 method=None, maximize=True):
+        """
+        :param list reactions: The reaction identifiers, one for each column of the fluxes array.
+        :param fluxes: A (simulations x reactions) array of flux values.
+        :param status: An array with the status of each simulation.
+        :param objective_values: An array with the objective value of each simulation.
+        :param list constraints_list: The constraints of each simulation.
+        :param SimulationMethod method: The phenotypic method.
+        :param boolean maximize: Optimization direction.
+        """
+        self.reactions = FrozenIndex(reactions).ids
+        self.fluxes = fluxes
+        self.status = status
+        self.objective_values = objective_values
+        self.constraints_list = constraints_list
+        self.method = method
+        self.maximize = maximize
+        self._index = None
+
+    @property
+    def index(self):
+        """A dictionary of reaction identifiers to column indexes."""
+        if self._index is None:
+            self._index = {r_id: i for i, r_id in enumerate(self.reactions)}
+        return self._index
+
+    def __len__(self):
+        return self.fluxes.shape[0]
+
+    def __repr__(self):
+        return f"{len(self)} simulations\nMethod:{self.method}"
+
+    def get_fluxes(self, r_id):
+        """Returns the flux values of a reaction in all simulations.
+
+        :param str r_id: The reaction identifier.
+        :returns: An array of flux values.
+        """
+        return self.fluxes[:, self.index[r_id]]
+
+    def __getitem__(self, i):
+        """Returns a SimulationResult of the i-th simulation."""
+        fluxes = None
+        if not np.isnan(self.objective_values[i]):
+            fluxes = IndexedValues(self.reactions, self.fluxes[i].copy())
+        objective_value = None if np.isnan(self.objective_values[i]) else float(self.objective_values[i])
+        constraints = self.constraints_list[i] if self.constraints_list else None
+        return SimulationResult(None, objective_value, fluxes=fluxes, status=self.status[i],
+                                simul_constraints=constraints, maximize=self.maximize, method=self.method)
+
+    def dataframe(self):
+        """Returns the flux values as a pandas DataFrame with a row for each simulation."""
+        import pandas as pd
+        return pd.DataFrame(self.fluxes, columns=self.reactions)
+
+
+_INDEXES = weakref.WeakValueDictionary()
+
+
+class FrozenIndex(object):
+    """An immutable index of identifiers (reactions, metabolites) shared by vectors of values.
+
+    Indexes are interned: indexes of a same sequence of identifiers are a same instance,
+    including indexes restored from pickles, so that they are only kept once in memory.
+    """
+
+    __slots__ = ('ids', 'positions', '__weakref__')
+
+    def __new__(cls, ids):
+        ids = tuple(ids)
+        index = _INDEXES.get(ids)
+        if index is None:
+            index = object.__new__(cls)
+            index.ids = ids
+            index.positions = {k: i for i, k in enumerate(ids)}
+            _INDEXES[ids] = index
+        return index
+
+    def __reduce__(self):
+        return (FrozenIndex, (self.ids,))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def __repr__(self):
+        return f"FrozenIndex({len(self.ids)} ids)"
+
+
+class IndexedValues(MutableMapping):
+    """A dictionary like view of a float64 vector whose entries follow a FrozenIndex.
+
+    Values are only converted to a dictionary, a pandas Series or a DataFrame when required.
+    Pickles hold the vector and the shared index instead of a dictionary.
+    Values may be changed, but the keys are those of the index.
+    """
+
+    __slots__ = ('index', 'array')
+
+    def __init__(self, index, values):
+        """
+        :param index: A FrozenIndex or a sequence of identifiers.
+        :param values: The values, following the order of the index.
+        """
+        self.index = index if isinstance(index, FrozenIndex) else FrozenIndex(index)
+        self.array = np.asarray(values, dtype=np.float64)
+        if self.array.shape != (len(self.index),):
+            raise ValueError(f"Expected {len(self.index)} values, got {self.array.shape}")
+
+    def __getitem__(self, key):
+        return float(self.array[self.index.positions[key]])
+
+    def __setitem__(self, key, value):
+        if key not in self.index:
+            raise KeyError(f"{key} is not in the index")
+        self.array[self.index.positions[key]] = value
+
+    def __delitem__(self, key):
+        raise TypeError("Entries can not be removed from IndexedValues")
+
+    def __iter__(self):
+        return iter(self.index.ids)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def copy(self):
+        """Returns the values as an OrderedDict."""
+        return OrderedDict(zip(self.index.ids, self.array.tolist()))
+
+    def to_series(self):
+        import pandas as pd
+        return pd.Series(self.array, index=self.index.ids)
+
+
 class SimulationResult(object):
     """Class that represents simulation results and performs operations over them."""
 
@@ -477,14 +963,14 @@ class SimulationResult(object):
         """
         :param model: A model instance.
         :param objective_value: The phenotype simulation objective value.
-        :param dict fluxes: A dictionary of reaction fluxes values.
+        :param dict fluxes: A dictionary of reaction fluxes values, or an IndexedValues vector.
         :param status: The LP status.
         :param dict envcond: The environmental conditions of the phenotype simulation.
         :param dict model_constraints: Possible persistent additional constraints.
         :param dict simul_constraints: The simulation constraints.
         :param boolean maximize: Optimization direction.
         :param SimulationMethod method: The phenotypic methos
-        :param dict shadow_prices: shadow prices
+        :param dict shadow_prices: shadow prices, as a dictionary or an IndexedValues vector.
         """
         self.model = model
         self.objective_value = objective_value
@@ -510,6 +996,12 @@ class SimulationResult(object):
         constraints.update(self.simulation_constraints)
         return constraints
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the model is not pickled, it is set back by the receiver when needed
+        state['model'] = None
+        return state
+
     def __repr__(self):
         return (f"objective: {self.objective_value}\nStatus: "
                 f"{self.status}\nMethod:{self.method}")
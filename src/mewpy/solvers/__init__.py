@@ -24,7 +24,13 @@ def get_default_solver():
     if default_solver:
         return default_solver
 
-    solver_order = ['cplex', 'gurobi', 'optlang']
+    solver_order = ['cplex', 'gurobi', 'highs', 'optlang']
+    if 'highs' in __MEWPY_solvers__:
+        from .highs_solver import highspy
+        # without highspy, the HiGHS interface runs on SciPy, which lacks quadratic
+        # objectives, warm starts and time limits, and is only used as a last resort
+        if highspy is None:
+            solver_order = ['cplex', 'gurobi', 'optlang', 'highs']
 
     for solver in solver_order:
         if solver in list(__MEWPY_solvers__.keys()):
@@ -41,7 +47,7 @@ def set_default_solver(solvername):
     """ Sets default solver.
 
     Arguments:
-        solvername : (str) solver name (currently available: 'gurobi', 'cplex')
+        solvername : (str) solver name (currently available: 'gurobi', 'cplex', 'highs', 'optlang')
     """
 
     global default_solver
@@ -120,7 +126,7 @@ def set_default_ode_solver(solvername):
     """ Sets default solver.
 
     Arguments:
-        solvername : (str) solver name (currently available: 'gurobi', 'cplex')
+        solvername : (str) solver name (currently available: 'scikits', 'scipy', 'odespy')
     """
 
     global default_ode_solver
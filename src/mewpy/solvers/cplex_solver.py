@@ -22,13 +22,19 @@ https://github.com/cdanielmachado/reframed
 
 ##############################################################################
 """
-from .solver import Solver, VarType, Parameter, default_parameters
+from .solver import Solver, VarType, Parameter, default_parameters, scale_bound, csr_arrays, Basis
 from .solution import Solution, Status
+from ..util.resources import limit_time
+from ..util.stats import solver_stats
 from cplex import Cplex, infinity, SparsePair
+from cplex.exceptions import CplexError
 import sys
 from math import inf
 from warnings import warn
 
+import numpy as np
+from scipy.sparse import csr_matrix
+
 
 def infinity_fix(val):
     if val == inf:
@@ -39,6 +45,49 @@ def infinity_fix(val):
         return val
 
 
+def get_cplex_basis(problem, var_ids=None, constr_ids=None):
+    """ Returns the basis of a solved CPLEX problem (None if not available).
+
+    Arguments:
+        problem (Cplex): the CPLEX problem
+        var_ids (list): the variables names, by index (optional)
+        constr_ids (list): the linear constraints names, by index (optional)
+    """
+    try:
+        col_status, row_status = problem.solution.basis.get_basis()
+    except CplexError:
+        return None
+    var_ids = problem.variables.get_names() if var_ids is None else var_ids
+    constr_ids = problem.linear_constraints.get_names() if constr_ids is None else constr_ids
+    return Basis(dict(zip(var_ids, col_status)), dict(zip(constr_ids, row_status)), 'cplex')
+
+
+def set_cplex_basis(problem, basis, var_ids=None, constr_ids=None):
+    """ Sets the starting basis of a CPLEX problem.
+
+    Arguments:
+        problem (Cplex): the CPLEX problem
+        basis (Basis): a basis created by a CPLEX problem
+        var_ids (list): the variables names, by index (optional)
+        constr_ids (list): the linear constraints names, by index (optional)
+    """
+    if basis.solver != 'cplex':
+        warn(f"Ignoring a basis created by {basis.solver}")
+        return
+    status = problem.start.status
+    var_ids = problem.variables.get_names() if var_ids is None else var_ids
+    constr_ids = problem.linear_constraints.get_names() if constr_ids is None else constr_ids
+    col_status = [basis.variables.get(var_id) for var_id in var_ids]
+    missing = [i for i, x in enumerate(col_status) if x is None]
+    if missing:
+        lbs = problem.variables.get_lower_bounds(missing)
+        for i, lb in zip(missing, lbs):
+            col_status[i] = status.at_lower_bound if lb > -infinity else status.free_nonbasic
+    row_status = [basis.constraints.get(constr_id, status.basic) for constr_id in constr_ids]
+    problem.start.set_start(col_status=col_status, row_status=row_status,
+                            col_primal=[], row_primal=[], col_dual=[], row_dual=[])
+
+
 class CplexSolver(Solver):
     """ Implements the solver interface using CPLEX. """
 
@@ -72,7 +121,8 @@ class CplexSolver(Solver):
             Parameter.MIP_ABS_GAP: self.problem.parameters.mip.tolerances.mipgap,
             Parameter.MIP_REL_GAP: self.problem.parameters.mip.tolerances.absmipgap,
             Parameter.POOL_SIZE: self.problem.parameters.mip.limits.populate,
-            Parameter.POOL_GAP: self.problem.parameters.mip.pool.relgap
+            Parameter.POOL_GAP: self.problem.parameters.mip.pool.relgap,
+            Parameter.THREADS: self.problem.parameters.threads
         }
 
         self.set_parameters(default_parameters)
@@ -98,6 +148,7 @@ class CplexSolver(Solver):
             vartype (VarType): variable type (default: CONTINUOUS)
             update (bool): update problem immediately
         """
+        self._check_scaling([vartype])
 
         if update:
             self.add_variables([var_id], [lb], [ub], [vartype])
@@ -114,6 +165,11 @@ class CplexSolver(Solver):
             vartypes (list): variable types (default: CONTINUOUS)
         """
 
+        self._check_scaling(vartypes)
+        if self.scalefactor:
+            lbs = [scale_bound(lb, self.scalefactor) for lb in lbs]
+            ubs = [scale_bound(ub, self.scalefactor) for ub in ubs]
+
         lbs = list(map(infinity_fix, lbs))
         ubs = list(map(infinity_fix, ubs))
 
@@ -136,10 +192,17 @@ class CplexSolver(Solver):
             lb (float): lower bound
             ub (float): upper bound
         """
-        if lb:
+        if self.scalefactor:
+            lb = scale_bound(lb, self.scalefactor)
+            ub = scale_bound(ub, self.scalefactor)
+        if lb is not None:
+            lb = infinity_fix(lb)
             self.problem.variables.set_lower_bounds(var_id, lb)
-        if ub:
+            self._cached_lower_bounds[var_id] = lb
+        if ub is not None:
+            ub = infinity_fix(ub)
             self.problem.variables.set_upper_bounds(var_id, ub)
+            self._cached_upper_bounds[var_id] = ub
 
     def add_constraint(self, constr_id, lhs, sense='=', rhs=0, update=True):
         """ Add a constraint to the current problem.
@@ -173,6 +236,8 @@ class CplexSolver(Solver):
 
         exprs = [SparsePair(ind=list(constr.keys()), val=list(constr.values())) for constr in lhs]
         senses = [map_sense[sense] for sense in senses]
+        if self.scalefactor:
+            rhs = [x * self.scalefactor for x in rhs]
 
         self.problem.linear_constraints.add(lin_expr=exprs,
                                             senses=senses,
@@ -299,33 +364,50 @@ class CplexSolver(Solver):
             self.problem.objective.set_sense(sense)
             self._cached_sense = minimize
 
-    def __build_problem_simulator(self, model):
-        """ Create problem structure for a given model.
+    def load_matrix(self, S, lb, ub, var_ids, row_ids, senses=None, rhs=None, vartypes=None):
+        """ Loads variables and the linear constraints S x (sense) rhs in bulk.
 
         Arguments:
-            model : Simulator
+            S: constraints matrix (rows x variables), a SciPy sparse matrix (CSR) or a dense array
+            lb (list): variables lower bounds
+            ub (list): variables upper bounds
+            var_ids (list): variables identifiers
+            row_ids (list): constraints identifiers
+            senses (list): constraints senses (any of: '<', '=', '>'; default '=')
+            rhs (list): constraints right-hand sides (default: 0)
+            vartypes (list): variables types (default: CONTINUOUS)
         """
-        var_ids = []
-        lbs = []
-        ubs = []
-        for r_id in model.reactions:
-            lb, ub = model.get_reaction_bounds(r_id)
-            var_ids.append(r_id)
-            lbs.append(lb)
-            ubs.append(ub)
-
-        var_types = [VarType.CONTINUOUS] * len(var_ids)
-        self.add_variables(var_ids, lbs, ubs, var_types)
-
-        constr_ids = list(model.metabolites.keys())
-        table = model.metabolite_reaction_lookup()
-        lhs = list(table.values())
-        senses = ['='] * len(constr_ids)
-        rhs = [0] * len(constr_ids)
-        self.add_constraints(constr_ids, lhs, senses, rhs)
+        self.update()
+        var_ids = list(var_ids)
+        row_ids = list(row_ids)
+        indptr, indices, data = csr_arrays(S, (len(row_ids), len(var_ids)))
+        vartypes = [VarType.CONTINUOUS] * len(var_ids) if vartypes is None else list(vartypes)
+
+        self.add_variables(var_ids, list(lb), list(ub), vartypes)
+
+        map_sense = {'=': 'E',
+                     '<': 'L',
+                     '>': 'G'}
+        senses = ['E'] * len(row_ids) if senses is None else [map_sense[sense] for sense in senses]
+        rhs = [0.0] * len(row_ids) if rhs is None else [float(x) for x in rhs]
+        if self.scalefactor:
+            rhs = [x * self.scalefactor for x in rhs]
+
+        # columns are referenced by index, the new variables being the last ones
+        offset = self.problem.variables.get_num() - len(var_ids)
+        indices = (indices + offset).tolist()
+        data = data.tolist()
+        exprs = [SparsePair(ind=indices[indptr[i]:indptr[i + 1]], val=data[indptr[i]:indptr[i + 1]])
+                 for i in range(len(row_ids))]
+
+        self.problem.linear_constraints.add(lin_expr=exprs,
+                                            senses=senses,
+                                            rhs=rhs,
+                                            names=row_ids)
+        self.constr_ids.extend(row_ids)
 
     def solve(self, linear=None, quadratic=None, minimize=None, model=None, constraints=None, get_values=True,
-              shadow_prices=True, reduced_costs=False, pool_size=0, pool_gap=None):
+              shadow_prices=True, reduced_costs=False, pool_size=0, pool_gap=None, warm_start=True):
         """ Solve the optimization problem.
 
         Arguments:
@@ -340,6 +422,8 @@ class CplexSolver(Solver):
             reduced_costs (bool): return reduced costs if available (default: False)
             pool_size (int): calculate solution pool of given size (only for MILP problems)
             pool_gap (float): maximum relative gap for solutions in pool (optional)
+            warm_start (bool or Basis): start from the basis of the previous solve (True), from scratch\
+                (False) or from a given basis (default: True)
 
         Returns:
             Solution: solution
@@ -350,17 +434,32 @@ class CplexSolver(Solver):
 
         problem = self.problem
 
+        cold_start = not warm_start
+        if isinstance(warm_start, Basis):
+            self.set_basis(warm_start)
+        elif cold_start:
+            problem.parameters.advance.set(0)
+
+        limit_time(problem)
+        timer = solver_stats.timer()
+
+        if self.scalefactor:
+            constraints = self._scale_constraints(constraints, quadratic)
+
         changed_lb, changed_ub = None, None
         if constraints:
             changed_lb, changed_ub = self.temporary_bounds(constraints)
+        timer.lap('bounds')
 
         self.set_objective(linear, quadratic, minimize)
+        timer.lap('objective')
 
         # run the optimization
 
         if pool_size <= 1:
 
             problem.solve()
+            timer.lap('solve')
 
             status = self.status_mapping.get(problem.solution.get_status(), Status.UNKNOWN)
             message = str(problem.solution.get_status_string())
@@ -411,6 +510,7 @@ class CplexSolver(Solver):
                 pool_pmap['SolnPoolGap'].set(pool_gap)
 
             problem.populate_solution_pool()
+            timer.lap('solve')
 
             status = self.status_mapping.get(problem.solution.get_status(), Status.UNKNOWN)
 
@@ -418,12 +518,91 @@ class CplexSolver(Solver):
                 solution = self.get_solution_pool(get_values)
             else:
                 solution = []
+        timer.lap('values')
 
         if constraints:
             self.reset_bounds(changed_lb, changed_ub)
-        
+        timer.lap('bounds')
+        timer.done(status, len(solution.values) if isinstance(solution, Solution) and solution.values else 0,
+                   problem)
+
+        if cold_start:
+            problem.parameters.advance.reset()
+
+        if self.scalefactor:
+            solution = self._unscale_solution(solution)
+
         return solution
 
+    def _apply_constraints(self, constraints):
+        self.update()
+        if self.scalefactor:
+            constraints = self._scale_constraints(constraints)
+        if constraints:
+            return self.temporary_bounds(constraints)
+        return None
+
+    def _solve_objective(self, linear, minimize, keys, state):
+        problem = self.problem
+        self.set_objective(linear, None, minimize)
+        problem.solve()
+        status = self.status_mapping.get(problem.solution.get_status(), Status.UNKNOWN)
+        if status != Status.OPTIMAL:
+            return status, None, None
+        fobj = problem.solution.get_objective_value()
+        values = problem.solution.get_values(keys) if keys is not None else None
+        if self.scalefactor:
+            fobj = fobj / self.scalefactor
+            values = [x / self.scalefactor for x in values] if values is not None else None
+        return status, fobj, values
+
+    def _restore_constraints(self, state):
+        if state:
+            self.reset_bounds(*state)
+
+    def get_basis(self):
+        """ Return the basis of the last solve.
+
+        Returns:
+            Basis: the basis (None if not available, e.g., for MILP problems)
+        """
+        return get_cplex_basis(self.problem, self.var_ids, self.constr_ids)
+
+    def set_basis(self, basis):
+        """ Set the starting basis of the next solve.
+        Variables and constraints not in the basis are assumed nonbasic and basic, respectively.
+
+        Arguments:
+            basis (Basis): a basis returned by **get_basis**
+        """
+        self.update()
+        set_cplex_basis(self.problem, basis, self.var_ids, self.constr_ids)
+
+    def _rescale(self, ratio):
+        """ Multiply the bounds of the variables and the constraints right-hand sides by a ratio.
+
+        Arguments:
+            ratio (float): the ratio between the new and the current scale factors
+        """
+        self.update()
+        problem = self.problem
+        var_ids = self.var_ids
+        if var_ids:
+            lbs = [(var_id, scale_bound(self._cached_lower_bounds[var_id], ratio, infinity)) for var_id in var_ids]
+            ubs = [(var_id, scale_bound(self._cached_upper_bounds[var_id], ratio, infinity)) for var_id in var_ids]
+            problem.variables.set_lower_bounds(lbs)
+            problem.variables.set_upper_bounds(ubs)
+            self._cached_lower_bounds.update(lbs)
+            self._cached_upper_bounds.update(ubs)
+        if self.constr_ids:
+            rhs = [(i, x * ratio) for i, x in enumerate(problem.linear_constraints.get_rhs()) if x]
+            if rhs:
+                problem.linear_constraints.set_rhs(rhs)
+
+    def _has_integer_variables(self):
+        self.update()
+        return self.problem.get_problem_type() not in (self.problem.problem_type.LP, self.problem.problem_type.QP)
+
     def temporary_bounds(self, constraints):
 
         lower_bounds, upper_bounds = {}, {}
@@ -538,3 +717,51 @@ class CplexSolver(Solver):
         :type coefficients: list
         """
         self.problem.linear_constraints.set_coefficients(coefficients)
+
+    def _export_problem(self):
+        """ Export the current problem as a compact representation of plain Python and NumPy objects
+        (see **Solver._export_problem**).
+        """
+        self.update()
+        problem = self.problem
+        n = len(self.var_ids)
+
+        try:
+            types = problem.variables.get_types()
+            vartype_mapping = {v: k for k, v in self.vartype_mapping.items()}
+            vartypes = [vartype_mapping[x] for x in types]
+        except CplexError:
+            # continuous problems have no variable types
+            vartypes = [VarType.CONTINUOUS] * n
+
+        rows = problem.linear_constraints.get_rows()
+        indptr = np.cumsum([0] + [len(row.ind) for row in rows])
+        indices = np.fromiter((j for row in rows for j in row.ind), dtype=np.int32, count=indptr[-1])
+        data = np.fromiter((v for row in rows for v in row.val), dtype=float, count=indptr[-1])
+        S = csr_matrix((data, indices, indptr), shape=(len(rows), n))
+
+        map_sense = {'E': '=', 'L': '<', 'G': '>'}
+        linear = {var_id: c for var_id, c in zip(self.var_ids, problem.objective.get_linear()) if c}
+        quadratic = {}
+        if problem.objective.get_num_quadratic_nonzeros():
+            # symmetric coefficients are set once (see set_quadratic_coefficients)
+            for j, column in enumerate(problem.objective.get_quadratic()):
+                for i, v in zip(column.ind, column.val):
+                    if i <= j:
+                        quadratic[(self.var_ids[i], self.var_ids[j])] = v
+
+        parameters = {parameter: param.get() for parameter, param in self.parameter_mapping.items()
+                      if param.get() != param.default()}
+
+        return {'var_ids': list(self.var_ids),
+                'lb': problem.variables.get_lower_bounds(),
+                'ub': problem.variables.get_upper_bounds(),
+                'vartypes': vartypes,
+                'constr_ids': list(self.constr_ids),
+                'S': S,
+                'senses': [map_sense[x] for x in problem.linear_constraints.get_senses()],
+                'rhs': problem.linear_constraints.get_rhs(),
+                'linear': linear,
+                'quadratic': quadratic,
+                'minimize': problem.objective.get_sense() == problem.objective.sense.minimize,
+                'parameters': parameters}
@@ -21,9 +21,11 @@ Adapted by Vitor Pereira from Daniel Machado's REFRAMED
 https://github.com/cdanielmachado/reframed
 ##############################################################################
 """
-from .solver import Solver, VarType, Parameter, default_parameters
+from .solver import Solver, VarType, Parameter, default_parameters, scale_bound, csr_arrays, Basis
 from .solution import Solution, Status
-from gurobipy import Model as GurobiModel, GRB, quicksum
+from ..util.resources import limit_time
+from ..util.stats import solver_stats
+from gurobipy import Model as GurobiModel, GRB, GurobiError, LinExpr, quicksum
 from math import inf
 from warnings import warn
 
@@ -58,7 +60,8 @@ parameter_mapping = {
     Parameter.MIP_ABS_GAP: GRB.Param.MIPGapAbs,
     Parameter.MIP_REL_GAP: GRB.Param.MIPGap,
     Parameter.POOL_SIZE: GRB.Param.PoolSolutions,
-    Parameter.POOL_GAP: GRB.Param.PoolGap
+    Parameter.POOL_GAP: GRB.Param.PoolGap,
+    Parameter.THREADS: GRB.Param.Threads
 }
 
 
@@ -83,6 +86,11 @@ class GurobiSolver(Solver):
             vartype (VarType): variable type (default: CONTINUOUS)
             update (bool): update problem immediately (default: True)
         """
+        self._check_scaling([vartype])
+
+        if self.scalefactor:
+            lb = scale_bound(lb, self.scalefactor)
+            ub = scale_bound(ub, self.scalefactor)
 
         lb = infinity_fix(lb)
         ub = infinity_fix(ub)
@@ -108,10 +116,13 @@ class GurobiSolver(Solver):
             ub (float): upper bound
         """
         var = self.problem.getVarByName(var_id)
-        if lb:
-            var.lb = lb
-        if ub:
-            var.ub = ub
+        if self.scalefactor:
+            lb = scale_bound(lb, self.scalefactor)
+            ub = scale_bound(ub, self.scalefactor)
+        if lb is not None:
+            var.lb = infinity_fix(lb)
+        if ub is not None:
+            var.ub = infinity_fix(ub)
 
     def add_constraint(self, constr_id, lhs, sense='=', rhs=0, update=True):
         """ Add a constraint to the current problem.
@@ -132,6 +143,9 @@ class GurobiSolver(Solver):
             constr = self.problem.getConstrByName(constr_id)
             self.problem.remove(constr)
 
+        if self.scalefactor:
+            rhs = rhs * self.scalefactor
+
         expr = quicksum(coeff * self.problem.getVarByName(r_id) for r_id, coeff in lhs.items() if coeff)
 
         self.problem.addLConstr(expr, grb_sense[sense], rhs, constr_id)
@@ -140,6 +154,50 @@ class GurobiSolver(Solver):
         if update:
             self.problem.update()
 
+    def load_matrix(self, S, lb, ub, var_ids, row_ids, senses=None, rhs=None, vartypes=None):
+        """ Loads variables and the linear constraints S x (sense) rhs in bulk.
+
+        Arguments:
+            S: constraints matrix (rows x variables), a SciPy sparse matrix (CSR) or a dense array
+            lb (list): variables lower bounds
+            ub (list): variables upper bounds
+            var_ids (list): variables identifiers
+            row_ids (list): constraints identifiers
+            senses (list): constraints senses (any of: '<', '=', '>'; default '=')
+            rhs (list): constraints right-hand sides (default: 0)
+            vartypes (list): variables types (default: CONTINUOUS)
+        """
+        var_ids = list(var_ids)
+        row_ids = list(row_ids)
+        indptr, indices, data = csr_arrays(S, (len(row_ids), len(var_ids)))
+        vartypes = [VarType.CONTINUOUS] * len(var_ids) if vartypes is None else list(vartypes)
+
+        self._check_scaling(vartypes)
+        if self.scalefactor:
+            lb = [scale_bound(x, self.scalefactor) for x in lb]
+            ub = [scale_bound(x, self.scalefactor) for x in ub]
+        lb = [infinity_fix(x) for x in lb]
+        ub = [infinity_fix(x) for x in ub]
+        vtype = [vartype_mapping[vartype] for vartype in vartypes]
+        variables = self.problem.addVars(len(var_ids), lb=lb, ub=ub, vtype=vtype, name=var_ids)
+        variables = [variables[j] for j in range(len(var_ids))]
+        self.var_ids.extend(var_ids)
+
+        grb_sense = {'=': GRB.EQUAL,
+                     '<': GRB.LESS_EQUAL,
+                     '>': GRB.GREATER_EQUAL}
+        senses = ['='] * len(row_ids) if senses is None else senses
+        rhs = [0.0] * len(row_ids) if rhs is None else rhs
+        indices = indices.tolist()
+        data = data.tolist()
+        for i, constr_id in enumerate(row_ids):
+            start, end = indptr[i], indptr[i + 1]
+            expr = LinExpr(data[start:end], [variables[j] for j in indices[start:end]])
+            b = rhs[i] * self.scalefactor if self.scalefactor else rhs[i]
+            self.problem.addLConstr(expr, grb_sense[senses[i]], b, constr_id)
+        self.constr_ids.extend(row_ids)
+        self.problem.update()
+
     def remove_variable(self, var_id):
         """ Remove a variable from the current problem.
 
@@ -230,7 +288,7 @@ class GurobiSolver(Solver):
         self.problem.setObjective(obj_expr, sense)
 
     def solve(self, linear=None, quadratic=None, minimize=None, model=None, constraints=None, get_values=True,
-              shadow_prices=False, reduced_costs=False, pool_size=0, pool_gap=None):
+              shadow_prices=False, reduced_costs=False, pool_size=0, pool_gap=None, warm_start=True):
         """ Solve the optimization problem.
 
         Arguments:
@@ -244,6 +302,8 @@ class GurobiSolver(Solver):
             reduced_costs (bool): return reduced costs if available (default: False)
             pool_size (int): calculate solution pool of given size (only for MILP problems)
             pool_gap (float): maximum relative gap for solutions in pool (optional)
+            warm_start (bool or Basis): start from the basis of the previous solve (True), from scratch\
+                (False) or from a given basis (default: True)
 
         Returns:
             Solution: solution
@@ -254,6 +314,17 @@ class GurobiSolver(Solver):
 
         problem = self.problem
 
+        if isinstance(warm_start, Basis):
+            self.set_basis(warm_start)
+        elif not warm_start:
+            problem.reset(0)
+
+        limit_time(problem)
+        timer = solver_stats.timer()
+
+        if self.scalefactor:
+            constraints = self._scale_constraints(constraints, quadratic)
+
         if constraints:
             old_constraints = {}
             for r_id, x in constraints.items():
@@ -266,14 +337,17 @@ class GurobiSolver(Solver):
                 else:
                     warn(f"Constrained variable '{r_id}' not previously declared")
             problem.update()
+        timer.lap('bounds')
 
         if linear is not None or quadratic is not None:
             self.set_objective(linear, quadratic, minimize)
+        timer.lap('objective')
 
         # run the optimization
         if pool_size <= 1:
 
             problem.optimize()
+            timer.lap('solve')
 
             status = status_mapping.get(problem.status, Status.UNKNOWN)
             message = str(problem.status)
@@ -308,6 +382,7 @@ class GurobiSolver(Solver):
                 self.set_parameter(Parameter.POOL_GAP, pool_gap)
 
             problem.optimize()
+            timer.lap('solve')
 
             status = status_mapping.get(problem.status, Status.UNKNOWN)
 
@@ -315,6 +390,7 @@ class GurobiSolver(Solver):
                 solution = self.get_solution_pool()
             else:
                 solution = []
+        timer.lap('values')
 
         # restore values of temporary constraints
         if constraints:
@@ -322,9 +398,113 @@ class GurobiSolver(Solver):
                 lpvar = problem.getVarByName(r_id)
                 lpvar.lb, lpvar.ub = lb, ub
             problem.update()
+        timer.lap('bounds')
+        timer.done(status, len(solution.values) if isinstance(solution, Solution) and solution.values else 0,
+                   problem)
+
+        if self.scalefactor:
+            solution = self._unscale_solution(solution)
 
         return solution
 
+    def _apply_constraints(self, constraints):
+        problem = self.problem
+        if self.scalefactor:
+            constraints = self._scale_constraints(constraints)
+        old_constraints = {}
+        if constraints:
+            for r_id, x in constraints.items():
+                lb, ub = x if isinstance(x, tuple) else (x, x)
+                if r_id in self.var_ids:
+                    lpvar = problem.getVarByName(r_id)
+                    old_constraints[r_id] = (lpvar.lb, lpvar.ub)
+                    lpvar.lb = infinity_fix(lb)
+                    lpvar.ub = infinity_fix(ub)
+                else:
+                    warn(f"Constrained variable '{r_id}' not previously declared")
+        problem.update()
+        return old_constraints
+
+    def _solve_objective(self, linear, minimize, keys, state):
+        problem = self.problem
+        self.set_objective(linear, None, minimize)
+        problem.optimize()
+        status = status_mapping.get(problem.status, Status.UNKNOWN)
+        if status != Status.OPTIMAL:
+            return status, None, None
+        fobj = problem.ObjVal
+        values = None
+        if keys is not None:
+            values = problem.getAttr('X', [problem.getVarByName(r_id) for r_id in keys])
+        if self.scalefactor:
+            fobj = fobj / self.scalefactor
+            values = [x / self.scalefactor for x in values] if values is not None else None
+        return status, fobj, values
+
+    def _restore_constraints(self, state):
+        if state:
+            for r_id, (lb, ub) in state.items():
+                lpvar = self.problem.getVarByName(r_id)
+                lpvar.lb, lpvar.ub = lb, ub
+            self.problem.update()
+
+    def get_basis(self):
+        """ Return the basis of the last solve.
+
+        Returns:
+            Basis: the basis (None if not available, e.g., for MILP problems)
+        """
+        problem = self.problem
+        try:
+            variables = problem.getVars()
+            constraints = problem.getConstrs()
+            v_basis = problem.getAttr('VBasis', variables)
+            c_basis = problem.getAttr('CBasis', constraints)
+        except GurobiError:
+            return None
+        var_ids = problem.getAttr('VarName', variables)
+        constr_ids = problem.getAttr('ConstrName', constraints)
+        return Basis(dict(zip(var_ids, v_basis)), dict(zip(constr_ids, c_basis)), 'gurobi')
+
+    def set_basis(self, basis):
+        """ Set the starting basis of the next solve.
+        Variables and constraints not in the basis are assumed nonbasic and basic, respectively.
+
+        Arguments:
+            basis (Basis): a basis returned by **get_basis**
+        """
+        if basis.solver != 'gurobi':
+            warn(f"Ignoring a basis created by {basis.solver}")
+            return
+        problem = self.problem
+        problem.update()
+        variables = problem.getVars()
+        constraints = problem.getConstrs()
+        # nonbasic at the lower bound (-1) or, for free variables, superbasic (-3)
+        v_basis = [basis.variables.get(var.VarName, -1 if var.LB > -GRB.INFINITY else -3) for var in variables]
+        c_basis = [basis.constraints.get(constr.ConstrName, 0) for constr in constraints]
+        problem.setAttr('VBasis', variables, v_basis)
+        problem.setAttr('CBasis', constraints, c_basis)
+
+    def _rescale(self, ratio):
+        """ Multiply the bounds of the variables and the constraints right-hand sides by a ratio.
+
+        Arguments:
+            ratio (float): the ratio between the new and the current scale factors
+        """
+        problem = self.problem
+        problem.update()
+        for var in problem.getVars():
+            var.lb = scale_bound(var.lb, ratio, GRB.INFINITY)
+            var.ub = scale_bound(var.ub, ratio, GRB.INFINITY)
+        for constr in problem.getConstrs():
+            constr.RHS = constr.RHS * ratio
+        problem.update()
+
+    def _has_integer_variables(self):
+        self.problem.update()
+        return any(var.VType != GRB.CONTINUOUS for var in self.problem.getVars())
+
     def get_solution_pool(self, get_values=True):
         """ Return a solution pool for MILP problems.
         Must be called after using solve with pool_size argument > 0.
@@ -396,3 +576,42 @@ class GurobiSolver(Solver):
             constraint = self.problem.getConstrByName(c_id)
             variable = self.problem.getVarByName(v_id)
             self.problem.chgCoeff(constraint, variable, x)
+
+    def _export_problem(self):
+        """ Export the current problem as a compact representation of plain Python and NumPy objects
+        (see **Solver._export_problem**).
+        """
+        problem = self.problem
+        problem.update()
+        variables = problem.getVars()
+        constraints = problem.getConstrs()
+        var_ids = problem.getAttr('VarName', variables)
+
+        vartypes = {v: k for k, v in vartype_mapping.items()}
+        sense = {GRB.EQUAL: '=', GRB.LESS_EQUAL: '<', GRB.GREATER_EQUAL: '>'}
+        linear = {var_id: c for var_id, c in zip(var_ids, problem.getAttr('Obj', variables)) if c}
+        quadratic = {}
+        if problem.NumQNZs:
+            objective = problem.getObjective()
+            for k in range(objective.size()):
+                key = (objective.getVar1(k).VarName, objective.getVar2(k).VarName)
+                quadratic[key] = quadratic.get(key, 0) + objective.getCoeff(k)
+
+        parameters = {}
+        for parameter, name in parameter_mapping.items():
+            _, _, value, _, _, default = problem.getParamInfo(name)
+            if value != default:
+                parameters[parameter] = value
+
+        return {'var_ids': var_ids,
+                'lb': problem.getAttr('LB', variables),
+                'ub': problem.getAttr('UB', variables),
+                'vartypes': [vartypes[x] for x in problem.getAttr('VType', variables)],
+                'constr_ids': problem.getAttr('ConstrName', constraints),
+                'S': problem.getA().tocsr(),
+                'senses': [sense[x] for x in problem.getAttr('Sense', constraints)],
+                'rhs': problem.getAttr('RHS', constraints),
+                'linear': linear,
+                'quadratic': quadratic,
+                'minimize': problem.ModelSense == GRB.MINIMIZE,
+                'parameters': parameters}
@@ -0,0 +1,783 @@
+# Copyright (C) 2019- Centre of Biological Engineering,
+#     University of Minho, Portugal
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+##############################################################################
+Interface for the HiGHS LP/MILP solver.
+
+The problem is kept as sparse arrays (variable bounds and types, and
+constraint rows as index/value arrays) and solved either through the highspy
+bindings, where a HiGHS instance is kept between solves so that bound and
+objective changes are applied incrementally and the previous basis is reused,
+or through SciPy's HiGHS bindings (scipy.optimize) when highspy is not
+installed.
+
+Author: Vitor Pereira
+##############################################################################
+"""
+from math import inf
+from warnings import warn
+
+import numpy as np
+
+from .solver import Solver, VarType, Parameter, default_parameters, scale_bound, csr_arrays, Basis
+from .solution import Solution, Status
+from ..util.resources import limit_time
+from ..util.stats import solver_stats
+
+try:
+    import highspy
+except ImportError:
+    highspy = None
+    # fall back to SciPy's HiGHS bindings
+    from scipy.optimize import milp  # noqa: F401
+
+
+if highspy is not None:
+    status_mapping = {
+        highspy.HighsModelStatus.kOptimal: Status.OPTIMAL,
+        highspy.HighsModelStatus.kUnbounded: Status.UNBOUNDED,
+        highspy.HighsModelStatus.kInfeasible: Status.INFEASIBLE,
+        highspy.HighsModelStatus.kUnboundedOrInfeasible: Status.INF_OR_UNB
+    }
+
+# scipy.optimize.linprog and milp status codes
+scipy_status_mapping = {
+    0: Status.OPTIMAL,
+    2: Status.INFEASIBLE,
+    3: Status.UNBOUNDED
+}
+
+parameter_mapping = {
+    Parameter.TIME_LIMIT: 'time_limit',
+    Parameter.FEASIBILITY_TOL: 'primal_feasibility_tolerance',
+    Parameter.OPTIMALITY_TOL: 'dual_feasibility_tolerance',
+    Parameter.INT_FEASIBILITY_TOL: 'mip_feasibility_tolerance',
+    Parameter.MIP_REL_GAP: 'mip_rel_gap',
+    Parameter.MIP_ABS_GAP: 'mip_abs_gap',
+    Parameter.THREADS: 'threads'
+}
+
+# options supported by scipy.optimize.milp
+scipy_options = {'time_limit', 'mip_rel_gap'}
+
+backends = ('highspy', 'scipy')
+
+
+def _index_array(values):
+    return np.array(values, dtype=np.int32)
+
+
+class HighsSolver(Solver):
+    """ Implements the HiGHS solver interface.
+
+    Arguments:
+        model: COBRApy/REFRAMED model or a Simulator (optional)
+        backend (str): 'highspy' or 'scipy' (default: 'highspy' if installed). The SciPy backend
+            does not support quadratic objectives, and only returns shadow prices and reduced costs
+            for problems without integer variables.
+    """
+
+    def __init__(self, model=None, backend=None):
+        Solver.__init__(self)
+        if backend is None:
+            backend = 'highspy' if highspy is not None else 'scipy'
+        if backend not in backends:
+            raise ValueError(f"Unknown HiGHS backend: {backend}")
+        if backend == 'highspy' and highspy is None:
+            raise ImportError("The highspy package is not installed.")
+        self.backend = backend
+        self._var_index = {}
+        self._constr_index = {}
+        self._lb = []
+        self._ub = []
+        self._integer = []
+        self._rows = []
+        self._row_lb = []
+        self._row_ub = []
+        self._linear = {}
+        self._quadratic = {}
+        self._minimize = True
+        self._options = {'output_flag': False}
+        # highspy instance and the state already passed to it
+        self._stale = True
+        self._cost = None
+        self._hessian = False
+        self._basis = None
+        if backend == 'highspy':
+            self.problem = highspy.Highs()
+        self.set_parameters(default_parameters)
+        self.set_logging(False)
+
+        if model:
+            self.build_problem(model)
+
+    def add_variable(self, var_id, lb=-inf, ub=inf, vartype=VarType.CONTINUOUS, update=True):
+        """ Add a variable to the current problem.
+
+        Arguments:
+            var_id (str): variable identifier
+            lb (float): lower bound
+            ub (float): upper bound
+            vartype (VarType): variable type (default: CONTINUOUS)
+            update (bool): update problem immediately (ignored)
+        """
+        self._check_scaling([vartype])
+
+        if self.scalefactor:
+            lb = scale_bound(lb, self.scalefactor)
+            ub = scale_bound(ub, self.scalefactor)
+
+        if vartype == VarType.BINARY:
+            lb, ub = max(lb, 0), min(ub, 1)
+
+        if var_id in self._var_index:
+            i = self._var_index[var_id]
+            self._lb[i], self._ub[i] = lb, ub
+            self._integer[i] = vartype != VarType.CONTINUOUS
+        else:
+            self._var_index[var_id] = len(self.var_ids)
+            self.var_ids.append(var_id)
+            self._lb.append(lb)
+            self._ub.append(ub)
+            self._integer.append(vartype != VarType.CONTINUOUS)
+        self._stale = True
+
+    def set_variable_bounds(self, var_id, lb, ub):
+        """Modify a variable bounds
+
+        Args:
+            var_id (str): variable identifier
+            lb (float): lower bound
+            ub (float): upper bound
+        """
+        i = self._var_index[var_id]
+        if self.scalefactor:
+            lb = scale_bound(lb, self.scalefactor)
+            ub = scale_bound(ub, self.scalefactor)
+        if lb is not None:
+            self._lb[i] = lb
+        if ub is not None:
+            self._ub[i] = ub
+        if not self._stale and self.backend == 'highspy':
+            self.problem.changeColBounds(i, self._lb[i], self._ub[i])
+
+    def add_constraint(self, constr_id, lhs, sense='=', rhs=0, update=True):
+        """ Add a constraint to the current problem.
+
+        Arguments:
+            constr_id (str): constraint identifier
+            lhs (dict): variables and respective coefficients
+            sense (str): constraint sense (any of: '<', '=', '>'; default '=')
+            rhs (float): right-hand side of equation (default: 0)
+            update (bool): update problem immediately (ignored)
+        """
+
+        if self.scalefactor:
+            rhs = rhs * self.scalefactor
+
+        if sense == '=':
+            bounds = (rhs, rhs)
+        elif sense == '>':
+            bounds = (rhs, inf)
+        elif sense == '<':
+            bounds = (-inf, rhs)
+        else:
+            raise RuntimeError(f"Invalid constraint direction: {sense}")
+
+        items = [(self._var_index[r_id], coeff) for r_id, coeff in lhs.items() if coeff]
+        row = (_index_array([j for j, _ in items]), np.array([v for _, v in items], dtype=float))
+
+        if constr_id in self._constr_index:
+            i = self._constr_index[constr_id]
+            self._rows[i] = row
+            self._row_lb[i], self._row_ub[i] = bounds
+        else:
+            self._constr_index[constr_id] = len(self.constr_ids)
+            self.constr_ids.append(constr_id)
+            self._rows.append(row)
+            self._row_lb.append(bounds[0])
+            self._row_ub.append(bounds[1])
+        self._stale = True
+
+    def load_matrix(self, S, lb, ub, var_ids, row_ids, senses=None, rhs=None, vartypes=None):
+        """ Loads variables and the linear constraints S x (sense) rhs in bulk.
+
+        Arguments:
+            S: constraints matrix (rows x variables), a SciPy sparse matrix (CSR) or a dense array
+            lb (list): variables lower bounds
+            ub (list): variables upper bounds
+            var_ids (list): variables identifiers
+            row_ids (list): constraints identifiers
+            senses (list): constraints senses (any of: '<', '=', '>'; default '=')
+            rhs (list): constraints right-hand sides (default: 0)
+            vartypes (list): variables types (default: CONTINUOUS)
+        """
+        var_ids = list(var_ids)
+        row_ids = list(row_ids)
+        indptr, indices, data = csr_arrays(S, (len(row_ids), len(var_ids)))
+        vartypes = [VarType.CONTINUOUS] * len(var_ids) if vartypes is None else list(vartypes)
+
+        for var_id, l, u, vartype in zip(var_ids, lb, ub, vartypes):
+            self.add_variable(var_id, l, u, vartype)
+
+        columns = _index_array([self._var_index[var_id] for var_id in var_ids])[indices]
+        senses = ['='] * len(row_ids) if senses is None else senses
+        rhs = [0] * len(row_ids) if rhs is None else rhs
+        for i, constr_id in enumerate(row_ids):
+            start, end = indptr[i], indptr[i + 1]
+            b = rhs[i] * self.scalefactor if self.scalefactor else rhs[i]
+            if senses[i] == '=':
+                bounds = (b, b)
+            elif senses[i] == '>':
+                bounds = (b, inf)
+            elif senses[i] == '<':
+                bounds = (-inf, b)
+            else:
+                raise RuntimeError(f"Invalid constraint direction: {senses[i]}")
+            self._constr_index[constr_id] = len(self.constr_ids)
+            self.constr_ids.append(constr_id)
+            self._rows.append((columns[start:end], np.array(data[start:end], dtype=float)))
+            self._row_lb.append(bounds[0])
+            self._row_ub.append(bounds[1])
+        self._stale = True
+
+    def remove_variable(self, var_id):
+        """ Remove a variable from the current problem.
+
+        Arguments:
+            var_id (str): variable identifier
+        """
+        self.remove_variables([var_id])
+
+    def remove_variables(self, var_ids):
+        """ Remove variables from the current problem.
+
+        Arguments:
+            var_ids (list): variable identifiers
+        """
+        removed = {self._var_index[var_id] for var_id in var_ids if var_id in self._var_index}
+        if not removed:
+            return
+        keep = [i for i in range(len(self.var_ids)) if i not in removed]
+        position = np.full(len(self.var_ids), -1, dtype=np.int32)
+        position[keep] = np.arange(len(keep), dtype=np.int32)
+
+        self.var_ids = [self.var_ids[i] for i in keep]
+        self._var_index = {var_id: i for i, var_id in enumerate(self.var_ids)}
+        self._lb = [self._lb[i] for i in keep]
+        self._ub = [self._ub[i] for i in keep]
+        self._integer = [self._integer[i] for i in keep]
+        rows = []
+        for cols, vals in self._rows:
+            new = position[cols]
+            mask = new >= 0
+            rows.append((new[mask], vals[mask]))
+        self._rows = rows
+        self._stale = True
+
+    def remove_constraint(self, constr_id):
+        """ Remove a constraint from the current problem.
+
+        Arguments:
+            constr_id (str): constraint identifier
+        """
+        self.remove_constraints([constr_id])
+
+    def remove_constraints(self, constr_ids):
+        """ Remove constraints from the current problem.
+
+        Arguments:
+            constr_ids (list): constraint identifiers
+        """
+        removed = {self._constr_index[constr_id] for constr_id in constr_ids if constr_id in self._constr_index}
+        if not removed:
+            return
+        keep = [i for i in range(len(self.constr_ids)) if i not in removed]
+        self.constr_ids = [self.constr_ids[i] for i in keep]
+        self._constr_index = {constr_id: i for i, constr_id in enumerate(self.constr_ids)}
+        self._rows = [self._rows[i] for i in keep]
+        self._row_lb = [self._row_lb[i] for i in keep]
+        self._row_ub = [self._row_ub[i] for i in keep]
+        self._stale = True
+
+    def change_coefficients(self, coefficients):
+        """Changes variables coefficients in constraints
+
+        :param coefficients: A list of tuples (constraint name, variable name, new value)
+        :type coefficients: list
+        """
+        for constr_id, var_id, value in coefficients:
+            i = self._constr_index[constr_id]
+            j = self._var_index[var_id]
+            cols, vals = self._rows[i]
+            k = np.flatnonzero(cols == j)
+            if len(k):
+                vals = vals.copy()
+                vals[k[0]] = value
+            else:
+                cols, vals = np.append(cols, np.int32(j)), np.append(vals, float(value))
+            self._rows[i] = (cols, vals)
+            if not self._stale and self.backend == 'highspy':
+                self.problem.changeCoeff(i, j, value)
+
+    def set_objective(self, linear=None, quadratic=None, minimize=True):
+        """ Set a predefined objective for this problem.
+
+        Args:
+            linear (str or dict): linear coefficients (or a single variable to optimize)
+            quadratic (dict): quadratic coefficients (optional)
+            minimize (bool): solve a minimization problem (default: True)
+
+        Notes:
+            Setting the objective is optional. It can also be passed directly when calling **solve**.
+            As in CPLEX, quadratic coefficients define the matrix Q of the term 1/2 x'Qx.
+        """
+
+        if linear or quadratic:
+            if isinstance(linear, str):
+                linear = {linear: 1.0}
+            self._linear = dict(linear) if linear else {}
+            self._quadratic = dict(quadratic) if quadratic else {}
+            for r_id in self._linear:
+                if r_id not in self._var_index:
+                    warn(f"Objective variable not previously declared: {r_id}")
+            for (r_id1, r_id2) in self._quadratic:
+                if r_id1 not in self._var_index:
+                    warn(f"Objective variable not previously declared: {r_id1}")
+                if r_id2 not in self._var_index:
+                    warn(f"Objective variable not previously declared: {r_id2}")
+
+        if minimize is not None:
+            self._minimize = minimize
+
+    def _cost_vector(self):
+        c = np.zeros(len(self.var_ids))
+        for r_id, coeff in self._linear.items():
+            if r_id in self._var_index:
+                c[self._var_index[r_id]] = coeff
+        return c
+
+    def _hessian_arrays(self):
+        """ Returns the lower triangle of Q in compressed column format. """
+        n = len(self.var_ids)
+        entries = {}
+        for (r_id1, r_id2), coeff in self._quadratic.items():
+            if r_id1 in self._var_index and r_id2 in self._var_index and coeff:
+                i, j = self._var_index[r_id1], self._var_index[r_id2]
+                key = (max(i, j), min(i, j))
+                entries[key] = entries.get(key, 0) + coeff
+        keys = sorted(entries, key=lambda x: (x[1], x[0]))
+        rows = _index_array([k[0] for k in keys])
+        cols = np.array([k[1] for k in keys], dtype=np.int64)
+        start = _index_array(np.searchsorted(cols, np.arange(n + 1)))
+        return start, rows, np.array([entries[k] for k in keys], dtype=float)
+
+    def _matrix_arrays(self):
+        """ Returns the constraints matrix in compressed row format. """
+        lengths = [len(cols) for cols, _ in self._rows]
+        start = np.zeros(len(self._rows) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=start[1:])
+        if self._rows:
+            index = np.concatenate([cols for cols, _ in self._rows]).astype(np.int32)
+            value = np.concatenate([vals for _, vals in self._rows]).astype(float)
+        else:
+            index, value = np.zeros(0, dtype=np.int32), np.zeros(0)
+        return start, index, value
+
+    def _sync(self):
+        """ Passes the whole problem to the highspy instance. """
+        lp = highspy.HighsLp()
+        lp.num_col_ = len(self.var_ids)
+        lp.num_row_ = len(self.constr_ids)
+        lp.col_cost_ = self._cost_vector()
+        lp.col_lower_ = np.array(self._lb, dtype=float)
+        lp.col_upper_ = np.array(self._ub, dtype=float)
+        lp.row_lower_ = np.array(self._row_lb, dtype=float)
+        lp.row_upper_ = np.array(self._row_ub, dtype=float)
+        start, index, value = self._matrix_arrays()
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        lp.a_matrix_.num_col_ = lp.num_col_
+        lp.a_matrix_.num_row_ = lp.num_row_
+        lp.a_matrix_.start_ = start
+        lp.a_matrix_.index_ = index
+        lp.a_matrix_.value_ = value
+        if any(self._integer):
+            lp.integrality_ = [highspy.HighsVarType.kInteger if x else highspy.HighsVarType.kContinuous
+                               for x in self._integer]
+        self.problem.passModel(lp)
+        self._cost = lp.col_cost_
+        self._hessian = False
+        self._stale = False
+
+    def _update_objective(self):
+        """ Passes the objective to the highspy instance, changing only what differs. """
+        problem = self.problem
+        n = len(self.var_ids)
+        c = self._cost_vector()
+        if self._cost is None or not np.array_equal(c, self._cost):
+            problem.changeColsCost(n, np.arange(n, dtype=np.int32), c)
+            self._cost = c
+        if self._quadratic:
+            start, index, value = self._hessian_arrays()
+            problem.passHessian(n, len(value), highspy.HessianFormat.kTriangular, start, index, value)
+            self._hessian = True
+        elif self._hessian:
+            problem.passHessian(n, 0, highspy.HessianFormat.kTriangular,
+                                np.zeros(n + 1, dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros(0))
+            self._hessian = False
+        sense = highspy.ObjSense.kMinimize if self._minimize else highspy.ObjSense.kMaximize
+        problem.changeObjectiveSense(sense)
+
+    def _bounds(self, constraints):
+        """ Returns the variables bounds with the temporary constraints. """
+        lb = np.array(self._lb, dtype=float)
+        ub = np.array(self._ub, dtype=float)
+        if constraints:
+            for r_id, x in constraints.items():
+                l, u = x if isinstance(x, tuple) else (x, x)
+                if r_id in self._var_index:
+                    i = self._var_index[r_id]
+                    lb[i] = -inf if l is None else l
+                    ub[i] = inf if u is None else u
+                else:
+                    warn(f"Constrained variable '{r_id}' not previously declared")
+        return lb, ub
+
+    def solve(self, linear=None, quadratic=None, minimize=None, model=None, constraints=None, get_values=True,
+              shadow_prices=False, reduced_costs=False, pool_size=0, pool_gap=None, warm_start=True):
+        """ Solve the optimization problem.
+
+        Arguments:
+            linear (str or dict): linear coefficients (or a single variable to optimize)
+            quadratic (dict): quadratic objective (optional)
+            minimize (bool): solve a minimization problem (default: True)
+            model (CBModel): model (optional, leave blank to reuse previous model structure)
+            constraints (dict): additional constraints (optional)
+            get_values (bool or list): set to false for speedup if you only care about the objective (default: True)
+            shadow_prices (bool): return shadow prices if available (default: False)
+            reduced_costs (bool): return reduced costs if available (default: False)
+            pool_size (int): calculate solution pool of given size (only for MILP problems)
+            pool_gap (float): maximum relative gap for solutions in pool (optional)
+            warm_start (bool or Basis): start from the basis of the previous solve (True), from scratch\
+                (False) or from a given basis (default: True). Ignored by the SciPy backend.
+
+        Returns:
+            Solution: solution
+        """
+
+        if model:
+            self.build_problem(model)
+
+        if pool_size > 1:
+            raise RuntimeError("HiGHS interface does not support solution pools.")
+
+        limit_time(self.problem if self.backend == 'highspy' else None)
+        timer = solver_stats.timer()
+
+        if self.scalefactor:
+            constraints = self._scale_constraints(constraints, quadratic)
+
+        self.set_objective(linear, quadratic, minimize)
+        timer.lap('objective')
+
+        if isinstance(warm_start, Basis):
+            self.set_basis(warm_start)
+
+        if self.backend == 'highspy':
+            solution = self._solve_highspy(constraints, get_values, shadow_prices, reduced_costs, not warm_start)
+        else:
+            solution = self._solve_scipy(constraints, get_values, shadow_prices, reduced_costs)
+        timer.lap('solve')
+        timer.done(solution.status, len(solution.values) if solution.values else 0,
+                   self.problem if self.backend == 'highspy' else None)
+
+        if self.scalefactor:
+            solution = self._unscale_solution(solution)
+
+        return solution
+
+    def _values(self, x, get_values):
+        if not get_values:
+            return None
+        try:
+            return {var_id: float(x[self._var_index[var_id]]) for var_id in get_values}
+        except Exception:
+            return dict(zip(self.var_ids, x.tolist()))
+
+    def _solve_highspy(self, constraints, get_values, shadow_prices, reduced_costs, cold_start=False):
+        problem = self.problem
+        if self._stale:
+            self._sync()
+        self._update_objective()
+        if cold_start:
+            problem.clearSolver()
+        elif self._basis is not None:
+            self._pass_basis(self._basis)
+        self._basis = None
+
+        changed = None
+        if constraints:
+            changed = _index_array([self._var_index[r_id] for r_id in constraints if r_id in self._var_index])
+            lb, ub = self._bounds(constraints)
+            problem.changeColsBounds(len(changed), changed, lb[changed], ub[changed])
+
+        try:
+            problem.run()
+            model_status = problem.getModelStatus()
+            status = status_mapping.get(model_status, Status.UNKNOWN)
+            message = problem.modelStatusToString(model_status)
+
+            if status == Status.OPTIMAL:
+                fobj = problem.getInfo().objective_function_value
+                result = problem.getSolution()
+                values, s_prices, r_costs = None, None, None
+                if get_values:
+                    values = self._values(np.asarray(result.col_value), get_values)
+                if shadow_prices and result.dual_valid:
+                    s_prices = dict(zip(self.constr_ids, result.row_dual))
+                if reduced_costs and result.dual_valid:
+                    r_costs = dict(zip(self.var_ids, result.col_dual))
+                solution = Solution(status, message, fobj, values, s_prices, r_costs)
+            else:
+                solution = Solution(status, message)
+        finally:
+            # restore values of temporary constraints
+            if changed is not None and len(changed):
+                lb = np.array(self._lb, dtype=float)[changed]
+                ub = np.array(self._ub, dtype=float)[changed]
+                problem.changeColsBounds(len(changed), changed, lb, ub)
+
+        return solution
+
+    def _solve_scipy(self, constraints, get_values, shadow_prices, reduced_costs):
+        if self._quadratic:
+            raise RuntimeError("Quadratic objectives require the highspy backend.")
+        from scipy.sparse import csr_matrix
+
+        n = len(self.var_ids)
+        c = self._cost_vector()
+        if not self._minimize:
+            c = -c
+        lb, ub = self._bounds(constraints)
+        start, index, value = self._matrix_arrays()
+        A = csr_matrix((value, index, start), shape=(len(self._rows), n))
+        row_lb = np.array(self._row_lb, dtype=float)
+        row_ub = np.array(self._row_ub, dtype=float)
+        options = {k: v for k, v in self._options.items() if k in scipy_options}
+
+        if any(self._integer) or not (shadow_prices or reduced_costs):
+            from scipy.optimize import milp, LinearConstraint, Bounds
+            kwargs = dict(integrality=np.array(self._integer, dtype=int), bounds=Bounds(lb, ub), options=options)
+            if self._rows:
+                kwargs['constraints'] = LinearConstraint(A, row_lb, row_ub)
+            result = milp(c, **kwargs)
+            s_prices, r_costs = None, None
+        else:
+            result, s_prices, r_costs = self._linprog(c, A, row_lb, row_ub, lb, ub, options)
+
+        status = scipy_status_mapping.get(result.status, Status.UNKNOWN)
+        if status == Status.OPTIMAL:
+            fobj = result.fun if self._minimize else -result.fun
+            values = self._values(result.x, get_values)
+            if not self._minimize:
+                s_prices = -s_prices if s_prices is not None else None
+                r_costs = -r_costs if r_costs is not None else None
+            s_prices = dict(zip(self.constr_ids, s_prices.tolist())) if shadow_prices and s_prices is not None else None
+            r_costs = dict(zip(self.var_ids, r_costs.tolist())) if reduced_costs and r_costs is not None else None
+            return Solution(status, result.message, fobj, values, s_prices, r_costs)
+        return Solution(status, result.message)
+
+    def _linprog(self, c, A, row_lb, row_ub, lb, ub, options):
+        """ Solves a LP with scipy.optimize.linprog, splitting ranged rows into equalities and
+        inequalities, and returns the result with the rows duals and variables reduced costs.
+        """
+        from scipy.optimize import linprog
+        from scipy.sparse import vstack
+
+        eq = row_lb == row_ub
+        upper = np.flatnonzero(~eq & np.isfinite(row_ub))
+        lower = np.flatnonzero(~eq & np.isfinite(row_lb))
+        equal = np.flatnonzero(eq)
+        A_ub = vstack([A[upper], -A[lower]]).tocsr()
+        b_ub = np.concatenate([row_ub[upper], -row_lb[lower]])
+        result = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A[equal], b_eq=row_lb[equal],
+                         bounds=np.column_stack([lb, ub]), method='highs', options=options)
+        if result.status != 0:
+            return result, None, None
+        duals = np.zeros(len(row_lb))
+        duals[equal] = result.eqlin.marginals
+        marginals = result.ineqlin.marginals
+        duals[upper] += marginals[:len(upper)]
+        duals[lower] -= marginals[len(upper):]
+        return result, duals, result.lower.marginals + result.upper.marginals
+
+    def _apply_constraints(self, constraints):
+        if self.backend != 'highspy':
+            return Solver._apply_constraints(self, constraints)
+        if self.scalefactor:
+            constraints = self._scale_constraints(constraints)
+        if self._stale:
+            self._sync()
+        if not constraints:
+            return None
+        changed = _index_array([self._var_index[r_id] for r_id in constraints if r_id in self._var_index])
+        lb, ub = self._bounds(constraints)
+        self.problem.changeColsBounds(len(changed), changed, lb[changed], ub[changed])
+        return changed
+
+    def _solve_objective(self, linear, minimize, keys, state):
+        if self.backend != 'highspy':
+            return Solver._solve_objective(self, linear, minimize, keys, state)
+        problem = self.problem
+        self.set_objective(linear, None, minimize)
+        self._update_objective()
+        problem.run()
+        status = status_mapping.get(problem.getModelStatus(), Status.UNKNOWN)
+        if status != Status.OPTIMAL:
+            return status, None, None
+        fobj = problem.getInfo().objective_function_value
+        values = None
+        if keys is not None:
+            x = np.asarray(problem.getSolution().col_value)
+            values = x[[self._var_index[r_id] for r_id in keys]]
+        if self.scalefactor:
+            fobj = fobj / self.scalefactor
+            values = values / self.scalefactor if values is not None else None
+        return status, fobj, values
+
+    def _restore_constraints(self, state):
+        if self.backend == 'highspy' and state is not None and len(state):
+            lb = np.array(self._lb, dtype=float)[state]
+            ub = np.array(self._ub, dtype=float)[state]
+            self.problem.changeColsBounds(len(state), state, lb, ub)
+
+    def get_basis(self):
+        """ Return the basis of the last solve.
+
+        Returns:
+            Basis: the basis (None if not available, e.g., for MILP problems or the SciPy backend)
+        """
+        if self.backend != 'highspy' or self._stale:
+            return None
+        basis = self.problem.getBasis()
+        if not basis.valid:
+            return None
+        variables = dict(zip(self.var_ids, [int(x) for x in basis.col_status]))
+        constraints = dict(zip(self.constr_ids, [int(x) for x in basis.row_status]))
+        return Basis(variables, constraints, 'highs')
+
+    def set_basis(self, basis):
+        """ Set the starting basis of the next solve.
+        Variables and constraints not in the basis are assumed nonbasic and basic, respectively.
+
+        Arguments:
+            basis (Basis): a basis returned by **get_basis**
+        """
+        if basis.solver != 'highs':
+            warn(f"Ignoring a basis created by {basis.solver}")
+        elif self.backend == 'highspy':
+            # passed on the next solve, once the problem is synchronized
+            self._basis = basis
+
+    def _pass_basis(self, basis):
+        status = highspy.HighsBasisStatus
+        lower, basic, zero = int(status.kLower), int(status.kBasic), int(status.kZero)
+        highs_basis = highspy.HighsBasis()
+        highs_basis.col_status = [status(basis.variables.get(var_id, lower if lb > -inf else zero))
+                                  for var_id, lb in zip(self.var_ids, self._lb)]
+        highs_basis.row_status = [status(basis.constraints.get(constr_id, basic)) for constr_id in self.constr_ids]
+        highs_basis.valid = True
+        self.problem.setBasis(highs_basis)
+
+    def _rescale(self, ratio):
+        """ Multiply the bounds of the variables and the constraints right-hand sides by a ratio.
+
+        Arguments:
+            ratio (float): the ratio between the new and the current scale factors
+        """
+        self._lb = [scale_bound(x, ratio) for x in self._lb]
+        self._ub = [scale_bound(x, ratio) for x in self._ub]
+        self._row_lb = [scale_bound(x, ratio) for x in self._row_lb]
+        self._row_ub = [scale_bound(x, ratio) for x in self._row_ub]
+        self._stale = True
+
+    def _has_integer_variables(self):
+        return any(self._integer)
+
+    def set_parameter(self, parameter, value):
+        """ Set a parameter value for this optimization problem
+
+        Arguments:
+            parameter (Parameter): parameter type
+            value (float): parameter value
+        """
+
+        if parameter in parameter_mapping:
+            option = parameter_mapping[parameter]
+            self._options[option] = value
+            if self.backend == 'highspy':
+                self.problem.setOptionValue(option, value)
+        else:
+            raise RuntimeError('Parameter unknown (or not yet supported).')
+
+    def set_logging(self, enabled=False):
+        """ Enable or disable log output:
+
+        Arguments:
+            enabled (bool): turn logging on (default: False)
+        """
+
+        self._options['output_flag'] = enabled
+        if self.backend == 'highspy':
+            self.problem.setOptionValue('output_flag', enabled)
+
+    def write_to_file(self, filename):
+        """ Write problem to file:
+
+        Arguments:
+            filename (str): file path
+        """
+        if self.backend != 'highspy':
+            raise RuntimeError("Writing problems requires the highspy backend.")
+        if self._stale:
+            self._sync()
+        self._update_objective()
+        self.problem.writeModel(filename)
+
+    def __getstate__(self):
+        """ The problem is already held in Python; the constraints rows are pickled as a single
+        matrix in compressed row format, and the highspy instance is recreated when unpickled.
+        """
+        state = self.__dict__.copy()
+        state.pop('problem', None)
+        state['_rows'] = self._matrix_arrays()
+        state['_stale'] = True
+        state['_cost'] = None
+        state['_hessian'] = False
+        state['_basis'] = None
+        return state
+
+    def __setstate__(self, state):
+        start, index, value = state['_rows']
+        state['_rows'] = [(index[start[i]:start[i + 1]], value[start[i]:start[i + 1]])
+                          for i in range(len(start) - 1)]
+        self.__dict__.update(state)
+        self.problem = None
+        if self.backend == 'highspy':
+            self.problem = highspy.Highs()
+            for option, x in self._options.items():
+                self.problem.setOptionValue(option, x)
+
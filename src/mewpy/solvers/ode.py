@@ -69,6 +69,18 @@ class KineticConfigurations:
     SOLVER_METHOD = ODEMethod.LSODA
     STEADY_STATE_TIME = 1e9
     SOLVER_TIMEOUT = 6000
+    # Right-hand side computed as dxdt = N @ r, from the vector of reaction rates r,
+    # instead of the mass balance of each metabolite
+    VECTORIZED_RHS = True
+    # Uses a sparse stoichiometric matrix N in the vectorized right-hand side
+    SPARSE_RHS = False
+    # Provides implicit solvers with the analytic Jacobian derived from the rate laws,
+    # instead of finite differences
+    ANALYTIC_JACOBIAN = True
+    # Steady-state simulations stop once the norm of dx/dt is below this tolerance
+    STEADY_STATE_TOL = 1e-6
+    # Refines the steady state reached by the integration with Newton iterations
+    STEADY_STATE_POLISH = True
 
 
 class ODEStatus(Enum):
@@ -79,5 +91,15 @@ class ODEStatus(Enum):
 class ODESolver(ABC):
 
     @abstractmethod
-    def solve(self, y0, t_points, **kwargs):
+    def solve(self, y0, t_points, jac=None, jac_sparsity=None, events=None, **kwargs):
+        """Solves the ODE.
+
+        :param y0: the initial conditions.
+        :param t_points: the integration time points.
+        :param jac: the Jacobian of the system, jac(t, y), used by implicit methods (optional).
+        :param jac_sparsity: the sparsity pattern of the Jacobian (optional).
+        :param events: terminal events, functions event(t, y) that stop the integration once\
+            they are non positive. The last time point and values are those of the event (optional).
+        :returns: the final values, the time points and the values at each time point.
+        """
         raise NotImplementedError
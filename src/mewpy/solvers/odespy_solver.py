@@ -41,6 +41,9 @@ methods = {
     ODEMethod.AdamsBashforth2: odespy.AdamsBashforth2
 }
 
+# methods that use the Jacobian
+jac_methods = (ODEMethod.LSODA, ODEMethod.LSODAR, ODEMethod.LSODE, ODEMethod.Vode, ODEMethod.Radau)
+
 
 class ODESpySolver(ODESolver):
     """
@@ -59,25 +62,33 @@ class ODESpySolver(ODESolver):
     def set_initial_condition(self, initial_condition):
         self.initial_condition = initial_condition
 
-    def solve(self, y0, t_points, **kwargs):
+    def solve(self, y0, t_points, jac=None, jac_sparsity=None, events=None, **kwargs):
         """
         Solves the ODE
         """
         def f(u, t):
             return self.func(t, u)
 
+        if jac is not None and self.method in jac_methods:
+            kwargs['jac'] = lambda u, t: jac(t, u)
+
         try:
             if self.method == ODEMethod.AdamsBashforth2:
                 solver = methods[self.method](f, method='bdf')
             else:
-                solver = methods[self.method](f)
+                solver = methods[self.method](f, **kwargs)
             
             # update default parameters
             time_points = t_points
             solver.atol = SolverConfigurations.ABSOLUTE_TOL
             solver.rtol = SolverConfigurations.RELATIVE_TOL
             solver.set_initial_condition(y0)
-            y, t = solver.solve(time_points)
+            if events:
+                def terminate(u, t, k):
+                    return k > 0 and any(e(t[k], u[k]) <= 0 for e in events)
+                y, t = solver.solve(time_points, terminate)
+            else:
+                y, t = solver.solve(time_points)
             C = [c[-1] for c in y]
             return C, t, y
         except Exception as e:
@@ -23,8 +23,10 @@ https://github.com/cdanielmachado/reframed
 """
 from optlang import Model, Variable, Constraint, Objective
 from optlang.symbolics import Zero, add
-from .solver import Solver, VarType, Parameter, default_parameters
+from .solver import Solver, VarType, Parameter, default_parameters, scale_bound, csr_arrays, Basis
 from .solution import Solution, Status
+from ..util.resources import limit_time, set_native_threads
+from ..util.stats import solver_stats
 from math import inf
 from warnings import warn
 
@@ -68,6 +70,11 @@ class OptLangSolver(Solver):
             vartype (VarType): variable type (default: CONTINUOUS)
             update (bool): update problem immediately (default: True)
         """
+        self._check_scaling([vartype])
+
+        if self.scalefactor:
+            lb = scale_bound(lb, self.scalefactor)
+            ub = scale_bound(ub, self.scalefactor)
 
         if var_id in self.var_ids:
             var = self.problem.variables[var_id]
@@ -91,10 +98,11 @@ class OptLangSolver(Solver):
             ub (float): upper bound
         """
         var = self.problem.variables[var_id]
-        if lb:
-            var.lb = lb
-        if ub:
-            var.ub = ub
+        if self.scalefactor:
+            lb = scale_bound(lb, self.scalefactor)
+            ub = scale_bound(ub, self.scalefactor)
+        # both bounds are set at once, as optlang rejects a lower bound above the upper bound
+        var.set_bounds(var.lb if lb is None else lb, var.ub if ub is None else ub)
 
     def add_constraint(self, constr_id, lhs, sense='=', rhs=0, update=True):
         """ Add a constraint to the current problem.
@@ -110,6 +118,9 @@ class OptLangSolver(Solver):
         if constr_id in self.constr_ids:
             self.problem.remove(constr_id)
 
+        if self.scalefactor:
+            rhs = rhs * self.scalefactor
+
         if sense == '=':
             constr = Constraint(Zero, lb=rhs, ub=rhs, name=constr_id)
         elif sense == '>':
@@ -128,6 +139,59 @@ class OptLangSolver(Solver):
         if update:
             self.problem.update()
 
+    def load_matrix(self, S, lb, ub, var_ids, row_ids, senses=None, rhs=None, vartypes=None):
+        """ Loads variables and the linear constraints S x (sense) rhs in bulk.
+
+        Arguments:
+            S: constraints matrix (rows x variables), a SciPy sparse matrix (CSR) or a dense array
+            lb (list): variables lower bounds
+            ub (list): variables upper bounds
+            var_ids (list): variables identifiers
+            row_ids (list): constraints identifiers
+            senses (list): constraints senses (any of: '<', '=', '>'; default '=')
+            rhs (list): constraints right-hand sides (default: 0)
+            vartypes (list): variables types (default: CONTINUOUS)
+        """
+        var_ids = list(var_ids)
+        row_ids = list(row_ids)
+        indptr, indices, data = csr_arrays(S, (len(row_ids), len(var_ids)))
+        vartypes = [VarType.CONTINUOUS] * len(var_ids) if vartypes is None else list(vartypes)
+
+        self._check_scaling(vartypes)
+        if self.scalefactor:
+            lb = [scale_bound(x, self.scalefactor) for x in lb]
+            ub = [scale_bound(x, self.scalefactor) for x in ub]
+        variables = [Variable(var_id, lb=l, ub=u, type=vartype.value)
+                     for var_id, l, u, vartype in zip(var_ids, lb, ub, vartypes)]
+        self.problem.add(variables)
+        self.var_ids.extend(var_ids)
+
+        senses = ['='] * len(row_ids) if senses is None else senses
+        rhs = [0] * len(row_ids) if rhs is None else rhs
+        constraints = []
+        for constr_id, sense, b in zip(row_ids, senses, rhs):
+            if self.scalefactor:
+                b = b * self.scalefactor
+            if sense == '=':
+                constraints.append(Constraint(Zero, lb=b, ub=b, name=constr_id))
+            elif sense == '>':
+                constraints.append(Constraint(Zero, lb=b, name=constr_id))
+            elif sense == '<':
+                constraints.append(Constraint(Zero, ub=b, name=constr_id))
+            else:
+                raise RuntimeError(f"Invalid constraint direction: {sense}")
+        self.problem.add(constraints)
+        self.constr_ids.extend(row_ids)
+        self.problem.update()
+
+        indices = indices.tolist()
+        data = data.tolist()
+        for i, constr in enumerate(constraints):
+            start, end = indptr[i], indptr[i + 1]
+            constr.set_linear_coefficients({variables[j]: data[k] for j, k in zip(indices[start:end],
+                                                                                  range(start, end))})
+        self.problem.update()
+
     def remove_variable(self, var_id):
         """ Remove a variable from the current problem.
 
@@ -224,7 +288,7 @@ class OptLangSolver(Solver):
             self.problem.objective = Objective(objective_expr, direction=('min' if minimize else 'max'), sloppy=True)
 
     def solve(self, linear=None, quadratic=None, minimize=None, model=None, constraints=None, get_values=True,
-              shadow_prices=False, reduced_costs=False, pool_size=0, pool_gap=None):
+              shadow_prices=False, reduced_costs=False, pool_size=0, pool_gap=None, warm_start=True):
         """ Solve the optimization problem.
 
         Arguments:
@@ -238,6 +302,9 @@ class OptLangSolver(Solver):
             reduced_costs (bool): return reduced costs if available (default: False)
             pool_size (int): calculate solution pool of given size (only for MILP problems)
             pool_gap (float): maximum relative gap for solutions in pool (optional)
+            warm_start (bool or Basis): start from the basis of the previous solve (True), from scratch\
+                (False) or from a given basis (default: True). Bases are only supported by the\
+                CPLEX and GLPK optlang interfaces.
 
         Returns:
             Solution: solution
@@ -248,6 +315,18 @@ class OptLangSolver(Solver):
 
         problem = self.problem
 
+        cold_start = not warm_start
+        if isinstance(warm_start, Basis):
+            self.set_basis(warm_start)
+        elif cold_start:
+            self._cold_start(True)
+
+        limit_time(problem)
+        timer = solver_stats.timer()
+
+        if self.scalefactor:
+            constraints = self._scale_constraints(constraints, quadratic)
+
         if constraints:
             old_constraints = {}
             for r_id, x in constraints.items():
@@ -259,14 +338,17 @@ class OptLangSolver(Solver):
                 else:
                     warn(f"Constrained variable '{r_id}' not previously declared")
             problem.update()
+        timer.lap('bounds')
 
         self.set_objective(linear, quadratic, minimize)
+        timer.lap('objective')
 
         # run the optimization
         if pool_size > 1:
             raise RuntimeError("OptLang interface does not support solution pools.")
 
         problem.optimize()
+        timer.lap('solve')
 
         status = status_mapping.get(problem.status, Status.UNKNOWN)
         message = str(problem.status)
@@ -292,6 +374,7 @@ class OptLangSolver(Solver):
             solution = Solution(status, message, fobj, values, s_prices, r_costs)
         else:
             solution = Solution(status, message)
+        timer.lap('values')
 
         # restore values of temporary constraints
         if constraints:
@@ -299,9 +382,160 @@ class OptLangSolver(Solver):
                 lpvar = problem.variables[r_id]
                 lpvar.lb, lpvar.ub = lb, ub
             problem.update()
+        timer.lap('bounds')
+        timer.done(status, len(solution.values) if solution.values else 0, problem)
+
+        if cold_start:
+            self._cold_start(False)
+
+        if self.scalefactor:
+            solution = self._unscale_solution(solution)
 
         return solution
 
+    def _interface(self):
+        """ Returns the name of the optlang interface (e.g., 'cplex' or 'glpk') and its native problem. """
+        name = self.problem.interface.__name__.rsplit('.', 1)[-1].replace('_interface', '')
+        return name, self.problem.problem
+
+    def _cold_start(self, enabled):
+        name, native = self._interface()
+        if name == 'cplex':
+            if enabled:
+                native.parameters.advance.set(0)
+            else:
+                native.parameters.advance.reset()
+        elif name == 'glpk' and enabled:
+            import swiglpk
+            swiglpk.glp_std_basis(native)
+
+    def _apply_constraints(self, constraints):
+        problem = self.problem
+        if self.scalefactor:
+            constraints = self._scale_constraints(constraints)
+        old_constraints = {}
+        if constraints:
+            for r_id, x in constraints.items():
+                lb, ub = x if isinstance(x, tuple) else (x, x)
+                if r_id in self.var_ids:
+                    lpvar = problem.variables[r_id]
+                    old_constraints[r_id] = (lpvar.lb, lpvar.ub)
+                    lpvar.lb, lpvar.ub = lb, ub
+                else:
+                    warn(f"Constrained variable '{r_id}' not previously declared")
+            problem.update()
+        # a single objective is kept, and only its coefficients are changed
+        problem.objective = Objective(Zero, sloppy=True)
+        return {'bounds': old_constraints, 'linear': {}}
+
+    def _solve_objective(self, linear, minimize, keys, state):
+        problem = self.problem
+        if isinstance(linear, str):
+            linear = {linear: 1}
+        variables = problem.variables
+        coefficients = {variables[r_id]: 0 for r_id in state['linear'] if r_id not in linear}
+        for r_id, val in linear.items():
+            if r_id in self.var_ids:
+                coefficients[variables[r_id]] = val
+            else:
+                warn(f"Objective variable not previously declared: {r_id}")
+        problem.objective.set_linear_coefficients(coefficients)
+        problem.objective.direction = 'min' if minimize else 'max'
+        state['linear'] = linear
+        problem.optimize()
+        status = status_mapping.get(problem.status, Status.UNKNOWN)
+        if status != Status.OPTIMAL:
+            return status, None, None
+        fobj = problem.objective.value
+        values = None
+        if keys is not None:
+            values = [variables[r_id].primal for r_id in keys]
+        if self.scalefactor:
+            fobj = fobj / self.scalefactor
+            values = [x / self.scalefactor for x in values] if values is not None else None
+        return status, fobj, values
+
+    def _restore_constraints(self, state):
+        if state['bounds']:
+            for r_id, (lb, ub) in state['bounds'].items():
+                lpvar = self.problem.variables[r_id]
+                lpvar.lb, lpvar.ub = lb, ub
+            self.problem.update()
+
+    def __getstate__(self):
+        """ Optlang models are pickled natively, in the format of the underlying solver. """
+        return self.__dict__.copy()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def get_basis(self):
+        """ Return the basis of the last solve.
+
+        Returns:
+            Basis: the basis (None if not available, e.g., for MILP problems or unsupported interfaces)
+        """
+        name, native = self._interface()
+        if name == 'cplex':
+            from .cplex_solver import get_cplex_basis
+            basis = get_cplex_basis(native)
+        elif name == 'glpk':
+            import swiglpk as glp
+            n_cols, n_rows = glp.glp_get_num_cols(native), glp.glp_get_num_rows(native)
+            variables = {glp.glp_get_col_name(native, j): glp.glp_get_col_stat(native, j)
+                         for j in range(1, n_cols + 1)}
+            constraints = {glp.glp_get_row_name(native, i): glp.glp_get_row_stat(native, i)
+                           for i in range(1, n_rows + 1)}
+            basis = Basis(variables, constraints, 'glpk')
+        else:
+            return None
+        if basis is not None:
+            basis.solver = f'optlang-{name}'
+        return basis
+
+    def set_basis(self, basis):
+        """ Set the starting basis of the next solve.
+        Variables and constraints not in the basis are assumed nonbasic and basic, respectively.
+
+        Arguments:
+            basis (Basis): a basis returned by **get_basis**
+        """
+        name, native = self._interface()
+        if basis.solver != f'optlang-{name}':
+            warn(f"Ignoring a basis created by {basis.solver}")
+            return
+        self.problem.update()
+        if name == 'cplex':
+            from .cplex_solver import set_cplex_basis
+            set_cplex_basis(native, Basis(basis.variables, basis.constraints, 'cplex'))
+        elif name == 'glpk':
+            import swiglpk as glp
+            for j in range(1, glp.glp_get_num_cols(native) + 1):
+                default = glp.GLP_NF if glp.glp_get_col_type(native, j) == glp.GLP_FR else glp.GLP_NL
+                glp.glp_set_col_stat(native, j, basis.variables.get(glp.glp_get_col_name(native, j), default))
+            for i in range(1, glp.glp_get_num_rows(native) + 1):
+                glp.glp_set_row_stat(native, i, basis.constraints.get(glp.glp_get_row_name(native, i), glp.GLP_BS))
+
+    def _rescale(self, ratio):
+        """ Multiply the bounds of the variables and the constraints right-hand sides by a ratio.
+
+        Arguments:
+            ratio (float): the ratio between the new and the current scale factors
+        """
+        problem = self.problem
+        for var in problem.variables:
+            var.set_bounds(scale_bound(var.lb, ratio), scale_bound(var.ub, ratio))
+        for constr in problem.constraints:
+            lb, ub = constr.lb, constr.ub
+            # the lower bound is cleared first, otherwise it could exceed the current upper bound
+            constr.lb = None
+            constr.ub = scale_bound(ub, ratio)
+            constr.lb = scale_bound(lb, ratio)
+        problem.update()
+
+    def _has_integer_variables(self):
+        return any(var.type != VarType.CONTINUOUS.value for var in self.problem.variables)
+
     def set_parameter(self, parameter, value):
         """ Set a parameter value for this optimization problem
 
@@ -310,7 +544,10 @@ class OptLangSolver(Solver):
             value (float): parameter value
         """
 
-        if parameter in self.parameter_mapping:
+        if parameter == Parameter.THREADS:
+            # not exposed by optlang, set on the native problem (CPLEX, Gurobi)
+            set_native_threads(self.problem, value)
+        elif parameter in self.parameter_mapping:
             self.parameter_mapping[parameter] = value
         #else:
         #    raise RuntimeError('Parameter unknown (or not yet supported).')
@@ -44,14 +44,20 @@ class ScikitsODESolver(ODESolver):
     def set_initial_condition(self, initial_condition):
         self.initial_condition = initial_condition
 
-    def solve(self, y0, t_span, **kwargs):
+    def solve(self, y0, t_span, jac=None, jac_sparsity=None, events=None, **kwargs):
         """
         Returns the solver method from odespy package.
+        Events are not supported.
 
         :param func: function with ODE system.
         :return: an instance of odeSolver
 
         """
-        sol = odeint(self.func, t_span, y0)
+        if jac is not None:
+            def jacfn(t, y, fy, J):
+                J[:, :] = jac(t, y)
+                return 0
+            kwargs['jacfn'] = jacfn
+        sol = odeint(self.func, t_span, y0, **kwargs)
         C = [c[-1] for c in sol.y]
         return C, sol.t, sol.y
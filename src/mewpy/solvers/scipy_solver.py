@@ -21,7 +21,9 @@ Author: Vitor Pereira
 ##############################################################################
 """
 from .ode import ODEMethod, ODESolver
+from scipy import integrate
 from scipy.integrate._ivp import solve_ivp
+import numpy as np
 
 methods = {
     ODEMethod.RK45: 'RK45',
@@ -32,6 +34,10 @@ methods = {
     ODEMethod.LSODA: 'LSODA',
 }
 
+# methods that use the Jacobian, and those that use its sparsity pattern
+jac_methods = ('Radau', 'BDF', 'LSODA')
+sparsity_methods = ('Radau', 'BDF')
+
 
 class ScipySolver(ODESolver):
 
@@ -43,8 +49,46 @@ class ScipySolver(ODESolver):
     def set_initial_condition(self, initial_condition):
         self.initial_condition = initial_condition
 
-    def solve(self, y0, t_points, **kwargs):
+    def solve(self, y0, t_points, jac=None, jac_sparsity=None, events=None, **kwargs):
         t_span=[t_points[0],t_points[-1]]
-        sol = solve_ivp(self.func, t_span, y0, method=methods[self.method], t_eval=t_points,**kwargs)
+        method = methods[self.method]
+        if jac is not None and method in jac_methods:
+            kwargs['jac'] = jac
+        if jac_sparsity is not None and method in sparsity_methods:
+            kwargs['jac_sparsity'] = jac_sparsity
+        if events:
+            return self._solve_until(y0, t_points, events, **kwargs)
+        sol = solve_ivp(self.func, t_span, y0, method=method, t_eval=t_points,**kwargs)
         C = [c[-1] for c in sol.y]
         return C, sol.t, sol.y
+
+    def _solve_until(self, y0, t_points, events, **kwargs):
+        """Integrates step by step until an event is non positive at the end of a step.
+        Contrary to solve_ivp events, the exact zero of the event is not searched,
+        which requires the event to be continuous along the interpolated solution.
+        The last point is the state at which the event was triggered. As solve_ivp,
+        returns the partial trajectory if a step fails.
+        """
+        solver = getattr(integrate, methods[self.method])(self.func, t_points[0], y0, t_points[-1], **kwargs)
+        ts, ys = [t_points[0]], [np.asarray(y0, dtype=float)]
+        i = 1
+        while solver.status == 'running':
+            solver.step()
+            if solver.status == 'failed':
+                break
+            if i < len(t_points) and t_points[i] <= solver.t:
+                sol = solver.dense_output()
+                while i < len(t_points) and t_points[i] <= solver.t:
+                    ts.append(t_points[i])
+                    ys.append(sol(t_points[i]))
+                    i += 1
+            if any(e(solver.t, solver.y) <= 0 for e in events):
+                if ts[-1] < solver.t:
+                    ts.append(solver.t)
+                    ys.append(solver.y.copy())
+                else:
+                    ys[-1] = solver.y.copy()
+                break
+        y = np.array(ys).T
+        C = [c[-1] for c in y]
+        return C, np.array(ts), y
@@ -19,6 +19,12 @@ class MEWPYSolvers(Singleton):
         except ImportError:
             pass
 
+        try:
+            from .highs_solver import HighsSolver
+            self._mewpy_solvers['highs'] = HighsSolver
+        except ImportError:
+            pass
+
         try:
             from .optlang_solver import OptLangSolver
             self._mewpy_solvers['optlang'] = OptLangSolver
@@ -22,6 +22,7 @@ https://github.com/cdanielmachado/reframed
 ##############################################################################
 """
 from mewpy.simulation import SStatus, get_simulator, Simulator, SimulationResult
+from collections.abc import Mapping
 from enum import Enum
 import re
 
@@ -44,6 +45,33 @@ status_mapping={
     Status.INF_OR_UNB : SStatus.INF_OR_UNB
 }
 
+class UnscaledValues(Mapping):
+    """ Read-only view of the variable values of a scaled problem.
+
+    Values are unscaled only when accessed, avoiding a pass over all the variables
+    when a single flux is required, e.g., to evaluate a fitness function.
+    """
+
+    def __init__(self, values, scalefactor):
+        self._values = values
+        self.scalefactor = scalefactor
+
+    def __getitem__(self, key):
+        return self._values[key] / self.scalefactor
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def copy(self):
+        return {k: v / self.scalefactor for k, v in self._values.items()}
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
 class Solution(object):
     """ Stores the results of an optimization.
 
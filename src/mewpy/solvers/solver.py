@@ -23,10 +23,14 @@ https://github.com/cdanielmachado/reframed
 """
 from enum import Enum
 from math import inf
+import numpy as np
 from reframed.core.cbmodel import CBModel
 from cobra.core.model import Model
 
 from ..simulation.simulation import Simulator
+from ..util.resources import limit_time
+from ..util.stats import solver_stats
+from .solution import UnscaledValues, Status
 
 
 class VarType(Enum):
@@ -46,6 +50,7 @@ class Parameter(Enum):
     MIP_ABS_GAP = 5
     POOL_SIZE = 6
     POOL_GAP = 7
+    THREADS = 8
 
 
 default_parameters = {
@@ -54,6 +59,84 @@ default_parameters = {
 }
 
 
+def scale_bound(value, factor, infinity=inf):
+    """ Scales a bound, leaving infinite and undefined bounds unchanged.
+
+    Arguments:
+        value (float): the bound
+        factor (float): the scale factor
+        infinity (float): the solver's infinity value (default: inf)
+    """
+    if value is None or abs(value) >= infinity:
+        return value
+    return value * factor
+
+
+class Basis(object):
+    """ A simplex basis, i.e., the status of the variables and constraints of a LP problem.
+
+    Variables and constraints are identified by name, so that a basis can be passed between
+    related problems (e.g., with a different objective or a few more constraints). Status codes
+    are those of the solver interface that created the basis.
+    """
+
+    def __init__(self, variables, constraints, solver=None):
+        """
+        Arguments:
+            variables (dict): variables status
+            constraints (dict): constraints status
+            solver (str): the solver interface that created the basis
+        """
+        self.variables = variables
+        self.constraints = constraints
+        self.solver = solver
+
+    def __repr__(self):
+        return f"Basis({self.solver}, {len(self.variables)} variables, {len(self.constraints)} constraints)"
+
+
+def csr_arrays(S, shape):
+    """ Returns the (indptr, indices, data) arrays of a matrix in compressed sparse row format.
+
+    Arguments:
+        S: a SciPy sparse matrix or a dense array
+        shape (tuple): the expected (rows, columns) shape
+    """
+    if not hasattr(S, 'tocsr'):
+        from scipy.sparse import csr_matrix
+        S = csr_matrix(np.asarray(S, dtype=float))
+    S = S.tocsr()
+    if S.shape != tuple(shape):
+        raise ValueError(f"Expected a matrix of shape {tuple(shape)}, got {S.shape}")
+    S.sum_duplicates()
+    S.eliminate_zeros()
+    return S.indptr, S.indices, S.data
+
+
+def stoichiometric_matrix(simulator):
+    """ Returns the stoichiometric matrix of a model as a SciPy CSR matrix,
+    with rows following the order of the metabolites and columns that of the reactions.
+
+    Arguments:
+        simulator: a phenotype simulator
+    """
+    from scipy.sparse import csr_matrix
+    column = {r_id: j for j, r_id in enumerate(simulator.reactions)}
+    table = simulator.metabolite_reaction_lookup()
+    metabolites = simulator.metabolites
+    indptr = [0]
+    indices = []
+    data = []
+    for m_id in metabolites:
+        for r_id, coeff in table[m_id].items():
+            if coeff:
+                indices.append(column[r_id])
+                data.append(coeff)
+        indptr.append(len(indices))
+    return csr_matrix((np.array(data, dtype=float), np.array(indices, dtype=np.int32), np.array(indptr)),
+                      shape=(len(metabolites), len(column)))
+
+
 class Solver(object):
     """ Abstract class representing a generic solver.
 
@@ -65,6 +148,7 @@ class Solver(object):
         self.var_ids = []
         self.constr_ids = []
         self.model = model
+        self.scalefactor = None
 
     def add_variable(self, var_id, lb=-inf, ub=inf, vartype=VarType.CONTINUOUS, update=True):
         """ Add a variable to the current problem.
@@ -172,12 +256,15 @@ class Solver(object):
             model
         """
 
+        timer = solver_stats.timer('build')
         if isinstance(model, (CBModel, Model)):
             self.__build_problem_model(model)
         elif isinstance(model, Simulator):
             self.__build_problem_simulator(model)
         else:
             raise TypeError
+        timer.lap('build')
+        timer.done()
 
     def __build_problem_model(self, model):
         """ Create a problem for metabolic models (REFRAMED or COBRApy)
@@ -194,18 +281,133 @@ class Solver(object):
         Args:
             simulator: A phenotype simulator
         """
-        for r_id in simulator.reactions:
-            lb, ub = simulator.get_reaction_bounds(r_id)
-            self.add_variable(r_id, lb, ub, update=False)
+        reactions = simulator.reactions
+        bounds = [simulator.get_reaction_bounds(r_id) for r_id in reactions]
+        lb = [b[0] for b in bounds]
+        ub = [b[1] for b in bounds]
+        S = stoichiometric_matrix(simulator)
+        self.load_matrix(S, lb, ub, reactions, simulator.metabolites)
+
+    def load_matrix(self, S, lb, ub, var_ids, row_ids, senses=None, rhs=None, vartypes=None):
+        """ Loads variables and the linear constraints S x (sense) rhs in bulk.
+
+        Solver interfaces should override this method using their native bulk loading methods.
+
+        Arguments:
+            S: constraints matrix (rows x variables), a SciPy sparse matrix (CSR) or a dense array
+            lb (list): variables lower bounds
+            ub (list): variables upper bounds
+            var_ids (list): variables identifiers
+            row_ids (list): constraints identifiers
+            senses (list): constraints senses (any of: '<', '=', '>'; default '=')
+            rhs (list): constraints right-hand sides (default: 0)
+            vartypes (list): variables types (default: CONTINUOUS)
+        """
+        var_ids = list(var_ids)
+        row_ids = list(row_ids)
+        indptr, indices, data = csr_arrays(S, (len(row_ids), len(var_ids)))
+        senses = ['='] * len(row_ids) if senses is None else senses
+        rhs = [0] * len(row_ids) if rhs is None else rhs
+        vartypes = [VarType.CONTINUOUS] * len(var_ids) if vartypes is None else vartypes
+
+        for var_id, l, u, vartype in zip(var_ids, lb, ub, vartypes):
+            self.add_variable(var_id, l, u, vartype, update=False)
         self.update()
 
-        table = simulator.metabolite_reaction_lookup()
-        for m_id in simulator.metabolites:
-            self.add_constraint(m_id, table[m_id], update=False)
+        for i, constr_id in enumerate(row_ids):
+            lhs = {var_ids[j]: v for j, v in zip(indices[indptr[i]:indptr[i + 1]], data[indptr[i]:indptr[i + 1]])}
+            self.add_constraint(constr_id, lhs, senses[i], rhs[i], update=False)
         self.update()
 
+    def set_scalefactor(self, scalefactor=None):
+        """ Set a persistent scaling of the problem variables.
+
+        The bounds of the variables and the constraints right-hand sides are scaled once, and so
+        are variables and constraints added afterwards. Temporary constraints passed to **solve** are
+        scaled on each call, while the objective and variable values of solutions are unscaled lazily.
+
+        Arguments:
+            scalefactor (float): a positive scale factor (None to remove the scaling)
+
+        Notes:
+            Scaling is only supported for linear objectives and problems without integer variables,
+            whose values and coupling constraints would not scale with the continuous variables.
+            Shadow prices and reduced costs are not affected by the scaling.
+        """
+        if scalefactor is not None and scalefactor <= 0:
+            raise ValueError("The scale factor must be a positive number.")
+        scalefactor = scalefactor if scalefactor != 1 else None
+        if scalefactor and self._has_integer_variables():
+            raise ValueError("Scaling is not supported for problems with integer variables.")
+        ratio = (scalefactor or 1) / (self.scalefactor or 1)
+        if ratio != 1:
+            self._rescale(ratio)
+        self.scalefactor = scalefactor
+
+    def _rescale(self, ratio):
+        """ Multiply the bounds of the variables and the constraints right-hand sides by a ratio.
+
+        Arguments:
+            ratio (float): the ratio between the new and the current scale factors
+        """
+        raise Exception('Not implemented for this solver.')
+
+    def _has_integer_variables(self):
+        """ Whether the problem has integer or binary variables. """
+        raise Exception('Not implemented for this solver.')
+
+    def _check_scaling(self, vartypes):
+        """ Raises a ValueError when integer or binary variables are added to a scaled problem.
+
+        Arguments:
+            vartypes (list): the types of the new variables
+        """
+        if self.scalefactor and any(vartype != VarType.CONTINUOUS for vartype in vartypes):
+            raise ValueError("Scaling is not supported for problems with integer variables.")
+
+    def _scale_constraints(self, constraints, quadratic=None):
+        """ Scale the temporary constraints of a solve call.
+
+        Arguments:
+            constraints (dict): additional constraints
+            quadratic (dict): quadratic objective (optional)
+
+        Returns:
+            dict: scaled constraints
+        """
+        if quadratic:
+            raise ValueError("Scaling is only supported for linear objectives.")
+        if not constraints:
+            return constraints
+        factor = self.scalefactor
+        scaled = {}
+        for r_id, x in constraints.items():
+            if isinstance(x, tuple):
+                scaled[r_id] = tuple(scale_bound(v, factor) for v in x)
+            else:
+                scaled[r_id] = scale_bound(x, factor)
+        return scaled
+
+    def _unscale_solution(self, solution):
+        """ Unscale the objective value of a solution (or solution pool).
+        Variable values are wrapped in a view that unscales them on access.
+
+        Arguments:
+            solution (Solution or list): the solution(s)
+
+        Returns:
+            Solution or list: the unscaled solution(s)
+        """
+        solutions = solution if isinstance(solution, list) else [solution]
+        for sol in solutions:
+            if sol.fobj is not None:
+                sol.fobj = sol.fobj / self.scalefactor
+            if sol.values is not None:
+                sol.values = UnscaledValues(sol.values, self.scalefactor)
+        return solution
+
     def solve(self, linear=None, quadratic=None, minimize=None, model=None, constraints=None, get_values=True,
-              shadow_prices=False, reduced_costs=False, pool_size=0, pool_gap=None):
+              shadow_prices=False, reduced_costs=False, pool_size=0, pool_gap=None, warm_start=True):
         """ Solve the optimization problem.
 
         Arguments:
@@ -220,6 +422,8 @@ class Solver(object):
             reduced_costs (bool): return reduced costs if available (default: False)
             pool_size (int): calculate solution pool of given size (only for MILP problems)
             pool_gap (float): maximum relative gap for solutions in pool (optional)
+            warm_start (bool or Basis): start from the basis of the previous solve (True), from scratch\
+                (False) or from a given basis (default: True)
 
         Returns:
             Solution: solution
@@ -228,6 +432,104 @@ class Solver(object):
         # An exception is raised if the subclass does not implement this method.
         raise Exception('Not implemented for this solver.')
 
+    def solve_objectives(self, objectives, minimize_flags=True, constraints=None, get_values=False):
+        """ Solve the problem for a sequence of objectives, under the same temporary constraints.
+
+        The constraints are applied only once, and each solve starts from the basis of the previous one.
+
+        Arguments:
+            objectives (list): linear objectives (dicts, or single variables to optimize)
+            minimize_flags (bool or list): solve minimization problems, for all or for each objective\
+                (default: True)
+            constraints (dict): additional constraints (optional)
+            get_values (bool or list): also return the values of all (True) or of a list of variables\
+                (default: False)
+
+        Returns:
+            tuple: the objective values and status arrays, and a (objectives x variables) array of values\
+                (None if get_values is False). Values of non optimal solves are NaN.
+        """
+        objectives = list(objectives)
+        n = len(objectives)
+        if isinstance(minimize_flags, bool):
+            minimize_flags = [minimize_flags] * n
+        elif len(minimize_flags) != n:
+            raise ValueError("The number of minimize flags differs from the number of objectives.")
+
+        if get_values is True:
+            keys = list(self.var_ids)
+        elif get_values:
+            keys = list(get_values)
+        else:
+            keys = None
+
+        fobj = np.full(n, np.nan)
+        status = np.full(n, Status.UNKNOWN, dtype=object)
+        values = np.full((n, len(keys)), np.nan) if keys is not None else None
+
+        timer = solver_stats.timer()
+        state = self._apply_constraints(constraints)
+        timer.lap('bounds')
+        try:
+            for i, (linear, minimize) in enumerate(zip(objectives, minimize_flags)):
+                limit_time(self.problem)
+                status[i], f, x = self._solve_objective(linear, minimize, keys, state)
+                if status[i] == Status.OPTIMAL:
+                    fobj[i] = f
+                    if keys is not None:
+                        values[i] = x
+                timer.lap('solve')
+                timer.done(status[i], len(keys) if keys is not None else 0, self.problem)
+        finally:
+            self._restore_constraints(state)
+            timer.lap('bounds')
+
+        return fobj, status, values
+
+    def _apply_constraints(self, constraints):
+        """ Apply the temporary constraints of **solve_objectives**.
+        Solver interfaces should override this method, together with **_solve_objective** and
+        **_restore_constraints**, to change the variables bounds only once.
+
+        Returns:
+            the state required to solve the objectives and restore the bounds
+        """
+        return constraints
+
+    def _solve_objective(self, linear, minimize, keys, state):
+        """ Solve the problem for a single objective of **solve_objectives**.
+
+        Returns:
+            tuple: the status, the (unscaled) objective value, and the values of the keys variables
+        """
+        solution = self.solve(linear, minimize=minimize, constraints=state, get_values=keys or False,
+                              shadow_prices=False)
+        values = None
+        if keys is not None and solution.status == Status.OPTIMAL:
+            values = [solution.values[k] for k in keys]
+        return solution.status, solution.fobj, values
+
+    def _restore_constraints(self, state):
+        """ Restore the variables bounds changed by **_apply_constraints**. """
+        pass
+
+    def get_basis(self):
+        """ Return the basis of the last solve.
+
+        Returns:
+            Basis: the basis (None if not available, e.g., for MILP problems)
+        """
+        raise Exception('Not implemented for this solver.')
+
+    def set_basis(self, basis):
+        """ Set the starting basis of the next solve.
+        Variables and constraints not in the basis are assumed nonbasic and basic, respectively.
+
+        Arguments:
+            basis (Basis): a basis returned by **get_basis**
+        """
+        raise Exception('Not implemented for this solver.')
+
     def get_solution_pool(self, get_values=True):
         """ Return a solution pool for MILP problems.
         Must be called after using solve with pool_size argument > 0.
@@ -288,3 +590,36 @@ class Solver(object):
         :type coefficients: list
         """
         raise Exception('Not implemented for this solver.')
+
+    def __getstate__(self):
+        """ Solvers are pickled through a compact representation of the problem (see **_export_problem**),
+        which is loaded in bulk into a new problem when unpickled.
+        """
+        return {'problem': self._export_problem(), 'scalefactor': self.scalefactor}
+
+    def __setstate__(self, state):
+        self.__init__()
+        # the exported bounds and right-hand sides are already scaled
+        self._import_problem(state['problem'])
+        self.scalefactor = state['scalefactor']
+
+    def _export_problem(self):
+        """ Export the current problem as a compact representation of plain Python and NumPy objects.
+        Solver interfaces should override this method to support pickling.
+
+        Returns:
+            dict: variables (var_ids, lb, ub, vartypes), constraints (constr_ids, a CSR matrix S, senses, rhs),\
+                objective (linear, quadratic, minimize) and the changed parameters
+        """
+        raise Exception('Not implemented for this solver.')
+
+    def _import_problem(self, problem):
+        """ Load a problem exported by **_export_problem** into this (empty) solver.
+
+        Arguments:
+            problem (dict): the exported problem
+        """
+        self.load_matrix(problem['S'], problem['lb'], problem['ub'], problem['var_ids'], problem['constr_ids'],
+                         problem['senses'], problem['rhs'], problem['vartypes'])
+        self.set_objective(problem['linear'], problem['quadratic'], problem['minimize'])
+        self.set_parameters(problem['parameters'])
@@ -36,6 +36,8 @@ class ModelConstants:
     SOLVER_TIMEOUT = 3600
     # Default kcat value in 1/s
     DEFAULT_KCAT = 1
+    # Directory where essentiality results are cached. If None, results are not cached on disk.
+    CACHE_DIR = None
 
 
 class EAConstants:
@@ -55,6 +57,18 @@ class EAConstants:
     # Number of cpus for multiprocessor evaluation of candidates.
     # If NUM_CPUS is non positive, half of the available cpus are used
     NUM_CPUS = -1
+    # Number of threads of each solver in worker processes.
+    # If SOLVER_THREADS is non positive, the available cpus are split among the workers
+    SOLVER_THREADS = -1
+    # Number of BLAS/OpenMP threads in worker processes.
+    # If BLAS_THREADS is non positive, the available cpus are split among the workers
+    BLAS_THREADS = -1
+    # Pin each worker process to its own set of cores (Linux only)
+    PIN_WORKERS = False
+    # Time budget, in seconds, of each candidate evaluation, which limits all its solves.
+    # Candidates whose evaluation exceeds the budget are assigned the worst fitness.
+    # If None, evaluations are not limited
+    TIME_BUDGET = None
     # Maximum number of generations (used as stopping criteria for the EA)
     MAX_GENERATIONS = 100
     # Use probabilistic modofication target list when applicable
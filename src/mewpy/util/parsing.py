@@ -24,6 +24,7 @@ Authors: Vitor Pereira
 import re
 import sys
 from abc import abstractmethod
+from functools import lru_cache
 from operator import add, sub, mul, truediv, pow
 from typing import List
 
@@ -257,6 +258,57 @@ class Node(object):
         else:
             return Node(self.value, self.left.replace(r_map), self.right.replace(r_map), self.tp)
 
+    def derivative(self, symbol: str):
+        """Symbolic partial derivative of an arithmetic expression tree.
+        Supports the operators +, -, *, / and ^ and the functions pow, exp, log, ln and sqrt.
+
+        Args:
+            symbol (str): the variable of differentiation
+
+        Returns:
+            Node: a new tree with the (simplified) derivative
+
+        Raises:
+            ValueError: if the expression contains a function that can not be differentiated.
+        """
+        if self.is_leaf():
+            return Node('1') if self.value == symbol else Node('0')
+        if symbol not in self.get_operands():
+            return Node('0')
+        op = self.value.strip().lower()
+        u, w = self.left, self.right
+        if self.tp == 1:
+            du = w.derivative(symbol)
+            if op == 'exp':
+                return _product(self, du)
+            elif op in ('log', 'ln'):
+                return _quotient(du, w)
+            elif op == 'sqrt':
+                return _quotient(du, _product(Node('2'), self))
+        elif op in ('^', 'pow'):
+            du, dw = u.derivative(symbol), w.derivative(symbol)
+            d = Node('0')
+            if not _is_zero(du):
+                # w * u^(w-1) * du
+                d = _product(_product(w, _power(u, Node('-', w, Node('1')))), du)
+            if not _is_zero(dw):
+                # u^w * log(u) * dw
+                d = _sum(d, _product(_product(_power(u, w), Node('log', Node(EMPTY_LEAF), u, 1)), dw))
+            return d
+        elif self.tp == 0:
+            du, dw = u.derivative(symbol), w.derivative(symbol)
+            if op == '+':
+                return _sum(du, dw)
+            elif op == '-':
+                return _difference(du, dw)
+            elif op == '*':
+                return _sum(_product(du, w), _product(u, dw))
+            elif op == '/':
+                if _is_zero(dw):
+                    return _quotient(du, w)
+                return _quotient(_difference(_product(du, w), _product(u, dw)), _product(w, w))
+        raise ValueError(f"Unable to differentiate {self.value}")
+
     def to_infix(self,
                  opar: str = '(',
                  cpar: str = ')',
@@ -629,4 +681,100 @@ def isozymes(exp: str) -> List[str]:
 
     proteins = [node.to_infix(opar='',cpar='') for node in prots]
     return proteins
-    
\ No newline at end of file
+    
+
+
+class CompiledExpression:
+    """A syntax tree compiled into a postfix program. The program is evaluated with a stack,
+    without recursion, and operator functions are only looked up once per evaluation.
+    Contrary to closures, compiled expressions can be pickled.
+
+    :param tree: The syntax tree (Node) of the expression.
+    """
+
+    def __init__(self, tree):
+        self.program = []
+        self._compile(tree)
+        self.operands = tree.get_operands()
+
+    def _compile(self, node):
+        if node.is_leaf():
+            self.program.append((False, node.value))
+        else:
+            self._compile(node.left)
+            self._compile(node.right)
+            self.program.append((True, node.value))
+
+    def evaluate(self, f_operand, f_operator):
+        """
+        Evaluates the expression using the f_operand and f_operator mapping functions
+        """
+        functions = dict()
+        stack = []
+        for is_operator, value in self.program:
+            if is_operator:
+                f = functions.get(value)
+                if f is None:
+                    f = functions[value] = f_operator(value)
+                right = stack.pop()
+                stack[-1] = maybe_fn(f, stack[-1], right)
+            else:
+                stack.append(f_operand(value))
+        return stack[0]
+
+
+@lru_cache(maxsize=100000)
+def compile_expression(exp, rules=Boolean):
+    """ Parses an expression into a CompiledExpression. Each expression is only parsed once,
+    following calls return the same cached instance.
+
+    :param str exp: the expression to be parsed
+    :param rules: Sintax definition rules (default Boolean)
+    """
+    return CompiledExpression(build_tree(exp, rules))
+
+
+# Construction of simplified arithmetic trees, used in symbolic differentiation
+def _is_zero(node):
+    return node.is_leaf() and is_number(node.value) and float(node.value) == 0
+
+
+def _is_one(node):
+    return node.is_leaf() and is_number(node.value) and float(node.value) == 1
+
+
+def _sum(a, b):
+    if _is_zero(a):
+        return b
+    if _is_zero(b):
+        return a
+    return Node('+', a, b)
+
+
+def _difference(a, b):
+    if _is_zero(b):
+        return a
+    return Node('-', a, b)
+
+
+def _product(a, b):
+    if _is_zero(a) or _is_zero(b):
+        return Node('0')
+    if _is_one(a):
+        return b
+    if _is_one(b):
+        return a
+    return Node('*', a, b)
+
+
+def _quotient(a, b):
+    if _is_zero(a):
+        return Node('0')
+    if _is_one(b):
+        return a
+    return Node('/', a, b)
+
+
+def _power(a, b):
+    # pow is used instead of ^, which is not a python operator
+    return Node('pow', a, b, 2)
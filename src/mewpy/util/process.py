@@ -24,6 +24,8 @@ import copy
 from abc import ABC, abstractmethod
 
 from .constants import EAConstants, ModelConstants
+from .resources import WorkerPolicy
+from .stats import solver_stats, StatsCollector, collect
 
 
 MP_Evaluators = []
@@ -97,10 +99,23 @@ class Evaluator(ABC):
         NotImplementedError: Requires an evaluated method to
         be implemented.
     """
+    # the problem whose timeouts counter receives the timeouts of the evaluations run by the workers
+    problem = None
+
     @abstractmethod
     def evaluate(self, candidates, args):
         raise NotImplementedError
 
+    def collect(self, results):
+        """Merges the statistics returned by the workers, adding their timeouts to the problem,
+        as the copies of the problem evaluated by the workers are not sent back.
+        """
+        timeouts = solver_stats.timeouts
+        evaluations = collect(results)
+        if self.problem is not None:
+            self.problem.timeouts += solver_stats.timeouts - timeouts
+        return evaluations
+
 
 class MultiProcessorEvaluator(Evaluator):
 
@@ -114,17 +129,23 @@ class MultiProcessorEvaluator(Evaluator):
         When using COBRApy, mewmory resources are not released after each
         pool map. As such, the pool needs to be instantiated and closed at
         each iteration.
+        The threads of solvers and BLAS libraries in the workers are limited
+        by a WorkerPolicy.
         """
         self.mp_num_cpus = mp_num_cpus
         self.evaluator = evaluator
+        self.policy = WorkerPolicy(mp_num_cpus)
         self.__name__ = self.__class__.__name__
 
     def evaluate(self, candidates, args):
         """
         Values in args will be ignored and not passed to the evaluator to avoid unnecessary pickling in inspyred.
         """
-        pool = Pool(self.mp_num_cpus)
-        results = pool.map(self.evaluator, candidates)
+        pool = Pool(self.mp_num_cpus, initializer=self.policy.apply)
+        if solver_stats.enabled:
+            results = self.collect(pool.map(StatsCollector(self.evaluator), candidates))
+        else:
+            results = pool.map(self.evaluator, candidates)
         pool.close()
         return results
 
@@ -143,6 +164,7 @@ class NoDaemonMultiProcessorEvaluator(Evaluator):
         """
         self.mp_num_cpus = mp_num_cpus
         self.evaluator = evaluator
+        self.policy = WorkerPolicy(mp_num_cpus)
         self.__name__ = self.__class__.__name__
         print('nodaemon')
 
@@ -151,8 +173,11 @@ class NoDaemonMultiProcessorEvaluator(Evaluator):
         Values in args will be ignored and not passed to the evaluator 
         to avoid unnecessary pickling in inspyred.
         """
-        pool = NoDaemonProcessPool(self.mp_num_cpus)
-        results = pool.map(self.evaluator, candidates)
+        pool = NoDaemonProcessPool(self.mp_num_cpus, initializer=self.policy.apply)
+        if solver_stats.enabled:
+            results = self.collect(pool.map(StatsCollector(self.evaluator), candidates))
+        else:
+            results = pool.map(self.evaluator, candidates)
         pool.close()
         return results
 
@@ -168,14 +193,24 @@ class DaskEvaluator(Evaluator):
         Args:
             evaluator (function): Evaluation function.
             mp_num_cpus (int): Number of CPUs.
+            scheduler (str): The dask scheduler. The worker policy is not applied\
+                to threaded schedulers, whose workers share the process.
         """
         self.evaluator = evaluator
         self.scheduler = scheduler
+        self.processes = scheduler not in ('threads', 'threading', 'sync', 'synchronous', 'single-threaded')
+        if self.processes:
+            self.evaluator = WorkerPolicy(mp_num_cpus).wrap(evaluator)
         self.__name__ = self.__class__.__name__
 
     def evaluate(self, candidates, args):
+        evaluator = StatsCollector(self.evaluator) if solver_stats.enabled else self.evaluator
         with dask.config.set(scheduler=self.scheduler):
-            return list(dask.compute(*[dask.delayed(self.evaluator)(c) for c in candidates]))
+            results = list(dask.compute(*[dask.delayed(evaluator)(c) for c in candidates]))
+        if not solver_stats.enabled:
+            return results
+        # threaded schedulers evaluate the problem itself, which already counts its timeouts
+        return self.collect(results) if self.processes else collect(results)
 
     def __call__(self, candidates, args):
         return self.evaluate(candidates, args)
@@ -189,7 +224,7 @@ class SparkEvaluator(Evaluator):
             evaluator (function): Evaluation function.
             mp_num_cpus (int): Number of CPUs.
         """
-        self.evaluator = evaluator
+        self.evaluator = WorkerPolicy(mp_num_cpus).wrap(evaluator)
         self.spark_conf = SparkConf().setAppName(
             "mewpy").setMaster(f"local[{mp_num_cpus}]")
         self.spark_context = SparkContext(conf=self.spark_conf)
@@ -197,6 +232,9 @@ class SparkEvaluator(Evaluator):
 
     def evaluate(self, candidates, args):
         solutions_to_evaluate = self.spark_context.parallelize(candidates)
+        if solver_stats.enabled:
+            evaluator = StatsCollector(self.evaluator)
+            return self.collect(solutions_to_evaluate.map(lambda s: evaluator(s)).collect())
         return solutions_to_evaluate.map(lambda s: self.evaluator(s)).collect()
 
     def __call__(self, candidates, args):
@@ -219,19 +257,26 @@ else:
         The solver is not reset before each evaluation.
         """
 
-        def __init__(self, problem):
+        def __init__(self, problem, policy=None, index=None):
+            if policy is not None:
+                policy.apply(index)
             self.problem = copy.deepcopy(problem)
 
-        def evaluate_candidates(self, candidates):
-            """Evaluates a sublist of candidates
+        def evaluate_candidates(self, candidates, stats=False):
+            """Evaluates a sublist of candidates.
+            If stats is True, also returns the solver statistics of the evaluations.
             """
+            if stats:
+                solver_stats.enable()
             if getattr(self.problem, "evaluator", False):
-                return self.problem.evaluator(candidates, None)
+                res = self.problem.evaluator(candidates, None)
             else:
                 res = []
                 for candidate in candidates:
                     res.append(self.problem.evaluate(candidate))
-                return res
+            if stats:
+                return res, solver_stats.to_dict()
+            return res
 
     @ray.remote
     class RayActorF:
@@ -241,15 +286,22 @@ else:
         The solver is not reset before each evaluation.
         """
 
-        def __init__(self, func):
+        def __init__(self, func, policy=None, index=None):
+            if policy is not None:
+                policy.apply(index)
             self.func = copy.deepcopy(func)
 
-        def evaluate_candidates(self, candidates):
-            """Evaluates a sublist of candidates
+        def evaluate_candidates(self, candidates, stats=False):
+            """Evaluates a sublist of candidates.
+            If stats is True, also returns the solver statistics of the evaluations.
             """
+            if stats:
+                solver_stats.enable()
             res = []
             for candidate in candidates:
                 res.append(self.func(candidate))
+            if stats:
+                return res, solver_stats.to_dict()
             return res
 
     class RayEvaluator(Evaluator):
@@ -261,12 +313,13 @@ else:
                 number_of_actors (int): Number of workers
             """
             ray.init(ignore_reinit_error=True)
+            policy = WorkerPolicy(number_of_actors)
             if isfunc:
-                self.actors = [RayActorF.remote(problem)
-                               for _ in range(number_of_actors)]
+                self.actors = [RayActorF.remote(problem, policy, i)
+                               for i in range(number_of_actors)]
             else:
-                self.actors = [RayActor.remote(problem)
-                               for _ in range(number_of_actors)]
+                self.actors = [RayActor.remote(problem, policy, i)
+                               for i in range(number_of_actors)]
             self.number_of_actors = len(self.actors)
             self.__name__ = self.__class__.__name__
             print(f"Using {self.number_of_actors} workers.")
@@ -287,8 +340,10 @@ else:
             values = []
             for i in range(self.number_of_actors):
                 actor = self.actors[i]
-                values.append(actor.evaluate_candidates.remote(sub_lists[i]))
+                values.append(actor.evaluate_candidates.remote(sub_lists[i], solver_stats.enabled))
             r = ray.get(values)
+            if solver_stats.enabled:
+                r = self.collect(r)
             result = []
             for x in r:
                 result += x
@@ -317,15 +372,20 @@ def get_evaluator(problem, n_mp=cpu_count(), evaluator=ModelConstants.MP_EVALUAT
         [type]: [description]
     """
     if evaluator == 'ray' and 'ray' in MP_Evaluators:
-        return RayEvaluator(problem, n_mp)
+        mp_evaluator = RayEvaluator(problem, n_mp)
     elif evaluator == 'nodaemon' and 'nodaemon' in MP_Evaluators:
-        return NoDaemonMultiProcessorEvaluator(problem,n_mp) 
+        mp_evaluator = NoDaemonMultiProcessorEvaluator(problem,n_mp) 
     elif evaluator == 'dask' and 'dask' in MP_Evaluators:
-        return DaskEvaluator(problem.evaluate, n_mp)
+        mp_evaluator = DaskEvaluator(problem.evaluate, n_mp)
     elif evaluator == 'spark' and 'spark' in MP_Evaluators:
-        return SparkEvaluator(problem.evaluate, n_mp)
+        mp_evaluator = SparkEvaluator(problem.evaluate, n_mp)
     else:
-        return MultiProcessorEvaluator(problem.evaluate, n_mp)
+        mp_evaluator = MultiProcessorEvaluator(problem.evaluate, n_mp)
+    # EA problems wrap the MEWpy problem, which counts the evaluations that exceeded the time budget
+    problem = getattr(problem, 'problem', problem)
+    if hasattr(problem, 'timeouts'):
+        mp_evaluator.problem = problem
+    return mp_evaluator
 
 
 def get_fevaluator(func, n_mp=cpu_count(), evaluator=ModelConstants.MP_EVALUATOR):
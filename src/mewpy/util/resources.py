@@ -0,0 +1,279 @@
+# Copyright (C) 2019- Centre of Biological Engineering,
+#     University of Minho, Portugal
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+##############################################################################
+Thread, core and time policies of solvers.
+
+Solvers (CPLEX, Gurobi, HiGHS) and BLAS are multithreaded by default. When
+they run inside a pool of worker processes, each worker would use all the
+cpus. A WorkerPolicy splits the available cpus among the workers, limiting
+the threads of the solvers and BLAS libraries of each worker and, optionally,
+pinning workers to their own cores. The split may be configured with
+EAConstants.SOLVER_THREADS, EAConstants.BLAS_THREADS and EAConstants.PIN_WORKERS.
+
+A TimeBudget limits the time of a block of code, such as the evaluation of
+a candidate, which may run several solves. Solvers and simulators set the
+time limit of their native problems to the remaining time of the budget.
+
+    with TimeBudget(10) as budget:
+        ...
+    if budget.expired:
+        ...
+
+Author: Vitor Pereira
+##############################################################################
+"""
+import multiprocessing
+import os
+from math import ceil
+from time import perf_counter
+
+from .constants import EAConstants
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+
+BLAS_VARIABLES = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                  'BLIS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+# The number of threads of solvers in this process, or None if not limited.
+_solver_threads = None
+# The policy applied to this process
+_applied = None
+# The active time budget
+_budget = None
+
+
+def available_cpus():
+    """ Returns the list of cpus available to the process. """
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def solver_threads():
+    """ Returns the number of threads of solvers in this process, or None if not limited. """
+    return _solver_threads
+
+
+def set_native_threads(problem, threads=None):
+    """ Sets the number of threads of a native solver problem (CPLEX, Gurobi, HiGHS or optlang),
+    such as the problems of REFRAMED and COBRApy solvers. Other problems are left unchanged.
+
+    :param problem: The native problem.
+    :param int threads: The number of threads. By default, the number of threads of the process policy, if any.
+    """
+    threads = threads or _solver_threads
+    if not threads or problem is None:
+        return
+    # optlang wraps the native problem
+    if hasattr(problem, 'configuration') and hasattr(problem, 'problem'):
+        problem = problem.problem
+    if hasattr(problem, 'parameters') and hasattr(problem.parameters, 'threads'):
+        problem.parameters.threads.set(threads)
+    elif hasattr(problem, 'Params'):
+        problem.Params.Threads = threads
+    elif hasattr(problem, 'setOptionValue'):
+        problem.setOptionValue('threads', threads)
+
+
+def set_blas_threads(threads):
+    """ Limits the number of BLAS and OpenMP threads of the process.
+    Environment variables only affect libraries loaded afterwards, while threadpoolctl,
+    if installed, also limits the libraries already loaded.
+    """
+    for var in BLAS_VARIABLES:
+        os.environ[var] = str(threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=threads)
+
+
+def worker_index():
+    """ Returns the index of the calling worker process in its pool,
+    or None if the process is not a worker of a multiprocessing pool.
+    """
+    identity = multiprocessing.current_process()._identity
+    return identity[-1] - 1 if identity else None
+
+
+class WorkerPolicy:
+
+    def __init__(self, n_workers, solver_threads=None, blas_threads=None, pin=None):
+        """ The thread and core policy of a pool of worker processes.
+
+        :param int n_workers: The number of workers sharing the cpus.
+        :param int solver_threads: The number of threads of each solver. Default, EAConstants.SOLVER_THREADS\
+            or, if non positive, the available cpus divided by the number of workers.
+        :param int blas_threads: The number of BLAS threads of each worker. Default, EAConstants.BLAS_THREADS\
+            or, if non positive, the available cpus divided by the number of workers.
+        :param bool pin: Pin each worker to its own cores. Default, EAConstants.PIN_WORKERS.
+        """
+        self.cpus = available_cpus()
+        share = max(1, len(self.cpus) // max(1, n_workers))
+        if not solver_threads:
+            solver_threads = EAConstants.SOLVER_THREADS if EAConstants.SOLVER_THREADS > 0 else share
+        if not blas_threads:
+            blas_threads = EAConstants.BLAS_THREADS if EAConstants.BLAS_THREADS > 0 else share
+        self.solver_threads = solver_threads
+        self.blas_threads = blas_threads
+        self.pin = EAConstants.PIN_WORKERS if pin is None else pin
+
+    def cores(self, index):
+        """ Returns the cores of the worker with the given index. """
+        n = min(max(self.solver_threads, self.blas_threads), len(self.cpus))
+        start = (index * n) % len(self.cpus)
+        return {self.cpus[(start + k) % len(self.cpus)] for k in range(n)}
+
+    def apply(self, index=None):
+        """ Applies the policy to the calling worker process.
+        Used as initializer of process pools.
+
+        :param int index: The index of the worker, used to select its cores. By default, its index in the pool.\
+            Workers without an index, outside a multiprocessing pool, are not pinned.
+        """
+        global _solver_threads, _applied
+        from mewpy.solvers.solver import Parameter, default_parameters
+        _solver_threads = self.solver_threads
+        # MEWpy solvers apply the default parameters when instantiated
+        default_parameters[Parameter.THREADS] = self.solver_threads
+        set_blas_threads(self.blas_threads)
+        index = worker_index() if index is None else index
+        if self.pin and index is not None and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, self.cores(index))
+        _applied = self.key()
+
+    def key(self):
+        return self.solver_threads, self.blas_threads, self.pin
+
+    def wrap(self, func):
+        """ Returns a function that applies the policy, once for each worker process, before calling func.
+        Used by evaluators whose workers have no initializer.
+        """
+        return PolicyFunction(func, self)
+
+
+class PolicyFunction:
+
+    def __init__(self, func, policy):
+        """ A (picklable) function that applies a worker policy to the process where it is called. """
+        self.func = func
+        self.policy = policy
+
+    def __call__(self, *args):
+        if _applied != self.policy.key():
+            self.policy.apply()
+        return self.func(*args)
+
+
+def native_time_limit(problem):
+    """ Returns the time limit of a native solver problem (CPLEX, Gurobi, HiGHS or optlang). """
+    if hasattr(problem, 'configuration') and hasattr(problem, 'problem'):
+        return problem.configuration.timeout
+    if hasattr(problem, 'parameters') and hasattr(problem.parameters, 'timelimit'):
+        return problem.parameters.timelimit.get()
+    if hasattr(problem, 'Params'):
+        return problem.Params.TimeLimit
+    if hasattr(problem, 'getOptionValue'):
+        value = problem.getOptionValue('time_limit')
+        # older highspy versions return a (status, value) tuple
+        return value[1] if isinstance(value, tuple) else value
+    return None
+
+
+def set_native_time_limit(problem, seconds):
+    """ Sets the time limit of a native solver problem (CPLEX, Gurobi, HiGHS or optlang).
+    Other problems are left unchanged.
+
+    :param problem: The native problem.
+    :param float seconds: The time limit (None, for optlang problems without limit).
+    :returns: True if the time limit was set.
+    """
+    if hasattr(problem, 'configuration') and hasattr(problem, 'problem'):
+        # optlang (GLPK only accepts whole seconds)
+        problem.configuration.timeout = seconds if seconds is None else max(1, ceil(seconds))
+    elif hasattr(problem, 'parameters') and hasattr(problem.parameters, 'timelimit'):
+        problem.parameters.timelimit.set(seconds)
+    elif hasattr(problem, 'Params'):
+        problem.Params.TimeLimit = seconds
+    elif hasattr(problem, 'setOptionValue'):
+        problem.setOptionValue('time_limit', float(seconds))
+    else:
+        return False
+    return True
+
+
+def limit_time(problem):
+    """ Limits the time of a native solver problem to the remaining time of the active time budget, if any.
+    Raises a TimeoutError if the budget is already exhausted.
+    """
+    if _budget is not None:
+        _budget.limit(problem)
+
+
+class TimeBudget:
+
+    def __init__(self, seconds):
+        """ A time budget for a block of code, used as context manager.
+        Solves within the block are limited to the remaining time, and the time limits
+        of the solvers are restored on exit. Nested budgets end at the earliest deadline.
+
+        :param float seconds: The time budget.
+        """
+        self.seconds = seconds
+        self.end = None
+        self.outer = None
+        self._limited = {}
+
+    def __enter__(self):
+        global _budget
+        self.end = perf_counter() + self.seconds
+        self.outer = _budget
+        if self.outer is not None:
+            self.end = min(self.end, self.outer.end)
+        self._limited = {}
+        _budget = self
+        return self
+
+    def __exit__(self, *args):
+        global _budget
+        for problem, previous in self._limited.values():
+            set_native_time_limit(problem, previous)
+        self._limited = {}
+        _budget = self.outer
+        return False
+
+    def remaining(self):
+        """ Returns the remaining time. """
+        return self.end - perf_counter()
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def limit(self, problem):
+        """ Limits the time of a native solver problem to the remaining time. """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise TimeoutError('Time budget exceeded')
+        if problem is None:
+            return
+        previous = native_time_limit(problem) if id(problem) not in self._limited else None
+        if set_native_time_limit(problem, remaining) and id(problem) not in self._limited:
+            self._limited[id(problem)] = (problem, previous)
@@ -0,0 +1,228 @@
+# Copyright (C) 2019- Centre of Biological Engineering,
+#     University of Minho, Portugal
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+##############################################################################
+Instrumentation of solver calls and simulations.
+
+Statistics are collected in a process-local object, `solver_stats`, only
+while it is enabled. Instrumented code requests a timer, which is a shared
+no-op object when the statistics are disabled.
+
+    from mewpy.util.stats import solver_stats
+    solver_stats.enable()
+    ...
+    print(solver_stats.summary())
+
+Multiprocessing evaluators return the statistics of the workers along with
+the evaluations, and aggregate them into the statistics of the main process.
+
+Author: Vitor Pereira
+##############################################################################
+"""
+from collections import Counter
+from time import perf_counter
+
+
+class _NullTimer:
+    """ Timer used when the statistics are disabled. """
+
+    enabled = False
+
+    def lap(self, phase):
+        pass
+
+    def done(self, status=None, values=0, problem=None):
+        pass
+
+
+_null_timer = _NullTimer()
+
+
+class _Timer:
+    """ Records the wall time of consecutive phases of a solver call or simulation. """
+
+    enabled = True
+
+    def __init__(self, stats, kind):
+        self.stats = stats
+        self.kind = kind
+        self.last = perf_counter()
+
+    def lap(self, phase):
+        """ Adds the time elapsed since the previous lap to a phase. """
+        now = perf_counter()
+        self.stats.time[phase] += now - self.last
+        self.last = now
+
+    def done(self, status=None, values=0, problem=None):
+        """ Records a finished call.
+
+        :param status: The solution status (optional).
+        :param int values: The number of variable values read back.
+        :param problem: The native solver problem, from which the number of iterations is read (optional).
+        """
+        iterations = native_iterations(problem) if problem is not None else None
+        self.stats.record(self.kind, status, values, iterations)
+
+
+class SolverStats:
+    """ Statistics of solver calls ('solve'), problem builds ('build') and simulations ('simulation').
+
+    Phases timed by solvers: 'build' (problem build), 'bounds' (applying and restoring temporary
+    constraints), 'objective', 'solve' (the optimization itself) and 'values' (reading the solution).
+    Simulators time 'build' (solver instance) and 'simulate' (whole simulation).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        """ Clears the statistics. """
+        self.time = Counter()
+        self.calls = Counter()
+        self.status = Counter()
+        self.iterations = 0
+        self.values = 0
+        self.timeouts = 0
+
+    def enable(self, reset=True):
+        """ Starts collecting statistics.
+
+        :param bool reset: Clears previous statistics (default True).
+        """
+        if reset:
+            self.reset()
+        self.enabled = True
+
+    def disable(self):
+        """ Stops collecting statistics. """
+        self.enabled = False
+
+    def timer(self, kind='solve'):
+        """ Returns a timer for a solver call or a simulation, which is a no-op if the statistics are disabled.
+
+        :param str kind: 'solve', 'build' or 'simulation'.
+        """
+        if self.enabled:
+            return _Timer(self, kind)
+        return _null_timer
+
+    def record(self, kind, status=None, values=0, iterations=None):
+        """ Records a finished solver call or simulation. """
+        self.calls[kind] += 1
+        if status is not None:
+            self.status[(kind, getattr(status, 'value', str(status)))] += 1
+        if values:
+            self.values += values
+        if iterations:
+            self.iterations += iterations
+
+    def timeout(self):
+        """ Counts an evaluation that exceeded its time budget.
+        Timeouts are counted even if the statistics are disabled.
+        """
+        self.timeouts += 1
+
+    def to_dict(self):
+        """ Returns the statistics as a (picklable) dictionary. """
+        return {'time': dict(self.time),
+                'calls': dict(self.calls),
+                'status': dict(self.status),
+                'iterations': self.iterations,
+                'values': self.values,
+                'timeouts': self.timeouts}
+
+    def merge(self, stats):
+        """ Adds statistics returned by **to_dict**, for instance by other processes. """
+        self.time.update(stats['time'])
+        self.calls.update(stats['calls'])
+        self.status.update(stats['status'])
+        self.iterations += stats['iterations']
+        self.values += stats['values']
+        self.timeouts += stats.get('timeouts', 0)
+
+    def summary(self):
+        """ Returns a one line summary of the statistics. """
+        parts = []
+        for kind, n in self.calls.items():
+            status = ', '.join(f"{s} {m}" for (k, s), m in self.status.items() if k == kind)
+            parts.append(f"{kind} {n} ({status})" if status else f"{kind} {n}")
+        parts.append(f"iterations {self.iterations}")
+        parts.append(f"values {self.values}")
+        if self.timeouts:
+            parts.append(f"timeouts {self.timeouts}")
+        parts.append(' '.join(f"{phase} {t:.3f}s" for phase, t in self.time.items()))
+        return ' | '.join(parts)
+
+    def __repr__(self):
+        return f"SolverStats({self.summary()})"
+
+
+solver_stats = SolverStats()
+
+
+def native_iterations(problem):
+    """ Returns the number of iterations of the last solve of a native solver problem
+    (CPLEX, Gurobi, HiGHS or optlang), or None if not available.
+    """
+    try:
+        # optlang wraps the native problem
+        if hasattr(problem, 'configuration') and hasattr(problem, 'problem'):
+            problem = problem.problem
+        if hasattr(problem, 'solution') and hasattr(problem.solution, 'progress'):
+            return problem.solution.progress.get_num_iterations()
+        if hasattr(problem, 'IterCount'):
+            return int(problem.IterCount)
+        if hasattr(problem, 'getInfo'):
+            info = problem.getInfo()
+            return info.simplex_iteration_count + max(info.ipm_iteration_count, 0)
+    except Exception:
+        pass
+    return None
+
+
+class StatsCollector:
+    """ Wraps an evaluation function run by a worker process, so that it returns the worker
+    statistics together with the evaluation.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, *args):
+        # the statistics of the calling process are restored, as the
+        # evaluation may run in the same process (e.g. threaded schedulers)
+        previous, enabled = solver_stats.to_dict(), solver_stats.enabled
+        solver_stats.enable()
+        try:
+            result = self.func(*args)
+            return result, solver_stats.to_dict()
+        finally:
+            solver_stats.reset()
+            solver_stats.merge(previous)
+            solver_stats.enabled = enabled
+
+
+def collect(results):
+    """ Merges the statistics returned by **StatsCollector** into the process statistics,
+    returning the evaluations.
+    """
+    evaluations = []
+    for result, stats in results:
+        solver_stats.merge(stats)
+        evaluations.append(result)
+    return evaluations
@@ -59,7 +59,6 @@ def flux_envelope(model, r_x, r_y, steps=10, constraints=None, x_range=None, tol
         if x_range[1] < xmax:
             xmax = x_range[1]
     xvals = np.linspace(xmin, xmax, steps)
-    ymins, ymaxs = np.zeros(steps), np.zeros(steps)
 
     if constraints is None:
         _constraints = {}
@@ -67,10 +66,9 @@ def flux_envelope(model, r_x, r_y, steps=10, constraints=None, x_range=None, tol
         _constraints = {}
         _constraints.update(constraints)
 
-    for i, xval in enumerate(xvals):
-        _constraints[r_x] = xval
-        y_range = simul.FVA(obj_frac=obj_frac, reactions=[r_y], constraints=_constraints)
-        ymins[i], ymaxs[i] = y_range[r_y]
+    constraints_list = [{**_constraints, r_x: xval} for xval in xvals]
+    ymins = simul.simulate_batch(constraints_list, objective={r_y: 1}, maximize=False).objective_values
+    ymaxs = simul.simulate_batch(constraints_list, objective={r_y: 1}, maximize=True).objective_values
 
     return xvals, ymins, ymaxs
 
@@ -7,6 +7,12 @@ EC_CORE_MODEL2 = Path(__file__).parent.joinpath('data', 'e_coli_core.xml')
 MIN_GROWTH = 0.1
 
 
+def _worker_threads(_):
+    from mewpy.solvers.solver import Parameter, default_parameters
+    from mewpy.util.resources import solver_threads
+    return solver_threads(), default_parameters.get(Parameter.THREADS)
+
+
 class TestReframedSimul(unittest.TestCase):
     """ Tests the REFRAMED Simulator
     """
@@ -34,6 +40,23 @@ class TestReframedSimul(unittest.TestCase):
         essential = self.simul.essential_genes()
         self.assertGreater(len(essential), 0)
 
+    def test_essential_pruning(self):
+        """Tests that pruned and parallel essentiality screens match single knockouts
+        """
+        essential = [r_id for r_id in self.simul.reactions if self.simul.is_essential_reaction(r_id)]
+        self.assertEqual(self.simul.essential_reactions(jobs=2), essential)
+        essential = [g for g in self.simul.genes if self.simul.is_essential_gene(g)]
+        self.assertEqual(self.simul.essential_genes(), essential)
+
+    def test_gene_knockout_reactions(self):
+        """Tests that knockouts only evaluating affected GPRs match the evaluation of all GPRs
+        """
+        genes = self.simul.genes
+        for deleted in (genes[:1], genes[3:5], genes[::7]):
+            active = self.simul.evaluate_gprs(set(genes) - set(deleted))
+            inactive = set(self.simul.reactions) - set(active)
+            self.assertEqual(set(self.simul.gene_knockout_reactions(deleted)), inactive)
+
     def test_uptake_reactions(self):
         """Tests uptake reactions
         """
@@ -79,6 +102,28 @@ class TestReframedSimul(unittest.TestCase):
     def test_FVA(self):
         self.simul.FVA(reactions=[self.SUCC])
 
+    def test_FVA_parallel(self):
+        """Tests FVA split among worker processes
+        """
+        import numpy as np
+        reactions = self.simul.reactions[:10]
+        res = self.simul.FVA(reactions=reactions, format='array')
+        self.assertEqual(res.shape, (len(reactions), 2))
+        res_mp = self.simul.FVA(reactions=reactions, jobs=2, chunk_size=3, format='array')
+        self.assertTrue(np.allclose(res, res_mp, equal_nan=True))
+
+    def test_FVA_skip_solves(self):
+        """Tests FVA skipping solves attained by previous primal solutions
+        """
+        import numpy as np
+        stats = dict()
+        res = self.simul.FVA(stats=stats, format='df')
+        ref = self.simul.FVA(skip_solves=False, format='df')
+        self.assertGreater(stats['skipped'], 0)
+        self.assertEqual(stats['solves'] + stats['skipped'], 2 * len(self.simul.reactions))
+        for col in ('Minimum', 'Maximum'):
+            self.assertTrue(np.allclose(res[col].values, ref[col].values, equal_nan=True))
+
     def test_envelope(self):
         from mewpy.visualization.envelope import plot_flux_envelope
         plot_flux_envelope(self.simul, self.BIOMASS_ID, self.SUCC)
@@ -88,6 +133,268 @@ class TestReframedSimul(unittest.TestCase):
         solver = solver_instance(self.simul)
         solver.solve()
 
+    def test_solver_scalefactor(self):
+        """Tests scaled solvers and simulations
+        """
+        from mewpy.solvers import solver_instance
+        solver = solver_instance(self.simul)
+        objective = {self.BIOMASS_ID: 1}
+        wt = solver.solve(objective, minimize=False)
+        solver.set_scalefactor(100)
+        res = solver.solve(objective, minimize=False)
+        self.assertAlmostEqual(res.fobj, wt.fobj, places=5)
+        self.assertAlmostEqual(res.values[self.BIOMASS_ID], wt.fobj, places=5)
+        bounds = self.simul.get_reaction_bounds(self.BIOMASS_ID)
+        res = self.simul.simulate(scalefactor=100)
+        self.assertAlmostEqual(res.objective_value, wt.fobj, places=5)
+        res = self.simul.simulate(method='pFBA', constraints={self.BIOMASS_ID: (0, 0.1)}, scalefactor=100)
+        self.assertAlmostEqual(res.fluxes[self.BIOMASS_ID], 0.1, places=3)
+        # the model is not changed
+        self.assertEqual(self.simul.get_reaction_bounds(self.BIOMASS_ID), bounds)
+        # scaling is not supported for MILP problems
+        from mewpy.solvers.solver import VarType
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        for solver_class in __MEWPY_solvers__.values():
+            # max x s.t. x - 10 y <= 0, y binary
+            solver = solver_class()
+            solver.add_variable('x', 0, 100)
+            solver.add_variable('y', 0, 1, VarType.BINARY)
+            solver.add_constraint('c1', {'x': 1, 'y': -10}, '<', 0)
+            with self.assertRaises(ValueError):
+                solver.set_scalefactor(100)
+            res = solver.solve({'x': 1}, minimize=False, shadow_prices=False)
+            self.assertAlmostEqual(res.fobj, 10, places=5)
+            self.assertAlmostEqual(res.values['y'], 1, places=5)
+            solver = solver_class()
+            solver.add_variable('x', 0, 100)
+            solver.set_scalefactor(100)
+            with self.assertRaises(ValueError):
+                solver.add_variable('y', 0, 1, VarType.BINARY)
+
+    def test_solver_load_matrix(self):
+        from scipy.sparse import csr_matrix
+        from mewpy.solvers import solver_instance
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        solver = solver_instance(self.simul)
+        self.assertEqual(solver.var_ids, list(self.simul.reactions))
+        self.assertEqual(solver.constr_ids, list(self.simul.metabolites))
+        res = solver.solve({self.BIOMASS_ID: 1}, minimize=False)
+        self.assertAlmostEqual(res.fobj, self.simul.simulate().objective_value, places=5)
+        # max x s.t. x + y <= 4, x - y = 1
+        S = [[1, 1], [1, -1]]
+        for matrix in (S, csr_matrix(S)):
+            for solver_class in __MEWPY_solvers__.values():
+                solver = solver_class()
+                solver.load_matrix(matrix, [0, 0], [10, 10], ['x', 'y'], ['c1', 'c2'], ['<', '='], [4, 1])
+                res = solver.solve({'x': 1}, minimize=False)
+                self.assertAlmostEqual(res.fobj, 2.5, places=5)
+                self.assertAlmostEqual(res.values['y'], 1.5, places=5)
+        with self.assertRaises(ValueError):
+            solver_instance().load_matrix(S, [0], [10], ['x'], ['c1', 'c2'])
+
+    def test_highs_solver(self):
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        if 'highs' not in __MEWPY_solvers__:
+            self.skipTest('HiGHS is not available')
+        from mewpy.solvers.highs_solver import HighsSolver, highspy
+        from mewpy.solvers.solver import VarType
+        wt = self.simul.simulate().objective_value
+        objective = {self.BIOMASS_ID: 1}
+        backends = ['scipy'] if highspy is None else ['scipy', 'highspy']
+        for backend in backends:
+            solver = HighsSolver(self.simul, backend=backend)
+            res = solver.solve(objective, minimize=False, shadow_prices=True, get_values=[self.BIOMASS_ID])
+            self.assertAlmostEqual(res.fobj, wt, places=5)
+            self.assertEqual(list(res.values.keys()), [self.BIOMASS_ID])
+            self.assertEqual(len(res.shadow_prices), len(self.simul.metabolites))
+            res = solver.solve(objective, minimize=False, constraints={self.BIOMASS_ID: (0, 0.1)})
+            self.assertAlmostEqual(res.fobj, 0.1, places=5)
+            # temporary constraints are restored
+            self.assertAlmostEqual(solver.solve(objective, minimize=False).fobj, wt, places=5)
+            # MILP: max x + y s.t. 2x + 2y <= 5, x, y integer
+            solver = HighsSolver(backend=backend)
+            solver.add_variable('x', 0, 10, VarType.INTEGER)
+            solver.add_variable('y', 0, 10, VarType.INTEGER)
+            solver.add_constraint('c', {'x': 2, 'y': 2}, '<', 5)
+            self.assertAlmostEqual(solver.solve({'x': 1, 'y': 1}, minimize=False).fobj, 2)
+        if highspy is not None:
+            # min 1/2 (x^2 + y^2) s.t. x + y = 1
+            solver = HighsSolver(backend='highspy')
+            solver.add_variable('x', 0, 10)
+            solver.add_variable('y', 0, 10)
+            solver.add_constraint('c', {'x': 1, 'y': 1}, '=', 1)
+            res = solver.solve(quadratic={('x', 'x'): 1, ('y', 'y'): 1}, minimize=True)
+            self.assertAlmostEqual(res.values['x'], 0.5, places=5)
+            self.assertAlmostEqual(solver.solve({'x': 1}, minimize=True).fobj, 0, places=5)
+
+    def test_default_solver(self):
+        """Tests that the SciPy backend of HiGHS is not preferred to optlang
+        """
+        from unittest import mock
+        import mewpy.solvers as solvers
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        if not {'highs', 'optlang'} <= set(__MEWPY_solvers__):
+            self.skipTest('HiGHS or optlang are not available')
+        available = {k: v for k, v in __MEWPY_solvers__.items() if k in ('highs', 'optlang')}
+        with mock.patch.dict(__MEWPY_solvers__, available, clear=True), \
+                mock.patch.object(solvers, 'default_solver', None):
+            with mock.patch('mewpy.solvers.highs_solver.highspy', None):
+                self.assertEqual(solvers.get_default_solver(), 'optlang')
+            solvers.default_solver = None
+            with mock.patch('mewpy.solvers.highs_solver.highspy', object()):
+                self.assertEqual(solvers.get_default_solver(), 'highs')
+
+    def test_solver_basis(self):
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        objective = {self.BIOMASS_ID: 1}
+        for solver_class in __MEWPY_solvers__.values():
+            solver = solver_class(self.simul)
+            wt = solver.solve(objective, minimize=False)
+            basis = solver.get_basis()
+            if basis is None:
+                continue
+            self.assertEqual(len(basis.variables), len(self.simul.reactions))
+            res = solver_class(self.simul).solve(objective, minimize=False, warm_start=basis)
+            self.assertAlmostEqual(res.fobj, wt.fobj, places=5)
+            res = solver.solve(objective, minimize=False, constraints={self.BIOMASS_ID: (0, 0.1)}, warm_start=False)
+            self.assertAlmostEqual(res.fobj, 0.1, places=5)
+
+    def test_solve_objectives(self):
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        from mewpy.solvers.solution import Status
+        reactions = self.simul.reactions[:5]
+        constraints = {self.BIOMASS_ID: (0.1, 0.1)}
+        for solver_class in __MEWPY_solvers__.values():
+            solver = solver_class(self.simul)
+            fobj, status, values = solver.solve_objectives(reactions, [True, False, True, False, True],
+                                                           constraints=constraints, get_values=[self.BIOMASS_ID])
+            self.assertEqual(values.shape, (len(reactions), 1))
+            for i, r_id in enumerate(reactions):
+                res = solver.solve({r_id: 1}, minimize=(i % 2 == 0), constraints=constraints)
+                self.assertEqual(status[i], res.status)
+                if res.status == Status.OPTIMAL:
+                    self.assertAlmostEqual(fobj[i], res.fobj, places=5)
+                    self.assertAlmostEqual(values[i, 0], 0.1, places=5)
+            # the constraints are not kept
+            res = solver.solve({self.BIOMASS_ID: 1}, minimize=False)
+            self.assertGreater(res.fobj, 0.1)
+            with self.assertRaises(ValueError):
+                solver.solve_objectives(reactions, [True])
+
+    def test_solver_pickle(self):
+        import pickle
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        from mewpy.solvers.solver import VarType
+        objective = {self.BIOMASS_ID: 1}
+        for solver_class in __MEWPY_solvers__.values():
+            solver = solver_class(self.simul)
+            wt = solver.solve(objective, minimize=False)
+            res = pickle.loads(pickle.dumps(solver)).solve(objective, minimize=False)
+            self.assertEqual(res.status, wt.status)
+            self.assertAlmostEqual(res.fobj, wt.fobj, places=5)
+            # a MILP keeps its integer variables
+            milp = solver_class()
+            milp.add_variable('x', 0, 10, VarType.INTEGER)
+            milp.add_variable('y', 0, 10)
+            milp.add_constraint('c1', {'x': 2, 'y': 1}, '<', 5)
+            res = pickle.loads(pickle.dumps(milp)).solve({'x': 1}, minimize=False, shadow_prices=False)
+            self.assertAlmostEqual(res.fobj, 2, places=5)
+
+    def test_solver_stats(self):
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        from mewpy.util.stats import solver_stats, StatsCollector, collect
+        solver_stats.enable()
+        try:
+            self.simul.simulate()
+            self.simul.simulate(method='pFBA')
+            self.assertEqual(solver_stats.calls['simulation'], 2)
+            self.assertEqual(solver_stats.status[('simulation', 'Optimal')], 2)
+            self.assertGreater(solver_stats.values, 0)
+            for solver_class in __MEWPY_solvers__.values():
+                solver_class(self.simul).solve({self.BIOMASS_ID: 1}, minimize=False)
+            self.assertGreaterEqual(solver_stats.calls['build'], len(__MEWPY_solvers__))
+            self.assertGreaterEqual(solver_stats.calls['solve'], len(__MEWPY_solvers__))
+            self.assertGreater(solver_stats.iterations, 0)
+            for phase in ('build', 'objective', 'solve', 'simulate'):
+                self.assertIn(phase, solver_stats.time)
+            # statistics of evaluations are returned and aggregated
+            stats = solver_stats.to_dict()
+            res = collect([StatsCollector(self.simul.simulate)()])
+            self.assertEqual(len(res), 1)
+            self.assertEqual(solver_stats.calls['simulation'], stats['calls']['simulation'] + 1)
+        finally:
+            solver_stats.disable()
+        solver_stats.reset()
+        self.simul.simulate()
+        self.assertEqual(sum(solver_stats.calls.values()), 0)
+
+    def test_solver_session(self):
+        """Tests simulations reusing a persistent solver
+        """
+        from mewpy.simulation import get_simulator
+        simul = get_simulator(self.simul.model, reset_solver=False)
+        wt = simul.simulate().objective_value
+        res = simul.simulate(constraints={self.BIOMASS_ID: 0})
+        self.assertAlmostEqual(res.objective_value, 0)
+        # the constraints are not kept by the session
+        self.assertAlmostEqual(simul.simulate().objective_value, wt)
+        res = simul.simulate(method='pFBA')
+        self.assertGreater(res.fluxes[self.BIOMASS_ID], MIN_GROWTH)
+        # the objective constraint is kept when the pFBA problem is reused
+        self.assertAlmostEqual(simul.simulate(method='pFBA').objective_value, res.objective_value, places=3)
+        res = simul.simulate(method='pFBA', constraints={self.BIOMASS_ID: 0})
+        self.assertAlmostEqual(res.fluxes[self.BIOMASS_ID], 0)
+        res = simul.simulate(method='pFBA')
+        self.assertAlmostEqual(res.objective_value, self.simul.simulate(method='pFBA').objective_value, places=5)
+
+    def test_simulate_batch(self):
+        """Tests batch simulations
+        """
+        reactions = self.simul.reactions[:10]
+        constraints_list = [{r_id: (0, 0)} for r_id in reactions]
+        res = self.simul.simulate_batch(constraints_list)
+        self.assertEqual(res.fluxes.shape, (len(reactions), len(self.simul.reactions)))
+        for i, constraints in enumerate(constraints_list):
+            r = self.simul.simulate(constraints=constraints)
+            self.assertAlmostEqual(res.objective_values[i], r.objective_value, places=5)
+        res_mp = self.simul.simulate_batch(constraints_list, jobs=2)
+        self.assertEqual(res_mp.fluxes.shape, res.fluxes.shape)
+        self.assertTrue((res_mp.status == res.status).all())
+
+    def test_simulate_mp(self):
+        """Tests simulations on the worker pool of the simulator
+        """
+        from mewpy.simulation import SStatus
+        constraints_list = [{r_id: 0} for r_id in self.simul.reactions[:6]]
+        res = self.simul.simulate_mp(constraints_list=constraints_list, jobs=2)
+        for r, constraints in zip(res, constraints_list):
+            if r.status == SStatus.OPTIMAL:
+                self.assertAlmostEqual(r.objective_value, self.simul.simulate(constraints=constraints).objective_value,
+                                       places=5)
+        self.assertIs(res[0].model, self.simul.model)
+        done = sorted(i for i, _ in self.simul.imap_simulate(constraints_list, jobs=2, ordered=False))
+        self.assertEqual(done, list(range(len(constraints_list))))
+        # the pool is replaced when the model is changed through the simulator
+        pool = self.simul._simulation_pool(2)
+        self.assertIs(self.simul._simulation_pool(2), pool)
+        self.simul.objective = self.BIOMASS_ID
+        self.assertIsNot(self.simul._simulation_pool(2), pool)
+        self.simul.close_pool()
+
+    def test_indexed_values(self):
+        """Tests results holding a vector of fluxes
+        """
+        import pickle
+        res = self.simul.simulate_batch([{}])[0]
+        wt = self.simul.simulate()
+        self.assertAlmostEqual(res.fluxes[self.BIOMASS_ID], wt.fluxes[self.BIOMASS_ID], places=5)
+        self.assertEqual(len(res.find(show_nulls=True)), len(self.simul.reactions))
+        copy = pickle.loads(pickle.dumps(res))
+        self.assertIs(copy.fluxes.index, res.fluxes.index)
+        self.assertEqual(copy.fluxes, res.fluxes)
+        # the model is not pickled with the results
+        self.assertIsNone(pickle.loads(pickle.dumps(wt)).model)
+
 
 class TestCobra(TestReframedSimul):
     """Tests COBRApy Simulator
@@ -105,6 +412,48 @@ class TestCobra(TestReframedSimul):
         self.BIOMASS_ID = k[0]
         self.SUCC = 'EX_succ_e'
 
+    def test_fba_variable_bounds(self):
+        """Tests FBA simulations changing only the bounds of optlang variables
+        """
+        constraints = {'PGI': 0, 'EX_glc__D_e': (-5, 0), 'PFK': (1, 5)}
+        res = self.simul.simulate(constraints=constraints)
+        with self.simul.model as model:
+            for r_id, (lb, ub) in {'PGI': (0, 0), 'EX_glc__D_e': (-5, 0), 'PFK': (1, 5)}.items():
+                model.reactions.get_by_id(r_id).bounds = (lb, ub)
+            solution = model.optimize()
+        self.assertAlmostEqual(res.objective_value, solution.objective_value, places=6)
+        self.assertAlmostEqual(res.fluxes['PFK'], solution.fluxes['PFK'], places=6)
+        # the variable bounds are restored
+        self.assertEqual(self.simul.model.reactions.PGI.forward_variable.ub, 1000)
+        self.assertAlmostEqual(self.simul.simulate().objective_value, self.simul.model.slim_optimize(), places=6)
+
+    def test_fba_replaced_reaction(self):
+        """Tests FBA simulations after replacing a reaction through the simulator
+        """
+        self.simul.simulate()
+        stoichiometry = self.simul.get_reaction('PGI')['stoichiometry']
+        self.simul.add_reaction('PGI', stoichiometry=stoichiometry, lb=0, ub=0, replace=True)
+        res = self.simul.simulate()
+        solution = self.simul.model.optimize()
+        self.assertAlmostEqual(res.fluxes['PGI'], 0)
+        for r_id, value in solution.fluxes.items():
+            self.assertAlmostEqual(res.fluxes[r_id], value, places=6)
+
+    def test_fba_changed_model(self):
+        """Tests FBA simulations after replacing a reaction directly in the COBRApy model
+        """
+        self.simul.simulate()
+        model = self.simul.model
+        rxn = model.reactions.get_by_id('PGI').copy()
+        model.remove_reactions(['PGI'])
+        rxn.bounds = (0, 0)
+        model.add_reactions([rxn])
+        res = self.simul.simulate()
+        solution = model.optimize()
+        self.assertAlmostEqual(res.fluxes['PGI'], 0)
+        for r_id, value in solution.fluxes.items():
+            self.assertAlmostEqual(res.fluxes[r_id], value, places=6)
+
 
 class TestGERM(TestReframedSimul):
     """Tests GERM Simulator
@@ -134,6 +483,9 @@ class TestGERM(TestReframedSimul):
         essential = self.simul.essential_genes()
         self.assertGreater(len(essential), 0)
 
+    def test_essential_pruning(self):
+        pass
+
     def test_uptake_reactions(self):
         """Tests uptake reactions
         """
@@ -176,6 +528,9 @@ class TestGERM(TestReframedSimul):
     def test_FVA(self):
         self.simul.FVA(reactions=self.simul.reactions[0:2])
 
+    def test_FVA_parallel(self):
+        pass
+
     def test_envelope(self):
         pass
 
@@ -217,5 +572,26 @@ class TestGeckoSimul(unittest.TestCase):
         pass
 
 
+class TestWorkerPolicy(unittest.TestCase):
+
+    def test_worker_policy(self):
+        from mewpy.solvers.solver import Parameter
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        from mewpy.util.process import MultiProcessorEvaluator
+        from mewpy.util.resources import WorkerPolicy, available_cpus, solver_threads, worker_index
+        policy = WorkerPolicy(2)
+        self.assertEqual(policy.solver_threads, max(1, len(available_cpus()) // 2))
+        self.assertEqual(WorkerPolicy(2, solver_threads=3).solver_threads, 3)
+        self.assertEqual(len(WorkerPolicy(1, solver_threads=1).cores(0)), 1)
+        # processes outside a pool have no worker index
+        self.assertIsNone(worker_index())
+        # the policy is applied to the workers only
+        res = MultiProcessorEvaluator(_worker_threads, 2).evaluate([0, 1], None)
+        self.assertEqual(res, [(policy.solver_threads, policy.solver_threads)] * 2)
+        self.assertIsNone(solver_threads())
+        for solver_class in __MEWPY_solvers__.values():
+            solver_class().set_parameter(Parameter.THREADS, 1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -67,6 +67,66 @@ class TestRKOP(unittest.TestCase):
         self.problem.simulator.simulate(constraints=constraints)
 
 
+class TestTimeBudget(unittest.TestCase):
+
+    def setUp(self):
+        from reframed.io.sbml import load_cbmodel
+        from mewpy.optimization.evaluation import TargetFlux
+        model = load_cbmodel(EC_CORE_MODEL)
+        self.fevaluation = [TargetFlux(model.biomass_reaction, method='fba')]
+        self.model = model
+
+    def test_time_budget(self):
+        import random
+        from mewpy.problems import RKOProblem
+        from mewpy.util.stats import solver_stats
+        problem = RKOProblem(self.model, self.fevaluation, time_budget=60)
+        candidate = problem.generator(random)
+        fitness = problem.evaluate_solution(candidate)
+        self.assertEqual(problem.timeouts, 0)
+        self.assertEqual(fitness, RKOProblem(self.model, self.fevaluation).evaluate_solution(candidate))
+        timeouts = solver_stats.timeouts
+        problem.time_budget = 1e-9
+        fitness = problem.evaluate_solution(candidate)
+        self.assertEqual(fitness, [f.worst_fitness for f in self.fevaluation])
+        self.assertEqual(problem.timeouts, 1)
+        self.assertEqual(solver_stats.timeouts, timeouts + 1)
+
+    def test_parallel_timeouts(self):
+        import random
+        from mewpy.problems import RKOProblem
+        from mewpy.optimization.inspyred.problem import InspyredProblem
+        from mewpy.util.process import get_evaluator
+        from mewpy.util.stats import solver_stats
+        problem = RKOProblem(self.model, self.fevaluation, time_budget=1e-9)
+        candidates = [problem.generator(random) for _ in range(3)]
+        evaluator = get_evaluator(InspyredProblem(problem, [1]), n_mp=2, evaluator='multiprocessing')
+        solver_stats.enable()
+        try:
+            evaluator.evaluate(candidates, None)
+        finally:
+            solver_stats.disable()
+        # the timeouts of the workers are added to the problem
+        self.assertEqual(problem.timeouts, len(candidates))
+
+    def test_solver_time_limit(self):
+        from mewpy.simulation import get_simulator
+        from mewpy.solvers.sglobal import __MEWPY_solvers__
+        from mewpy.util.resources import TimeBudget, native_time_limit
+        simul = get_simulator(self.model)
+        for solver_class in __MEWPY_solvers__.values():
+            solver = solver_class(simul)
+            previous = native_time_limit(solver.problem)
+            with TimeBudget(60):
+                solver.solve(simul.objective, minimize=False)
+                self.assertLessEqual(native_time_limit(solver.problem), 60)
+            # the time limit is restored
+            self.assertEqual(native_time_limit(solver.problem), previous)
+            with self.assertRaises(TimeoutError):
+                with TimeBudget(0):
+                    solver.solve(simul.objective, minimize=False)
+
+
 class TestROUP(TestRKOP):
 
     def setUp(self):
@@ -945,6 +945,92 @@ class TestGERMModel(unittest.TestCase):
         self.assertGreater(rfba_sol.x.get('r11'), 1)
         self.assertGreater(srfba_sol.x.get('r11'), 1)
 
+    def test_linear_problem_matrix(self):
+        """
+        Tests the sparse matrix and bounds of linear problems
+        """
+
+        from scipy.sparse import issparse
+        from mewpy.io import read_model
+        from mewpy.germ.analysis import FBA
+        from mewpy.germ.lp import ConstraintContainer
+
+        model = read_model(self.metabolic_reader)
+        fba = FBA(model).build()
+
+        matrix = fba.matrix
+        self.assertTrue(issparse(matrix))
+        self.assertEqual(matrix.shape, fba.shape)
+        self.assertEqual(fba.bounds.shape, (fba.shape[1], 2))
+        self.assertEqual(fba.b_bounds.shape, (fba.shape[0], 2))
+
+        # rows follow the metabolites and columns the reactions
+        rxn = model.get('PGI')
+        for metabolite, coefficient in rxn.stoichiometry.items():
+            row = fba.index(constraint=metabolite.id, as_int=True)
+            col = fba.index(variable=rxn.id, as_int=True)
+            self.assertEqual(matrix[row, col], coefficient)
+        self.assertEqual(tuple(fba.bounds[fba.index(variable=rxn.id, as_int=True)]), rxn.bounds)
+
+        # cached until the problem changes
+        self.assertIs(fba.matrix, matrix)
+        fba.add_constraints(ConstraintContainer(name='pgi_cnt', coefs=[{'PGI': 1.0}], lbs=[0.0], ubs=[1.0]))
+        self.assertEqual(fba.matrix.shape, (matrix.shape[0] + 1, matrix.shape[1]))
+
+        # the solver is loaded from the matrix
+        fba.build_solver()
+        sol = fba.optimize()
+        self.assertLessEqual(sol.x.get('PGI'), 1.0 + 1e-6)
+        self.assertGreater(sol.objective_value, 0)
+
+    def test_incremental_update(self):
+        """
+        Tests the incremental update of the solvers of linear problems attached to a model
+        """
+
+        from mewpy.io import Reader, Engines, read_model
+        from mewpy.germ.analysis import FBA, pFBA, SRFBA
+
+        metabolic_reader = Reader(Engines.MetabolicSBML, SAMPLE_MODEL)
+        regulatory_reader = Reader(Engines.BooleanRegulatoryCSV,
+                                   SAMPLE_REG_MODEL,
+                                   sep=',',
+                                   id_col=0,
+                                   rule_col=1)
+
+        model = read_model(regulatory_reader, metabolic_reader)
+        model.get('pH').coefficients = (0, 14)
+
+        simulators = [method(model, attach=True).build() for method in (FBA, pFBA, SRFBA)]
+        solvers = [simulator.solver for simulator in simulators]
+
+        def check(incremental=True):
+            for simulator, solver in zip(simulators, solvers):
+                sol = simulator.optimize()
+                ref = type(simulator)(model).build().optimize()
+                self.assertAlmostEqual(sol.objective_value, ref.objective_value, places=6)
+                self.assertEqual(simulator.solver is solver, incremental)
+
+        # bounds and coefficients changes are applied to the current solvers
+        model.get('r16').ko()
+        check()
+        model.undo()
+        check()
+        model.get('g20').ko()
+        check()
+        model.undo()
+        check()
+
+        # added or removed variables are applied to the current solvers of FBA and pFBA,
+        # whereas SRFBA is built from scratch
+        model.remove(model.get('r8'))
+        for simulator in simulators:
+            simulator.optimize()
+        self.assertEqual(len(simulators[0].solver.list_variables()), len(model.reactions))
+        self.assertIs(simulators[0].solver, solvers[0])
+        self.assertIs(simulators[1].solver, solvers[1])
+        self.assertIsNot(simulators[2].solver, solvers[2])
+
     def test_serialization(self):
         """
         Tests model serialization workflow
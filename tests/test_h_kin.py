@@ -18,3 +18,112 @@ class TestKineticSimulation(unittest.TestCase):
         from mewpy.simulation.kinetic import KineticSimulation
         sim = KineticSimulation(self.model)
         sim.simulate()
+
+    def test_compiled_ode(self):
+        import numpy as np
+        f = self.model.get_ode()
+        ode_func = self.model.compile_ode()
+        y0 = list(self.model.concentrations.values())
+        dxdt = f(0, y0)
+        # new parameters and factors do not recompile the ODE
+        g = self.model.get_ode(factors={'rmaxPGI': 0})
+        self.assertIs(self.model.compile_ode(), ode_func)
+        self.assertFalse(np.allclose(dxdt, g(0, y0)))
+        self.assertTrue(np.allclose(dxdt, self.model.get_ode()(0, y0)))
+        # metabolites with a null factor have a null balance, even if the rates are not finite
+        i = int(np.flatnonzero(dxdt)[0])
+        m_id = list(self.model.metabolites)[i]
+        dxdt = self.model.get_ode(factors={m_id: 0})(0, np.full(len(y0), np.nan))
+        self.assertEqual(dxdt[i], 0)
+        self.assertTrue(np.isnan(dxdt).any())
+        # changing rate laws does
+        r_id = next(iter(self.model.ratelaws))
+        self.model.set_ratelaw(r_id, self.model.ratelaws[r_id])
+        self.assertIsNot(self.model.compile_ode(), ode_func)
+
+    def test_vectorized_ode(self):
+        import numpy as np
+        y0 = list(self.model.concentrations.values())
+        factors = {'rmaxPGI': 0, 'rmaxPK': 2}
+        dxdt = self.model.get_ode(factors=factors)(0, y0)
+        for sparse in (False, True):
+            rates = {}
+            f = self.model.get_ode(r_dict=rates, factors=factors, vectorized=True, sparse=sparse)
+            self.assertTrue(np.allclose(dxdt, f(0, y0)))
+            self.assertEqual(list(rates.keys()), list(self.model.ratelaws.keys()))
+
+    def test_jacobian(self):
+        import numpy as np
+        y0 = np.array(list(self.model.concentrations.values()))
+        f = self.model.get_ode(vectorized=True)
+        J = self.model.get_jacobian()(0, y0)
+        # central finite differences
+        h = 1e-6 * np.maximum(1, np.abs(y0))
+        E = np.diag(h)
+        Jfd = np.array([(f(0, y0 + E[i]) - f(0, y0 - E[i])) / (2 * h[i]) for i in range(len(y0))]).T
+        self.assertTrue(np.allclose(J, Jfd, rtol=1e-4, atol=1e-6))
+        self.assertFalse(np.any((J != 0) & ~self.model.jacobian_sparsity()))
+
+    def test_kinetic_pool(self):
+        from mewpy.simulation.kinetic import KineticSimulation, kinetic_pool
+        from mewpy.solvers import ODEStatus
+        res = KineticSimulation(self.model, timeout=None).simulate()
+        pool_res = KineticSimulation(self.model, timeout=60).simulate()
+        self.assertEqual(pool_res.status, ODEStatus.OPTIMAL)
+        self.assertEqual(list(res.fluxes.keys()), list(pool_res.fluxes.keys()))
+        pool = kinetic_pool(self.model)
+        worker = pool.workers[0][0]
+        # only the worker that times out is replaced
+        self.assertEqual(KineticSimulation(self.model, timeout=1e-4).simulate().status, ODEStatus.ERROR)
+        self.assertIsNot(pool.workers[0][0], worker)
+        # workers are restarted when parameter values are modified
+        self.model.ratelaws['vPGI'].parameters['rmaxPGI'] *= 0.1
+        res = KineticSimulation(self.model, timeout=None).simulate()
+        pool_res = KineticSimulation(self.model, timeout=60).simulate()
+        self.assertAlmostEqual(pool_res.fluxes['vPGI'], res.fluxes['vPGI'], places=6)
+        pool.close()
+
+    def test_kinetic_pool_collected(self):
+        import gc
+        import weakref
+        from mewpy.simulation.kinetic import KineticSimulation, kinetic_pool, _pools
+        KineticSimulation(self.model, timeout=60).simulate()
+        pool = kinetic_pool(self.model)
+        model = weakref.ref(self.model)
+        del self.model
+        gc.collect()
+        # the model is collected and its workers are closed
+        self.assertIsNone(model())
+        self.assertEqual(pool.workers, [])
+        self.assertNotIn(pool, _pools.values())
+
+    def test_steady_state(self):
+        import numpy as np
+        from mewpy.simulation.kinetic import KineticSimulation
+        sim = KineticSimulation(self.model, timeout=None)
+        res = sim.simulate()
+        ss = sim.simulate(steady_state=True)
+        self.assertIsNone(res.steady_state_time)
+        self.assertLess(ss.steady_state_time, sim.get_time_points()[-1])
+        self.assertEqual(ss.t[-1], ss.steady_state_time)
+        self.assertTrue(np.allclose(list(res.fluxes.values()), list(ss.fluxes.values()), rtol=1e-4))
+
+    def test_failed_steady_state(self):
+        from unittest import mock
+        import mewpy.simulation.kinetic as kinetic
+        from mewpy.solvers import ODEStatus
+        solver_instance = kinetic.ode_solver_instance
+
+        class FailingSolver:
+            """Stops the integration early, as a solver that fails."""
+
+            def __init__(self, f, method):
+                self.solver = solver_instance(f, method)
+
+            def solve(self, y0, t_points, events=None, **kwargs):
+                return self.solver.solve(y0, [t_points[0], 1e-3], **kwargs)
+
+        with mock.patch.object(kinetic, 'ode_solver_instance', FailingSolver):
+            res = kinetic.KineticSimulation(self.model, timeout=None).simulate(steady_state=True)
+        self.assertEqual(res.status, ODEStatus.ERROR)
+        self.assertIsNone(res.steady_state_time)